@@ -86,9 +86,12 @@ class FireWireNode(GenericModel):
         self.timeout_duration = 2
 
     def on_init(self, eventobj: Event):
-        sleep(1)
+        # Give the other nodes a second to initialize before the first parent request
+        self.set_timer(1, self.start_election)
+
+    def start_election(self):
         self.neighbours = set(self.topology.get_neighbors(self.componentinstancenumber))
-        logger.debug(f"the neighbours of {self.componentinstancenumber} is {self.neighbours}")
+        logger.debug("the neighbours of %s is %s", self.componentinstancenumber, self.neighbours)
 
         self.send_parent_req()
 
@@ -129,17 +132,17 @@ class FireWireNode(GenericModel):
     def root_contention(self, eventobj: Event):
         if self.is_leader:
             return
-        logger.debug(f"🤖 {self.componentinstancenumber} is in ROOT CONTENTION")
+        logger.debug("🤖 %s is in ROOT CONTENTION", self.componentinstancenumber)
         decision = random.choice([True, False])
 
         if decision:
-            logger.debug(f"🤖 {self.componentinstancenumber} decides to YIELD")
+            logger.debug("🤖 %s decides to YIELD", self.componentinstancenumber)
             self.in_root_contention = True
             self.send_parent_req()
             self.is_waiting = False
             self.waiting_since = None
         else:
-            logger.debug(f"🤖 {self.componentinstancenumber} decides to HOLD")
+            logger.debug("🤖 %s decides to HOLD", self.componentinstancenumber)
             self.is_waiting = True
             self.in_root_contention = False
             self.send_self(Event(self, FireWirePacketType.START_TIMER, "..."))
@@ -159,8 +162,7 @@ class FireWireNode(GenericModel):
         if delta.seconds > self.timeout_duration:
             self.send_self(Event(self, FireWirePacketType.TIMEOUT, "..."))
         else:
-            sleep(0.2)
-            self.send_self(Event(self, FireWirePacketType.CHECK_TIMER, "..."))
+            self.send_self_after(0.2, Event(self, FireWirePacketType.CHECK_TIMER, "..."))
 
     def timeout(self, eventobj: Event):
         self.send_self(Event(self, FireWirePacketType.ROOT_CONTENTION, "..."))
@@ -194,7 +196,7 @@ class FireWireNode(GenericModel):
             elif not self.is_waiting:
                 self.send_self(Event(self, FireWirePacketType.ROOT_CONTENTION, "..."))
             else:
-                logger.debug(f" 👑 {self.componentinstancenumber} is elected as the leader")
+                logger.debug(" 👑 %s is elected as the leader", self.componentinstancenumber)
                 self.is_leader = True
                 self.is_terminated = True
 
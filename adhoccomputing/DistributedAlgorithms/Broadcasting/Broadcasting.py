@@ -1,5 +1,4 @@
 from enum import Enum
-import copy
 from ...Generics import *
 from ...GenericModel import GenericModel
 
@@ -28,7 +27,7 @@ class ControlledFlooding(GenericModel):
     applmsg = eventobj.eventcontent
     destination = MessageDestinationIdentifiers.NETWORKLAYERBROADCAST
     nexthop = MessageDestinationIdentifiers.LINKLAYERBROADCAST
-    logger.info(f"{self.componentinstancenumber} will SEND a message to {destination} over {nexthop}")
+    logger.info("%s will SEND a message to %s over %s", self.componentinstancenumber, destination, nexthop)
     interfaceid = float('inf')  
     hdr = BroadcastingMessageHeader(BroadcastingMessageTypes.SIMPLEFLOOD, whosends, destination,
                                     nexthop, interfaceid=interfaceid,sequencenumber=sequencenumber)
@@ -49,16 +48,15 @@ class ControlledFlooding(GenericModel):
     msg = eventobj.eventcontent
     hdr = msg.header
     payload = msg.payload
-    logger.info(f"{self.componentname}-{self.componentinstancenumber} RECEIVED {str(eventobj)}")
+    logger.info("%s-%s RECEIVED %s", self.componentname, self.componentinstancenumber, eventobj)
     if hdr.messagetype == BroadcastingMessageTypes.SIMPLEFLOOD:
       if hdr.messageto == self.componentinstancenumber or hdr.messageto == MessageDestinationIdentifiers.NETWORKLAYERBROADCAST:  # Add if broadcast....
         if msg.uniqueid in self.broadcastdb:
           pass  # we have already handled this flooded message
         else:
           # Send to higher layers
-          evt: Event = copy.copy(eventobj)
-          evt.event = EventTypes.MFRB
-          self.send_up(evt)
+          # The message is not changed here, the received one is passed up without copying
+          self.send_up(Event(self, EventTypes.MFRB, msg, fromchannel=eventobj.fromchannel))
           # Also continue flooding once
           #time.sleep(random.randint(1, 3))
           event = Event(self, BroadcastingEventTypes.BROADCAST, payload)
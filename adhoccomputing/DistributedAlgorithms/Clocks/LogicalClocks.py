@@ -4,9 +4,7 @@ from datetime import datetime
 from enum import Enum 
 
 
-import matplotlib.pyplot as plt
 import networkx as nx
-from networkx.drawing.nx_agraph import graphviz_layout, to_agraph
 
 
 from ...Experimentation.Topology import Topology
@@ -41,11 +39,10 @@ class LogicalClock(GenericModel):
 
     if randomnumber == 0: 
       #perfrom an internalEvent
-      time.sleep(random.randint(0, 2))
-      self.send_self((Event(self, LogicalClockEventTypes.INTERNAL, None)))
+      self.send_self_after(random.randint(0, 2), Event(self, LogicalClockEventTypes.INTERNAL, None))
     else: 
       #send it to a random neighbour
-      self.send_self(Event(self, LogicalClockEventTypes.SEND, None))
+      self.send_self_after(random.randint(0, 2), Event(self, LogicalClockEventTypes.SEND, None))
 
   def senddown(self, eventobj: Event): 
       #increment the counter before sending
@@ -55,10 +52,10 @@ class LogicalClock(GenericModel):
       hdr = LogicalClockMessageHeader(LogicalClockMessageTypes.LCM, self.componentinstancenumber, destination)
       payload = LogicalClockMessagePayload(self.counter)
       message = GenericMessage(hdr, payload)
-      time.sleep(random.randint(0, 2))
+      # the random delay is on the SEND event, so the messages leave in the order of their counters
       self.send_down(Event(self, EventTypes.MFRT, message))
 
-      logger.info(f"Messaage sent from node {self.local_time(self.counter)} to node {destination}")
+      logger.info("Messaage sent from node %s to node %s", self.local_time(self.counter), destination)
 
 
   #this should serve as the on_receive
@@ -73,7 +70,7 @@ class LogicalClock(GenericModel):
     payload = incomingtimestamp
     self.counter = self.update_timestamp(incomingtimestamp, self.counter)
 
-    logger.info(f"Messaage received at node {self.local_time(self.counter)} from node {hdr.messagefrom}")
+    logger.info("Messaage received at node %s from node %s", self.local_time(self.counter), hdr.messagefrom)
 
     self.send_up(Event(self, EventTypes.MFRB, payload))
 
@@ -81,12 +78,12 @@ class LogicalClock(GenericModel):
   def on_internal(self, eventobj: Event): 
     #Increment counter so that we know something happened
     self.counter +=1 
-    logger.info(f"Internal event at node {self.local_time(self.counter)}")
+    logger.info("Internal event at node %s", self.local_time(self.counter))
     randomnumber = random.randint(0,1)
     if randomnumber == 0: 
       self.send_self(Event(self, LogicalClockEventTypes.INTERNAL, None))
     else: 
-      self.send_self(Event(self, LogicalClockEventTypes.SEND, None))
+      self.send_self_after(random.randint(0, 2), Event(self, LogicalClockEventTypes.SEND, None))
 
 
   def local_time(self, counter): 
@@ -119,10 +116,9 @@ class VectorClock(LogicalClock):
     randomnumber = random.randint(0, 1)
 
     if randomnumber == 0: 
-      time.sleep(random.randint(0, 2))
-      self.send_self(Event(self, LogicalClockEventTypes.INTERNAL, None))
+      self.send_self_after(random.randint(0, 2), Event(self, LogicalClockEventTypes.INTERNAL, None))
     elif randomnumber ==1: 
-      self.send_self(Event(self, LogicalClockEventTypes.SEND, None))
+      self.send_self_after(random.randint(0, 2), Event(self, LogicalClockEventTypes.SEND, None))
   
 
   def senddown(self, eventobj: Event): 
@@ -133,10 +129,9 @@ class VectorClock(LogicalClock):
     messagepayload = self.counter[:]
     payload = LogicalClockMessagePayload(messagepayload)
     message = GenericMessage(hdr, payload)
-    time.sleep(random.randint(0,2))
     self.send_down(Event(self, EventTypes.MFRT, message))
 
-    logger.info(f"Messaage sent from node {self.local_time(self.counter)} to node {destination}") 
+    logger.info("Messaage sent from node %s to node %s", self.local_time(self.counter), destination) 
 
 
   def on_message_from_bottom(self, eventobj: Event):
@@ -150,22 +145,21 @@ class VectorClock(LogicalClock):
     self.update_timestamp(incomingtimestamps, self.counter)
     self.send_up(Event(self, EventTypes.MFRB, None))
 
-    logger.info(f"Messaage received at node {self.local_time(self.counter)} from node {hdr.messagefrom}")
+    logger.info("Messaage received at node %s from node %s", self.local_time(self.counter), hdr.messagefrom)
 
 
   def on_internal(self, eventobj: Event):
     self.update_counter()
-    logger.info(f"Internal event at node {self.local_time(self.counter)}")
+    logger.info("Internal event at node %s", self.local_time(self.counter))
 
     randomnumber = random.randint(0,1)
     if randomnumber == 0: 
-      time.sleep(random.randint(0,2))
-      self.send_self(Event(self, LogicalClockEventTypes.INTERNAL, None))
+      self.send_self_after(random.randint(0,2), Event(self, LogicalClockEventTypes.INTERNAL, None))
     else: 
-      self.send_self(Event(self, LogicalClockEventTypes.SEND, None))
+      self.send_self_after(random.randint(0, 2), Event(self, LogicalClockEventTypes.SEND, None))
 
     #randomly decide whether to haev an internal or senddown event
-    self.send_self(Event(self, LogicalClockEventTypes.SEND, None))
+    self.send_self_after(random.randint(0, 2), Event(self, LogicalClockEventTypes.SEND, None))
 
 
   def update_timestamp(self, incoming_time_stamp, my_time_stamp): 
@@ -176,7 +170,7 @@ class VectorClock(LogicalClock):
 
 
   def update_counter(self):
-    logger.debug(f"{self.componentname} - {self.componentinstancenumber} COUNTERS= {self.counter}")
+    logger.debug("%s - %s COUNTERS= %s", self.componentname, self.componentinstancenumber, self.counter)
     self.counter[self.componentinstancenumber] +=1
 
   def __init__(self, componentname, componentinstancenumber, context=None, configurationparameters=None, num_worker_threads=1, topology=None):
@@ -51,14 +51,14 @@ class ElectionEchoExtinctionComponent(GenericModel):
       global message_count 
       message_count += 1
       if hdr.messagetype == ApplicationLayerMessageTypes.ACCEPT:
-        logger.debug(f"Node-{self.componentinstancenumber} says Node-{hdr.messagefrom} has sent {hdr.messagetype} message")
+        logger.debug("Node-%s says Node-%s has sent %s message", self.componentinstancenumber, hdr.messagefrom, hdr.messagetype)
       elif hdr.messagetype == ApplicationLayerMessageTypes.PROPOSE:
-        logger.debug(f"Node-{self.componentinstancenumber} says Node-{hdr.messagefrom} has sent {hdr.messagetype} message")
+        logger.debug("Node-%s says Node-%s has sent %s message", self.componentinstancenumber, hdr.messagefrom, hdr.messagetype)
       elif hdr.messagetype == ApplicationLayerMessageTypes.WAVE:
-        logger.debug(f"Node-{self.componentinstancenumber} get message from Node-{hdr.messagefrom} with tag {applmessage.payload.tag}")
+        logger.debug("Node-%s get message from Node-%s with tag %s", self.componentinstancenumber, hdr.messagefrom, applmessage.payload.tag)
         self.wave_message(applmessage.payload, hdr)
       elif hdr.messagetype == ApplicationLayerMessageTypes.ACCEPT_WAVE:
-        logger.debug(f"Node-{self.componentinstancenumber} says Node-{hdr.messagefrom} is ACCEPT_WAVE")
+        logger.debug("Node-%s says Node-%s is ACCEPT_WAVE", self.componentinstancenumber, hdr.messagefrom)
         self.accept_wave_message(applmessage.payload, hdr)
 
 
@@ -80,7 +80,7 @@ class ElectionEchoExtinctionComponent(GenericModel):
     self.send_down(Event(self, EventTypes.MFRT, proposalmessage))
 
   def on_agree(self, eventobj: Event):
-    logger.debug(f"Agreed on {eventobj.eventcontent}")
+    logger.debug("Agreed on %s", eventobj.eventcontent)
 
   def on_timer_expired(self, eventobj: Event):
     pass
@@ -88,7 +88,7 @@ class ElectionEchoExtinctionComponent(GenericModel):
 #TODO: If you call this before all on_inits, then things will go wrong...
   def initiate_process(self):
     self.neighbors = self.topology.G.neighbors(self.componentinstancenumber)
-    logger.debug(f"Process initiated {self.componentinstancenumber}")
+    logger.debug("Process initiated %s", self.componentinstancenumber)
     self.initiated = True
     for i in self.neighbors:
       destination = i
@@ -123,7 +123,7 @@ class ElectionEchoExtinctionComponent(GenericModel):
           self.waitingAccepts.append(i)
         
       elif self.parent > payload.tag: 
-        logger.debug(f"Node-{self.componentinstancenumber} says tag=={payload.tag} from Node-{hdr.messagefrom} is not accepted")
+        logger.debug("Node-%s says tag==%s from Node-%s is not accepted", self.componentinstancenumber, payload.tag, hdr.messagefrom)
         pass
       else: 
         destination = hdr.messagefrom
@@ -133,7 +133,7 @@ class ElectionEchoExtinctionComponent(GenericModel):
     else: 
       if self.parent != payload.tag:
         self.parent = hdr.messagefrom
-        logger.debug(f"Node-{self.componentinstancenumber} has new parent Node-{self.parent}")
+        logger.debug("Node-%s has new parent Node-%s", self.componentinstancenumber, self.parent)
         for i in self.neighbors:
           if i == hdr.messagefrom: 
             continue
@@ -98,24 +98,24 @@ class ElectionSpiraComponent(GenericModel):
     hdr = applmessage.header
     message_count += 1
     if hdr.messagetype == ApplicationLayerMessageTypes.ACCEPT:
-      logger.debug(f"Node-{self.componentinstancenumber} says Node-{hdr.messagefrom} has sent {hdr.messagetype} message")
+      logger.debug("Node-%s says Node-%s has sent %s message", self.componentinstancenumber, hdr.messagefrom, hdr.messagetype)
     elif hdr.messagetype == ApplicationLayerMessageTypes.ACCEPT2:
-      logger.debug(f"Node-{self.componentinstancenumber} is ACCEPTed Node-{hdr.messagefrom}")
+      logger.debug("Node-%s is ACCEPTed Node-%s", self.componentinstancenumber, hdr.messagefrom)
       self.accept_message_handler(applmessage.payload, hdr)
     elif hdr.messagetype == ApplicationLayerMessageTypes.CONNECT:
-      logger.debug(f'Node-{self.componentinstancenumber} wants to be connected with {hdr.messagefrom}')
+      logger.debug('Node-%s wants to be connected with %s', self.componentinstancenumber, hdr.messagefrom)
       self.connect_message_handler(applmessage.payload, hdr)
     elif hdr.messagetype == ApplicationLayerMessageTypes.INITIATE:
-      logger.debug(f'Node-{self.componentinstancenumber} take a initiate message from {hdr.messagefrom} with values (INITIATE, {applmessage.payload.weight},{applmessage.payload.level},{applmessage.payload.status}') 
+      logger.debug('Node-%s take a initiate message from %s with values (INITIATE, %s,%s,%s', self.componentinstancenumber, hdr.messagefrom, applmessage.payload.weight, applmessage.payload.level, applmessage.payload.status) 
       self.initiate_message_handler(applmessage.payload, hdr)
     elif hdr.messagetype == ApplicationLayerMessageTypes.TEST:
-      logger.debug(f"Node-{self.componentinstancenumber} is TESTed by Node-{hdr.messagefrom}")
+      logger.debug("Node-%s is TESTed by Node-%s", self.componentinstancenumber, hdr.messagefrom)
       self.test_message_handler(applmessage.payload, hdr)
     elif hdr.messagetype == ApplicationLayerMessageTypes.REJECT:
-      logger.debug(f"Node-{self.componentinstancenumber} is REJECTed by Node-{hdr.messagefrom}")
+      logger.debug("Node-%s is REJECTed by Node-%s", self.componentinstancenumber, hdr.messagefrom)
       self.reject_message_handler(applmessage.payload, hdr)
     elif hdr.messagetype == ApplicationLayerMessageTypes.REPORT:
-      logger.debug(f"Node-{self.componentinstancenumber} is REPORTed by Node-{hdr.messagefrom} with weight ===> {applmessage.payload.weight}")
+      logger.debug("Node-%s is REPORTed by Node-%s with weight ===> %s", self.componentinstancenumber, hdr.messagefrom, applmessage.payload.weight)
       self.report_message_handler(applmessage.payload, hdr)
 
     # except AttributeError:
@@ -239,7 +239,7 @@ class ElectionSpiraComponent(GenericModel):
     pass 
 
   def initialize_connect(self): 
-    logger.debug(f"Node-{self.componentinstancenumber} starts initializing")
+    logger.debug("Node-%s starts initializing", self.componentinstancenumber)
     destination = -1
     edge = self.branch_edges[0] 
     if edge[1] == self.componentinstancenumber: 
@@ -252,7 +252,7 @@ class ElectionSpiraComponent(GenericModel):
     self.send_down(Event(self, EventTypes.MFRT, msg))
 
   def on_agree(self, eventobj: Event):
-    logger.applog(f"Agreed on {eventobj.eventcontent}")
+    logger.applog("Agreed on %s", eventobj.eventcontent)
 
   def on_timer_expired(self, eventobj: Event):
     pass
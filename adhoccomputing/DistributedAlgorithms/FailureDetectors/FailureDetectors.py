@@ -27,7 +27,6 @@ class FailureDetectorMessagePayload(GenericMessagePayload):
 
 class FailureDetector(GenericModel):
   def on_tx_alive_message(self, eventobj: Event):
-    time.sleep(self.alivemessageperiod)  # Period of alive messages
     # Send down the I'm Alive mesage
     # logger.debug("I am alive....")
     hdr = FailureDetectorMessageHeader(FailureDetectorMessageTypes.IAMALIVE, self.componentinstancenumber,
@@ -35,24 +34,24 @@ class FailureDetector(GenericModel):
     payload = FailureDetectorMessagePayload(f"I am Node.{self.componentinstancenumber} and I am live ")
     failuredetectormessage = GenericMessage(hdr, payload)
     self.send_down(Event(self, EventTypes.MFRT, failuredetectormessage))
-    # Schedule the next I'm Alive message
-    self.send_self(Event(self, "txalivemessage", "timer for alive message"))
+    # Schedule the next I'm Alive message after the period of alive messages
+    self.send_self_after(self.alivemessageperiod, Event(self, "txalivemessage", "timer for alive message"))
 
   def on_message_from_bottom(self, eventobj: Event):
     try:
       failuredetectormessage = eventobj.eventcontent
       hdr = failuredetectormessage.header
       if hdr.messagetype == FailureDetectorMessageTypes.IAMALIVE:
-        logger.debug(f"Node-{self.componentinstancenumber} says Node-{hdr.messagefrom} has sent {hdr.messagetype} message")
+        logger.debug("Node-%s says Node-%s has sent %s message", self.componentinstancenumber, hdr.messagefrom, hdr.messagetype)
       else:
-        logger.debug(f"Node-{self.componentinstancenumber} says received {hdr.messagetype}")
+        logger.debug("Node-%s says received %s", self.componentinstancenumber, hdr.messagetype)
 
     except AttributeError:
       logger.error("Attribute Error")
 
   def on_init(self, eventobj: Event):
     self.alivemessageperiod = 1
-    self.send_self(Event(self, "txalivemessage", "timer for alive message"))
+    self.send_self_after(self.alivemessageperiod, Event(self, "txalivemessage", "timer for alive message"))
 
   def __init__(self, componentname, componentinstancenumber, context=None, configurationparameters=None, num_worker_threads=1, topology=None):
     super().__init__(componentname, componentinstancenumber, context, configurationparameters, num_worker_threads, topology)
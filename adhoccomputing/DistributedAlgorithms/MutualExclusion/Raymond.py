@@ -16,7 +16,6 @@ __status__ = "Production"
 __version__ = "0.0.1"
 
 from enum import Enum
-from time import sleep
 import networkx as nx
 
 from ...Experimentation.Topology import Topology
@@ -134,8 +133,10 @@ class MutualExclusionRaymondComponent(GenericModel):
         self.isPrivileged = True
 
         self.privilegeCount += 1
-        sleep(self.privilegeSleepAmount)
+        # The critical section lasts privilegeSleepAmount seconds, the component keeps handling requests meanwhile
+        self.set_timer(self.privilegeSleepAmount, self.release_privilege)
 
+    def release_privilege(self):
         self.isPrivileged = False
         self.pop()
 
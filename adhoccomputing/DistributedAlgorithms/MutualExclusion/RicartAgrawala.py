@@ -16,7 +16,6 @@ __status__ = "Production"
 __version__ = "0.0.1"
 
 from enum import Enum
-from time import sleep
 
 from ...Experimentation.Topology import Topology
 from ...GenericModel import GenericModel, GenericMessageHeader, GenericMessagePayload, GenericMessage
@@ -91,7 +90,7 @@ class MutualExclusionAgrawalaComponent(GenericModel):
                 eventobj.event = RicartAgrawalaEventTypes.REPLY
                 self.send_self(eventobj)
         else:
-            nextHop = Topology().get_next_hop(self.componentinstancenumber, messageTo)
+            nextHop = self.topology.get_next_hop(self.componentinstancenumber, messageTo)
             interfaceID = f"{self.componentinstancenumber}-{nextHop}"
 
             if nextHop != inf and nextHop != self.componentinstancenumber:
@@ -141,8 +140,10 @@ class MutualExclusionAgrawalaComponent(GenericModel):
         self.receivedReplies.clear()
 
         self.privilegeCount += 1
-        sleep(self.privilegeSleepAmount)
+        # The critical section lasts privilegeSleepAmount seconds, the component keeps handling requests meanwhile
+        self.set_timer(self.privilegeSleepAmount, self.release_privilege)
 
+    def release_privilege(self):
         self.isPrivileged = False
         self.send_replies_to_deferred_requests()
 
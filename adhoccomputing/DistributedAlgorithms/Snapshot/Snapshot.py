@@ -250,7 +250,7 @@ class LaiYangComponentModel(SnapshotComponentModel):
 
         chnl_state = list(set_sent - set_recv)
         self.global_state[channel] = chnl_state
-        logger.debug(f"State of channel: {channel}=chnl_state")
+        logger.debug("State of channel: %s=chnl_state", channel)
 
     def on_gsu_recv(self, state: LaiYangState):
         if not self.init_snapshot:
@@ -37,7 +37,7 @@ class ApplicationLayerMessagePayload(GenericMessagePayload):
 
 class WaveAwerbuchComponent(GenericModel):
   def on_init(self, eventobj: Event):
-    logger.debug(f"Initializing {self.componentname}.{self.componentinstancenumber}")
+    logger.debug("Initializing %s.%s", self.componentname, self.componentinstancenumber)
     neighbour_list = self.topology.get_neighbors(self.componentinstancenumber)
     self.NeighbourList = neighbour_list
     self.Unvisited = neighbour_list.copy()
@@ -63,16 +63,16 @@ class WaveAwerbuchComponent(GenericModel):
       applmessage = eventobj.eventcontent
       hdr = applmessage.header
       if hdr.messagetype == ApplicationLayerMessageTypes.DISCOVER:
-        logger.debug(f"Node-{self.componentinstancenumber} says Node-{hdr.messagefrom} has sent {hdr.messagetype} message")
+        logger.debug("Node-%s says Node-%s has sent %s message", self.componentinstancenumber, hdr.messagefrom, hdr.messagetype)
         self.send_self(Event(self, "discover", applmessage))
       elif hdr.messagetype == ApplicationLayerMessageTypes.VISITED:
-        logger.debug(f"Node-{self.componentinstancenumber} says Node-{hdr.messagefrom} has sent {hdr.messagetype} message")
+        logger.debug("Node-%s says Node-%s has sent %s message", self.componentinstancenumber, hdr.messagefrom, hdr.messagetype)
         self.send_self(Event(self, "visited", applmessage))
       elif hdr.messagetype == ApplicationLayerMessageTypes.RETURN:
-        logger.debug(f"Node-{self.componentinstancenumber} says Node-{hdr.messagefrom} has sent {hdr.messagetype} message")
+        logger.debug("Node-%s says Node-%s has sent %s message", self.componentinstancenumber, hdr.messagefrom, hdr.messagetype)
         self.send_self(Event(self, "return", applmessage))
       elif hdr.messagetype == ApplicationLayerMessageTypes.ACK:
-        logger.debug(f"Node-{self.componentinstancenumber} says Node-{hdr.messagefrom} has sent {hdr.messagetype} message")
+        logger.debug("Node-%s says Node-%s has sent %s message", self.componentinstancenumber, hdr.messagefrom, hdr.messagetype)
         self.send_self(Event(self, "ack", applmessage))
     except AttributeError:
       logger.error("Attribute Error")
@@ -112,10 +112,10 @@ class WaveAwerbuchComponent(GenericModel):
         proposalmessage = GenericMessage(hdr_new, payload)
         self.send_down(Event(self, EventTypes.MFRT, proposalmessage))
         self.numMesg += 1
-        logger.debug(f"I am Node-{self.componentinstancenumber} local number messages sent is {self.numMesg}")
+        logger.debug("I am Node-%s local number messages sent is %s", self.componentinstancenumber, self.numMesg)
       else:
-        logger.debug(f"I am Node-{self.componentinstancenumber} local number messages sent is {self.numMesg}")
-        logger.debug(f"I am Node-{self.componentinstancenumber}, algorithm is finished ")
+        logger.debug("I am Node-%s local number messages sent is %s", self.componentinstancenumber, self.numMesg)
+        logger.debug("I am Node-%s, algorithm is finished ", self.componentinstancenumber)
 
     else:
       destination = random.choice(self.Unvisited)
@@ -126,7 +126,7 @@ class WaveAwerbuchComponent(GenericModel):
       self.send_down(Event(self, EventTypes.MFRT, proposalmessage))
       self.numMesg += 1
       self.Unvisited.remove(destination)
-      logger.debug(f"I am Node-{self.componentinstancenumber} sending DISCOVER to {destination}")
+      logger.debug("I am Node-%s sending DISCOVER to %s", self.componentinstancenumber, destination)
 
   def on_visited(self, eventobj: Event):
     applmessage = eventobj.eventcontent
@@ -48,7 +48,7 @@ class ApplicationLayerComponent_Cidon(GenericModel):
   #NeighbourList = {}
 
   def on_init(self, eventobj: Event):
-    logger.debug(f"Initializing {self.componentname}.{self.componentinstancenumber}")
+    logger.debug("Initializing %s.%s", self.componentname, self.componentinstancenumber)
     self.NeighbourList = self.topology.get_neighbors(self.componentinstancenumber)
     self.state = NodeState.IDLE
     self.mark = {}
@@ -143,8 +143,8 @@ class ApplicationLayerComponent_Cidon(GenericModel):
       else:
         pass
     if self.componentinstancenumber == source:
-      logger.debug(f"I am Node-{self.componentinstancenumber} local number messages sent is {self.numMesg}")
-      logger.debug(f"Node-{self.componentinstancenumber} says all nodes were discovered, algorithm is finished")
+      logger.debug("I am Node-%s local number messages sent is %s", self.componentinstancenumber, self.numMesg)
+      logger.debug("Node-%s says all nodes were discovered, algorithm is finished", self.componentinstancenumber)
       pass #  terminate application
     else:
       for i in self.NeighbourList:
@@ -155,7 +155,7 @@ class ApplicationLayerComponent_Cidon(GenericModel):
           proposalmessage = GenericMessage(hdr_new, payload)
           self.send_down(Event(self, EventTypes.MFRT, proposalmessage))
           self.numMesg += 1
-          logger.debug(f"I am Node-{self.componentinstancenumber} local number messages sent is {self.numMesg}")
+          logger.debug("I am Node-%s local number messages sent is %s", self.componentinstancenumber, self.numMesg)
           return
 
   def __init__(self, componentname, componentinstancenumber, topology=None):
@@ -68,8 +68,8 @@ class TarrysTraverse(GenericModel):
       else: # Else, send the token back to the parent
         if parent_for_token == -1: # If I am the initiator, traversing is completed
           logger.debug("->".join(payload))
-          logger.debug(f"TRAVERSING IS COMPLETED IN {str(len(payload))} hops")
-          logger.debug(f"Graph had {self.topology.G.number_of_edges()} edges")
+          logger.debug("TRAVERSING IS COMPLETED IN %s hops", len(payload))
+          logger.debug("Graph had %s edges", self.topology.G.number_of_edges())
 
           return
         else:
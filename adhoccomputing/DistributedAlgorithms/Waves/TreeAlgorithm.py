@@ -15,7 +15,7 @@ class TreeNode(GenericModel):
       super().__init__(componentname, componentinstancenumber, context, configurationparameters, num_worker_threads, topology)
 
   def on_init(self, eventobj: Event):
-    logger.debug(f"Initializing {self.componentname}.{self.componentinstancenumber}")
+    logger.debug("Initializing %s.%s", self.componentname, self.componentinstancenumber)
 
   def on_message_from_bottom(self, eventobj: Event):
     for ch in self.unvisitedNeighbours:
@@ -30,7 +30,7 @@ class TreeNode(GenericModel):
       self.decide()
     elif len(self.unvisitedNeighbours) == 1:
       self.parent = self.unvisitedNeighbours[0]
-      logger.debug(f"{self.componentname}.{self.componentinstancenumber} sends message to {self.parent.componentname}.{self.parent.componentinstancenumber}")
+      logger.debug("%s.%s sends message to %s.%s", self.componentname, self.componentinstancenumber, self.parent.componentname, self.parent.componentinstancenumber)
       self.parent.trigger_event(Event(self, EventTypes.MFRT, eventobj.eventcontent))
     else:
       #do nothing
@@ -42,11 +42,11 @@ class TreeNode(GenericModel):
 
     if len(self.connectors[ConnectorTypes.DOWN]) == 1:
       self.parent = self.unvisitedNeighbours[0]
-      logger.debug(f"{self.componentname}.{self.componentinstancenumber} sends message to {self.parent.componentname}.{self.parent.componentinstancenumber}")
+      logger.debug("%s.%s sends message to %s.%s", self.componentname, self.componentinstancenumber, self.parent.componentname, self.parent.componentinstancenumber)
       self.send_down(Event(self, EventTypes.MFRT, None))
       self.unvisitedNeighbours = []
 
   def decide(self):
-    logger.debug(f"{self.componentname}.{self.componentinstancenumber} decides.")
-    logger.debug(f"End Time: {time.time()}")
+    logger.debug("%s.%s decides.", self.componentname, self.componentinstancenumber)
+    logger.debug("End Time: %s", time.time())
 
@@ -7,6 +7,7 @@ import sys, os, signal
 import argparse
 import configparser
 from adhoccomputing.Generics import *
+from adhoccomputing.Distribution.StreamHub import AHCRendezvous, AHCStreamHub
 
 #Should there be need we can extend
 class AHCBaseManager(BaseManager): pass
@@ -15,17 +16,38 @@ class AHCManagerType(Enum):
     AHC_SERVER = "ahc_server"
     AHC_CLIENT = "ahc_client"
 
+# The manager server is the rendezvous of the AHCStreamHubs of the hosts, which then stream events to each other
+# directly; get_queue returns queues that live in the server and every put/get is a call to it.
+# The authkey is the authkey argument, the AHC_AUTHKEY environment variable or the AuthKey of the config section, the
+# hubs authenticate their connections with it as well. There is no built-in key: a server without one generates a
+# random key and prints it to stderr for the clients (not to the logger, whose records may be shipped to a
+# collector), a client without one cannot connect.
 class AHCManager():
     queues=[]
-    def __init__(self, type:AHCManagerType, argv) -> None:
+    rendezvous = AHCRendezvous()
+    def __init__(self, type:AHCManagerType, argv, authkey=None, address=None) -> None:
         self.argv = argv
-        self.authkey = b"01032016"
-        self.address = self.parse_args(self.argv)
+        conf = self.read_config(self.argv)
+        self.address = address if address is not None else self.parse_args(self.argv)
+        if authkey is not None:
+            self.authkey = authkey
+        elif os.environ.get("AHC_AUTHKEY"):
+            self.authkey = os.environ["AHC_AUTHKEY"].encode()
+        elif conf is not None and 'AuthKey' in conf:
+            self.authkey = conf['AuthKey'].encode()
+        else:
+            if type != AHCManagerType.AHC_SERVER:
+                raise ValueError("No authkey for the AHCManager client, pass authkey, set AHC_AUTHKEY or AuthKey in the config")
+            self.authkey = os.urandom(16).hex().encode()
+            logger.warning("No authkey is set, the AHCManager server generated one and printed it to stderr")
+            print(f"AHC_AUTHKEY={self.authkey.decode()}", file=sys.stderr, flush=True)
         AHCBaseManager.register('create_and_return_queue', callable=self.create_and_return_queue)
+        AHCBaseManager.register('get_rendezvous', callable=self.get_rendezvous_instance)
         self.ahcbasemanager = AHCBaseManager(address=self.address, authkey=self.authkey)
         if type==AHCManagerType.AHC_SERVER:
             logger.debug(f"{self.address}")
             self.ahcbaseserver = self.ahcbasemanager.get_server()
+            self.address = self.ahcbaseserver.address
         else:
             if type==AHCManagerType.AHC_CLIENT:
                 pass
@@ -41,6 +63,17 @@ class AHCManager():
         except:
             return None
       
+    def get_rendezvous_instance(self):
+        return self.rendezvous
+
+    # The rendezvous proxy of a connected client
+    def get_rendezvous(self):
+        return self.ahcbasemanager.get_rendezvous()
+
+    # The stream hub of this host, registered at the rendezvous of the connected manager
+    def create_hub(self, name, address=("127.0.0.1", 0), batchsize=64, flushinterval=0.001):
+        return AHCStreamHub(name, self.get_rendezvous(), self.authkey, address, batchsize, flushinterval)
+
     def create_and_return_queue(self, maxsize):
         q = Queue(maxsize = maxsize)
         #q.put("Deneme")
@@ -48,33 +81,40 @@ class AHCManager():
         return q
 
             
-    def parse_args(self, argv):
+    # The section of the config file given by -c/--conf_file and -s/--section, None if there is none
+    def read_config(self, argv):
+        if argv is None:
+            return None
         config = configparser.ConfigParser()
+        conf_parser = argparse.ArgumentParser(
+        description=__doc__, # printed with -h/--help
+        # Don't mess with format of description
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        # Turn off help, so we print all options in response to -h
+        add_help=False
+        )
+        conf_parser.add_argument("-c", "--conf_file",
+                        help="Specify config file", metavar="FILE")
+        conf_parser.add_argument("-s", "--section",
+                        help="Specify config file", metavar="FILE")
+        
+        args, remaining_argv = conf_parser.parse_known_args()
+        if args.conf_file:
+            config.read(args.conf_file)
+            if (args.section in config):
+                return config[args.section]
+        return None
+
+    def parse_args(self, argv):
         if argv is None:
             logger.debug(f"Usage: {__name__} -c (--config_file)")
         else:
-            argv = sys.argv
-            conf_parser = argparse.ArgumentParser(
-            description=__doc__, # printed with -h/--help
-            # Don't mess with format of description
-            formatter_class=argparse.RawDescriptionHelpFormatter,
-            # Turn off help, so we print all options in response to -h
-            add_help=False
-            )
-            conf_parser.add_argument("-c", "--conf_file",
-                            help="Specify config file", metavar="FILE")
-            conf_parser.add_argument("-s", "--section",
-                            help="Specify config file", metavar="FILE")
-            
-            args, remaining_argv = conf_parser.parse_known_args()
+            conf = self.read_config(argv)
             DomainName = ""
             Port = 9090
-            if args.conf_file:
-                config.read(args.conf_file)
-                if (args.section in config):
-                    conf = config[args.section]
-                    DomainName = conf['DomainName']
-                    Port = conf['Port']
+            if conf is not None:
+                DomainName = conf['DomainName']
+                Port = int(conf['Port'])
 
             logger.debug(f"{DomainName}:{Port}  will be the manager address")
             address = (DomainName, Port)
@@ -0,0 +1,59 @@
+import queue
+from multiprocessing.connection import wait
+from ..Generics import *
+
+
+# Waits on the control pipe of a NodeProcess or LogicalChannelProcess and on its inbound queues at once, so an idle
+# process sleeps in the kernel instead of probing every queue in a loop. A multiprocessing.Queue is waited on through
+# the pipe it reads from; queues without one (the proxies of a SyncManager) are probed every pollinterval seconds,
+# which bounds their wake-up latency. Queues with a doorbell (SharedMemoryRing, StreamQueue) are waited on through it,
+# their producer rings it only when the queue is armed; ringpollinterval bounds the wake-up latency if the producer
+# missed the arming.
+class InboundMultiplexer:
+    pollinterval = 0.01
+    ringpollinterval = 0.1
+    maxbatchsize = 64  # events taken from one queue per wake-up, so a busy queue does not starve the others
+
+    def __init__(self, conn, queues):
+        self.conn = conn
+        self.readers = {}
+        self.polled = []
+        self.rings = {}
+        for q in queues:
+            reader = getattr(q, "_reader", None)
+            if hasattr(q, "doorbell"):
+                self.rings[q.doorbell] = q
+            elif reader is None:
+                self.polled.append(q)
+            else:
+                self.readers[reader] = q
+
+    # Blocks until the control pipe or a queue is readable and returns (True if the control pipe is readable,
+    # the events taken from the queues)
+    def wait(self):
+        timeout = self.pollinterval if self.polled else self.ringpollinterval if self.rings else None
+        for ring in self.rings.values():
+            if not ring.arm():
+                timeout = 0
+        ready = wait([self.conn, *self.readers, *self.rings], timeout)
+        events = []
+        for reader in ready:
+            if reader in self.readers:
+                self.drain(self.readers[reader], events)
+            elif reader in self.rings:
+                self.rings[reader].clear_doorbell()
+        for q in self.polled:
+            self.drain(q, events)
+        for ring in self.rings.values():
+            ring.disarm()
+            self.drain(ring, events)
+        return self.conn in ready, events
+
+    def drain(self, q, events):
+        try:
+            for i in range(self.maxbatchsize):
+                events.append(q.get_nowait())
+        except queue.Empty:
+            pass
+        except Exception as ex:
+            logger.critical(f"Exception in InboundMultiplexer {ex}")
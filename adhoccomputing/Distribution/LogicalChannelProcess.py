@@ -1,8 +1,8 @@
 
 import queue
 from multiprocessing import Process, Queue, Pipe
-import networkx as nx
 from ..Generics import *
+from .InboundMultiplexer import InboundMultiplexer
 import time
 import os, sys, signal
 
@@ -26,9 +26,13 @@ class LogicalChannelProcess(Process):
 	def run(self):
 		signal.signal(signal.SIGINT, self.ctrlc_signal_handler)
 		self.ch = self.channeltype(self.channeltype.__name__, self.componentinstancenumber,child_conn=self.child_conn, node_queues=self.node_queues, channel_queues=self.channel_queues)
-		polltime=0.00001
+		inbound = []
+		if self.channel_queues[self.src][self.dest] is not None:
+			inbound.append(self.channel_queues[self.src][self.dest])
+		self.inbound = InboundMultiplexer(self.child_conn, inbound)
 		while(True):
-			if self.child_conn.poll(polltime):
+			controlready, events = self.inbound.wait()
+			if controlready:
 				ev:Event = self.child_conn.recv()
 				match ev.event:
 					case EventTypes.INIT:
@@ -39,13 +43,6 @@ class LogicalChannelProcess(Process):
 						return
 					case _:
 						self.ch.trigger_event(ev)
-			if self.channel_queues[self.src][self.dest] is not None:
-				try:
-					ev:Event = self.channel_queues[self.src][self.dest].get(block=True, timeout=polltime)
-					if ev is not None:
-						self.ch.trigger_event(ev)
-				except queue.Empty:
-					pass
-				except Exception as ex:
-					logger.critical(f"Exception in LogicalChannelProcess {ex}")
-					pass      
+			for ev in events:
+				if ev is not None:
+					self.ch.trigger_event(ev)
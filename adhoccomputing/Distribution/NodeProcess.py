@@ -2,8 +2,8 @@
 
 import queue
 from multiprocessing import Process, Queue, Pipe
-import networkx as nx
 from ..Generics import *
+from .InboundMultiplexer import InboundMultiplexer
 import time
 import os, sys, signal
 
@@ -26,9 +26,15 @@ class NodeProcess(Process):
         signal.signal(signal.SIGINT, self.ctrlc_signal_handler)
         #self, componentname, componentinstancenumber, context=None, configurationparameters=None, num_worker_threads=1, topology=None, child_conn=None, node_queues=None, channel_queues=None
         self.node = self.nodetype(self.nodetype.__name__, self.componentinstancenumber, context=None, configurationparameters=None, num_worker_threads=1, topology=None, child_conn = self.child_conn, node_queues=self.node_queues, channel_queues=self.channel_queues)
-        polltime=0.00000001
+        # the inbound queue the channels towards this node put into, see Topology.mp_construct_sdr_topology
+        dest = int(self.componentinstancenumber)
+        inbound = []
+        if self.node_queues is not None:
+            inbound = list({id(queues[dest]): queues[dest] for queues in self.node_queues.values() if dest in queues}.values())
+        self.inbound = InboundMultiplexer(self.child_conn, inbound)
         while(True):
-            if self.child_conn.poll(polltime):
+            controlready, events = self.inbound.wait()
+            if controlready:
                 ev:Event = self.child_conn.recv()
                 match ev.event:
                     case EventTypes.INIT:
@@ -39,18 +45,5 @@ class NodeProcess(Process):
                         return
                     case _:
                         self.node.trigger_event(ev)
-            # probe queues from channels
-            dest = int(self.componentinstancenumber)
-            if self.node_queues is not None:
-                number_of_nodes = len(self.node_queues[0])
-                for i in range(number_of_nodes):
-                    src = i
-                    try:
-                        if self.node_queues[dest][src] is not None:
-                            ev = self.node_queues[src][dest].get(block=True, timeout=polltime)
-                            self.node.trigger_event(ev)
-                    except queue.Empty:
-                        pass
-                    except Exception as ex:
-                        logger.critical(f"Exception in LogicalChannelProcess {ex}")
-                        pass
+            for ev in events:
+                self.node.trigger_event(ev)
@@ -0,0 +1,109 @@
+from multiprocessing import Process
+from threading import Thread, Condition, Lock
+from ..Generics import *
+from .InboundMultiplexer import InboundMultiplexer
+import time
+import sys, signal
+
+
+# The events of the cut edges from one partition to another. put() only appends to the pending batch; the batch is
+# sent as one item of the transport (a multiprocessing.Queue or a SharedMemoryRing) when it has batchsize events, or
+# by the flusher thread flushinterval seconds after its first event, so one pickle and one wake-up of the receiver
+# carry many events. The flusher waits without a timeout while nothing is pending.
+class BatchedLink:
+
+    def __init__(self, transport, batchsize=64, flushinterval=0.001):
+        self.transport = transport
+        self.batchsize = batchsize
+        self.flushinterval = flushinterval
+        self.setup()
+
+    def setup(self):
+        self.pending = []
+        self.condition = Condition()
+        self.sendlock = Lock()  # keeps the batches in order when the flusher and put() send at the same time
+        self.flusher = None
+
+    def __getstate__(self):
+        return {"transport": self.transport, "batchsize": self.batchsize, "flushinterval": self.flushinterval}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.setup()
+
+    def put(self, event):
+        with self.condition:
+            self.pending.append(event)
+            if self.flusher is None:
+                self.flusher = Thread(target=self.run_flusher, name="BatchedLink")
+                self.flusher.daemon = True
+                self.flusher.start()
+            if len(self.pending) == 1:
+                self.condition.notify()
+            full = len(self.pending) >= self.batchsize
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self.sendlock:
+            with self.condition:
+                batch = self.pending
+                self.pending = []
+            if batch:
+                self.transport.put(batch)
+
+    def run_flusher(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+            time.sleep(self.flushinterval)
+            self.flush()
+
+
+# Hosts the nodes of one partition of the topology and the channels between them in a single process, see
+# Topology.mp_construct_partitioned_topology. The channels of the cut edges deliver into the BatchedLink towards the
+# partition of the receiver through their node_queues, and the batches of the other partitions are delivered to the
+# receiving nodes here.
+class PartitionProcess(Process):
+    def __init__(self, partitionid, G, nodes, nodetype, channeltype, child_conn, outbound, inbound):
+        self.partitionid = partitionid
+        self.G = G
+        self.nodes = nodes
+        self.nodetype = nodetype
+        self.channeltype = channeltype
+        self.child_conn = child_conn
+        self.outbound = outbound  # {(src, dest): BatchedLink} of the cut edges leaving the partition
+        self.inbound = inbound  # transports of the links towards the partition
+        super(PartitionProcess, self).__init__()
+
+    def ctrlc_signal_handler(self, sig, frame):
+        time.sleep(1)
+        sys.exit(0)
+
+    def run(self):
+        from ..Experimentation.Topology import Topology
+        signal.signal(signal.SIGINT, self.ctrlc_signal_handler)
+        self.topology = Topology(f"partition-{self.partitionid}")
+        self.topology.construct_partition(self.G, self.nodes, self.nodetype, self.channeltype, self.outbound)
+        self.multiplexer = InboundMultiplexer(self.child_conn, self.inbound)
+        while(True):
+            controlready, batches = self.multiplexer.wait()
+            if controlready:
+                ev:Event = self.child_conn.recv()
+                match ev.event:
+                    case EventTypes.INIT:
+                        self.topology.start()
+                    case EventTypes.EXIT:
+                        self.topology.exit()
+                        time.sleep(1) # For clearing up the exit events of components
+                        for link in set(self.outbound.values()):
+                            link.flush()
+                        return
+                    case _:
+                        for node in self.topology.nodes.values():
+                            node.trigger_event(ev)
+            for batch in batches:
+                for ev in batch:
+                    dest = int(ev.fromchannel.split("-")[1])
+                    self.topology.nodes[dest].trigger_event(ev)
@@ -0,0 +1,144 @@
+import pickle
+import queue
+import struct
+import threading
+import time
+from multiprocessing import Pipe
+from multiprocessing.shared_memory import SharedMemory
+
+LENGTH = struct.Struct("<I")
+# Indices of the aligned 8-byte counters in a cast memoryview, each on its own cache line; an item assignment is a
+# single store, while struct.pack_into clears the target first and a reader could see the zero
+HEAD = 0  # read position, written by the consumer only
+TAIL = 8  # write position, written by the producer only
+SLEEPING = 16  # set by the consumer before it blocks on the doorbell
+DATAOFFSET = 192
+
+
+# Opens an existing block without handing it to the resource tracker, only the creator unlinks it
+# (the processes of a topology share the resource tracker of the creator, registering the block again is a no-op)
+def attach_shared_memory(name):
+    try:
+        return SharedMemory(name, track=False)
+    except TypeError:  # before Python 3.13
+        return SharedMemory(name)
+
+
+# A single-producer single-consumer ring buffer in shared memory carrying pickled events, used instead of a
+# multiprocessing.Queue between a NodeProcess and a LogicalChannelProcess, see Topology.mp_construct_sdr_topology.
+# A record is a 4-byte length and the pickled event, and may wrap around the end of the buffer. head and tail are
+# byte counters that only grow and each is written by one side only, so no lock is shared between the processes;
+# the threads of the producer process take a local lock. A full ring blocks the producer like a bounded Queue.
+# The consumer sets the sleeping flag before it blocks on the doorbell pipe, and the producer rings it only then,
+# so a busy ring costs no system calls. The flag and the tail can pass each other, hence the consumer never blocks
+# longer than InboundMultiplexer.ringpollinterval.
+class SharedMemoryRing:
+    backoff = 0.00005  # seconds the producer sleeps while the ring is full
+
+    def __init__(self, capacity=1 << 20):
+        self.capacity = capacity
+        self.shm = SharedMemory(create=True, size=DATAOFFSET + capacity)
+        self.shm.buf[:DATAOFFSET] = bytes(DATAOFFSET)
+        self.doorbell, self.doorbellwriter = Pipe(duplex=False)
+        self.setup()
+
+    def setup(self):
+        self.buf = self.shm.buf
+        self.counters = self.buf[:DATAOFFSET].cast("Q")
+        self.producerlock = threading.Lock()
+
+    # Spawned processes attach to the block by name, forked ones inherit the mapping
+    def __getstate__(self):
+        return {"name": self.shm.name, "capacity": self.capacity, "doorbell": self.doorbell, "doorbellwriter": self.doorbellwriter}
+
+    def __setstate__(self, state):
+        self.capacity = state["capacity"]
+        self.doorbell = state["doorbell"]
+        self.doorbellwriter = state["doorbellwriter"]
+        self.shm = attach_shared_memory(state["name"])
+        self.setup()
+
+    def write(self, position, data):
+        start = position % self.capacity
+        first = min(len(data), self.capacity - start)
+        self.buf[DATAOFFSET + start:DATAOFFSET + start + first] = data[:first]
+        if first < len(data):
+            self.buf[DATAOFFSET:DATAOFFSET + len(data) - first] = data[first:]
+
+    def read(self, position, length):
+        start = position % self.capacity
+        if start + length <= self.capacity:
+            return self.buf[DATAOFFSET + start:DATAOFFSET + start + length]
+        first = self.capacity - start
+        return bytes(self.buf[DATAOFFSET + start:DATAOFFSET + self.capacity]) + bytes(self.buf[DATAOFFSET:DATAOFFSET + length - first])
+
+    def put(self, obj, block=True, timeout=None):
+        data = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+        record = LENGTH.pack(len(data)) + data
+        if len(record) > self.capacity:
+            raise ValueError(f"Event of {len(data)} bytes does not fit into a ring of {self.capacity} bytes")
+        counters = self.counters
+        with self.producerlock:
+            tail = counters[TAIL]
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while self.capacity - (tail - counters[HEAD]) < len(record):
+                if not block or (deadline is not None and time.monotonic() > deadline):
+                    raise queue.Full
+                time.sleep(self.backoff)
+            self.write(tail, record)
+            counters[TAIL] = tail + len(record)
+            if counters[SLEEPING]:
+                counters[SLEEPING] = 0
+                self.doorbellwriter.send_bytes(b"\x01")
+
+    def put_nowait(self, obj):
+        self.put(obj, block=False)
+
+    def get_nowait(self):
+        counters = self.counters
+        head = counters[HEAD]
+        if head == counters[TAIL]:
+            raise queue.Empty
+        length = LENGTH.unpack(self.read(head, LENGTH.size))[0]
+        obj = pickle.loads(self.read(head + LENGTH.size, length))
+        counters[HEAD] = head + LENGTH.size + length
+        return obj
+
+    def empty(self):
+        return self.counters[HEAD] == self.counters[TAIL]
+
+    # Called by the consumer before it blocks, returns False if there is something to read and it must not block
+    def arm(self):
+        self.counters[SLEEPING] = 1
+        if not self.empty():
+            self.counters[SLEEPING] = 0
+            return False
+        return True
+
+    def disarm(self):
+        self.counters[SLEEPING] = 0
+
+    def clear_doorbell(self):
+        while self.doorbell.poll():
+            self.doorbell.recv_bytes()
+
+    # SharedMemory.close fails while the counters view exists
+    def close(self):
+        if self.counters is not None:
+            self.counters.release()
+            self.counters = None
+            self.buf = None
+            self.shm.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    # Removes the block, processes that have it mapped keep using it until they exit
+    def unlink(self):
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
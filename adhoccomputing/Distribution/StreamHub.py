@@ -0,0 +1,265 @@
+import collections
+import os
+import pickle
+import queue
+import socket
+import time
+from multiprocessing import Pipe
+from multiprocessing.connection import Listener, Client
+from threading import Thread, Condition, Lock
+from ..Generics import *
+from .PartitionProcess import BatchedLink
+
+
+# Host name -> listening address of the AHCStreamHubs, served by the AHCManager. The manager only does this
+# rendezvous, the events go directly between the hubs.
+class AHCRendezvous:
+
+    def __init__(self):
+        self.addresses = {}
+
+    def register(self, name, address):
+        self.addresses[name] = address
+
+    def lookup(self, name):
+        return self.addresses.get(name)
+
+    def hosts(self):
+        return dict(self.addresses)
+
+
+# Shuts the socket down before closing it, closing alone does not wake a receiver thread blocked on it
+def close_connection(conn):
+    try:
+        with socket.socket(fileno=os.dup(conn.fileno())) as sock:
+            sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    conn.close()
+
+
+# The inbound end of a logical queue. The receiver thread of the hub puts into it; it has the doorbell interface of
+# SharedMemoryRing, so a NodeProcess waits on it with the InboundMultiplexer like on any other queue.
+class StreamQueue:
+
+    def __init__(self):
+        self.items = collections.deque()
+        self.condition = Condition()
+        self.armed = False
+        self.doorbell, self.doorbellwriter = Pipe(duplex=False)
+
+    def put(self, obj, block=True, timeout=None):
+        with self.condition:
+            self.items.append(obj)
+            self.condition.notify()
+            if self.armed:
+                self.armed = False
+                self.doorbellwriter.send_bytes(b"\x01")
+
+    def get(self, block=True, timeout=None):
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.items, timeout if block else 0):
+                raise queue.Empty
+            return self.items.popleft()
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def empty(self):
+        return not self.items
+
+    def arm(self):
+        with self.condition:
+            self.armed = not self.items
+            return self.armed
+
+    def disarm(self):
+        with self.condition:
+            self.armed = False
+
+    def clear_doorbell(self):
+        while self.doorbell.poll():
+            self.doorbell.recv_bytes()
+
+
+# The outbound end of a logical queue on another host, put() adds the object to the batch of the stream to that host.
+# The link is looked up on every put, so the queue moves to the new connection when the hub reconnects.
+class RemoteQueue:
+
+    def __init__(self, hub, host, queuename):
+        self.hub = hub
+        self.host = host
+        self.queuename = queuename
+
+    def put(self, obj, block=True, timeout=None):
+        link = self.hub.links.get(self.host)
+        if link is None:
+            link = self.hub.get_link(self.host)
+        link.put((self.queuename, obj))
+
+    def put_nowait(self, obj):
+        self.put(obj)
+
+
+# Sends a batch of (queuename, object) pairs as one frame of the stream. If the connection is broken, the hub drops
+# the link and the batch is lost; the next put to the host connects again.
+class StreamTransport:
+
+    def __init__(self, hub, host, conn):
+        self.hub = hub
+        self.host = host
+        self.conn = conn
+
+    def put(self, batch):
+        try:
+            self.conn.send_bytes(pickle.dumps(batch, pickle.HIGHEST_PROTOCOL))
+        except OSError as ex:
+            logger.error("AHCStreamHub %s lost %d events to %s: %s", self.hub.name, len(batch), self.host, ex)
+            self.hub.drop_connection(self.host, self.conn)
+
+
+# Direct event streams between hosts. Each hub listens on a TCP address registered at the rendezvous under its name.
+# The first time a hub sends to another host it looks the host up and connects, and both hubs then use that single
+# authenticated connection in both directions for all the logical queues between them. If the two connect at the
+# same time, the connection of the host with the smaller name is kept: the other one is answered with "dup" and its
+# hub waits for the winning connection instead. A connection is named by a random token; a hub that lost its
+# connection to a host sends the token of the lost one when it connects again, and the host replaces its link if it
+# still has that connection, whose loss it may not have noticed yet. Connection frames are length prefixed (multiprocessing.connection),
+# and the objects put into the RemoteQueues of a host are batched into one frame per batchsize objects or per
+# flushinterval seconds. A hub belongs to the process that created it.
+class AHCStreamHub:
+    connecttimeout = 10.0
+
+    def __init__(self, name, rendezvous, authkey, address=("127.0.0.1", 0), batchsize=64, flushinterval=0.001):
+        self.name = name
+        self.rendezvous = rendezvous
+        self.authkey = authkey
+        self.batchsize = batchsize
+        self.flushinterval = flushinterval
+        self.inbound = {}  # queuename: StreamQueue
+        self.links = {}  # host name: BatchedLink of the connection to the host
+        self.tokens = {}  # host name: token of the last connection to the host
+        self.connecting = set()  # hosts a connection to which is being set up
+        self.connections = []
+        self.lock = Lock()
+        self.linkcondition = Condition(self.lock)
+        self.running = True
+        self.listener = Listener(address, authkey=authkey)
+        self.address = self.listener.address
+        self.acceptthread = Thread(target=self.accept_connections, name=f"AHCStreamHub-{name}")
+        self.acceptthread.daemon = True
+        self.acceptthread.start()
+        self.rendezvous.register(name, self.address)
+
+    # The inbound queue queuename of this host
+    def get_queue(self, queuename):
+        with self.lock:
+            if queuename not in self.inbound:
+                self.inbound[queuename] = StreamQueue()
+            return self.inbound[queuename]
+
+    # The queue queuename of host, a local one if host is this hub
+    def remote_queue(self, host, queuename):
+        if host == self.name:
+            return self.get_queue(queuename)
+        self.get_link(host)
+        return RemoteQueue(self, host, queuename)
+
+    def get_link(self, host):
+        deadline = time.monotonic() + self.connecttimeout
+        with self.linkcondition:
+            self.linkcondition.wait_for(lambda: host in self.links or host not in self.connecting, self.connecttimeout)
+            if host in self.links:
+                return self.links[host]
+            self.connecting.add(host)
+        connection = None
+        try:
+            connection = self.connect(host, deadline)
+        finally:
+            with self.linkcondition:
+                self.connecting.discard(host)
+                if connection is not None:
+                    self.add_connection(host, *connection)
+                self.linkcondition.notify_all()
+        with self.linkcondition:
+            if not self.linkcondition.wait_for(lambda: host in self.links, max(deadline - time.monotonic(), 0)):
+                raise ConnectionError(f"No connection to {host}")
+            return self.links[host]
+
+    # Returns the connection to host and its token, None if host keeps the connection it is setting up to this hub
+    def connect(self, host, deadline):
+        address = self.rendezvous.lookup(host)
+        while address is None:
+            if time.monotonic() > deadline:
+                raise ConnectionError(f"{host} is not registered at the rendezvous")
+            time.sleep(0.05)
+            address = self.rendezvous.lookup(host)
+        conn = Client(address, authkey=self.authkey)
+        token = os.urandom(8).hex()
+        conn.send_bytes(f"{self.name}\n{token}\n{self.tokens.get(host, '')}".encode())
+        if conn.recv_bytes() == b"ok":
+            return conn, token
+        conn.close()
+        return None
+
+    # Called with the lock held, the first connection to a host carries the batches to it unless it replaces a lost one
+    def add_connection(self, host, conn, token, replace=False):
+        self.connections.append(conn)
+        if replace:
+            close_connection(self.links.pop(host).transport.conn)
+        if host not in self.links:
+            self.links[host] = BatchedLink(StreamTransport(self, host, conn), self.batchsize, self.flushinterval)
+            self.tokens[host] = token
+        receiver = Thread(target=self.receive, args=[host, conn], name=f"AHCStreamHub-{self.name}-{host}")
+        receiver.daemon = True
+        receiver.start()
+
+    def accept_connections(self):
+        while self.running:
+            try:
+                conn = self.listener.accept()
+                host, token, lost = conn.recv_bytes().decode().split("\n")
+                with self.linkcondition:
+                    replace = host in self.links and lost == self.tokens.get(host)
+                    duplicate = not replace and host > self.name and (host in self.links or host in self.connecting)
+                    if duplicate:
+                        conn.send_bytes(b"dup")
+                        conn.close()
+                    else:
+                        conn.send_bytes(b"ok")
+                        self.add_connection(host, conn, token, replace)
+                        self.linkcondition.notify_all()
+            except Exception as ex:
+                if self.running:
+                    logger.error(f"AHCStreamHub {self.name} cannot accept a connection: {ex}")
+
+    def receive(self, host, conn):
+        while self.running:
+            try:
+                batch = pickle.loads(conn.recv_bytes())
+            except (EOFError, OSError):
+                break
+            for queuename, obj in batch:
+                self.get_queue(queuename).put(obj)
+        self.drop_connection(host, conn)
+
+    # Removes the link to host if it still uses conn
+    def drop_connection(self, host, conn):
+        with self.lock:
+            link = self.links.get(host)
+            if link is not None and link.transport.conn is conn:
+                del self.links[host]
+        close_connection(conn)
+
+    def flush(self):
+        with self.lock:
+            links = list(self.links.values())
+        for link in links:
+            link.flush()
+
+    def close(self):
+        self.flush()
+        self.running = False
+        self.listener.close()
+        for conn in self.connections:
+            conn.close()
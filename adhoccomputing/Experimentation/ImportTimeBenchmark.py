@@ -0,0 +1,83 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Measures how long importing the modules a component or a spawned NodeProcess needs takes in a fresh interpreter,
+# and fails if a module exceeds its budget or pulls in a heavy dependency that should only load on first use.
+# Run it with python -m adhoccomputing.Experimentation.ImportTimeBenchmark, it exits with 1 if a budget is exceeded.
+
+HEAVYMODULES = ("networkx", "numpy", "requests", "ssl", "yaml", "cv2", "uhd", "bladerf")
+
+# module: (budget in milliseconds, the heavy modules it may import)
+BUDGETS = {
+  "adhoccomputing.Generics": (100, ()),
+  "adhoccomputing.GenericModel": (120, ()),
+  "adhoccomputing.Networking.OSIModel": (150, ()),
+  "adhoccomputing.Distribution.NodeProcess": (120, ()),
+  "adhoccomputing.Distribution.LogicalChannelProcess": (120, ()),
+  "adhoccomputing.Distribution.InboundMultiplexer": (120, ()),
+  "adhoccomputing.Distribution.SharedMemoryRing": (120, ()),
+  "adhoccomputing.Distribution.PartitionProcess": (120, ()),
+  "adhoccomputing.Distribution.StreamHub": (120, ()),
+  "adhoccomputing.WireCodec": (120, ()),
+  "adhoccomputing.Experimentation.Topology": (600, ("networkx", "numpy")),
+  "adhoccomputing.Networking.PhysicalLayer.FrameHandlerBase": (500, ("numpy",)),
+}
+
+PROBE = "import sys, {module}; print(','.join(name for name in {heavy!r} if name in sys.modules))"
+
+
+# Returns the cumulative import time of module in milliseconds and the heavy modules it loaded
+def measure(module):
+  packageroot = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+  environment = dict(os.environ)
+  environment["PYTHONPATH"] = os.pathsep.join(filter(None, (packageroot, environment.get("PYTHONPATH"))))
+  result = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE.format(module=module, heavy=HEAVYMODULES)],
+                          capture_output=True, text=True, env=environment)
+  if result.returncode != 0:
+    raise RuntimeError(f"importing {module} failed: {result.stderr.strip().splitlines()[-1]}")
+  cumulative = None
+  for line in result.stderr.splitlines():
+    fields = line.split("|")
+    if len(fields) == 3 and fields[2].strip() == module:
+      cumulative = int(fields[1]) / 1000
+  loaded = [name for name in result.stdout.strip().split(",") if name]
+  return cumulative, loaded
+
+
+def run(modules, repeat):
+  failed = False
+  for module in modules:
+    budget, allowed = BUDGETS.get(module, (float("inf"), HEAVYMODULES))
+    try:
+      samples = []
+      for i in range(repeat):
+        cumulative, loaded = measure(module)
+        samples.append(cumulative)
+    except RuntimeError as ex:
+      print(f"{module:60} ERROR {ex}")
+      failed = True
+      continue
+    median = statistics.median(samples)
+    unexpected = [name for name in loaded if name not in allowed]
+    status = "OK"
+    if median > budget or unexpected:
+      status = "OVER BUDGET" if median > budget else "HEAVY IMPORT"
+      failed = True
+    print(f"{module:60} {median:8.1f} ms (budget {budget} ms) {status} {' '.join(unexpected)}")
+  return failed
+
+
+def main(argv):
+  parser = argparse.ArgumentParser(description="Import-time budget check of the adhoccomputing modules")
+  parser.add_argument("modules", nargs="*", help="modules to measure, all the budgeted ones by default")
+  parser.add_argument("-r", "--repeat", type=int, default=5, help="fresh interpreters per module, the median counts")
+  args = parser.parse_args(argv[1:])
+  failed = run(args.modules or list(BUDGETS), args.repeat)
+  sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+  main(sys.argv)
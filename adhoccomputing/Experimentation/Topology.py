@@ -1,14 +1,19 @@
 from random import sample
+import functools
 import itertools
 import networkx as nx
 from ..Generics import *
 #from ..GenericModel import GenericModel
 from ..Distribution.LogicalChannelProcess import LogicalChannelProcess
 from ..Distribution.NodeProcess import NodeProcess
+from ..Distribution.SharedMemoryRing import SharedMemoryRing
+from ..Distribution.PartitionProcess import PartitionProcess, BatchedLink
 
 import queue
 from multiprocessing import  Process,Queue,Pipe, JoinableQueue, Manager
 import time
+import json
+import threading
 import os, sys, signal
 
 
@@ -16,25 +21,61 @@ import os, sys, signal
 
 
 inf = float('inf')
+
+
+# Runs a construct method with the topology current, so the components it creates belong to it
+def constructing(method):
+  @functools.wraps(method)
+  def wrapper(self, *args, **kwargs):
+    with self:
+      return method(self, *args, **kwargs)
+  return wrapper
+
+
+# All the state of an experiment is kept per instance, so several topologies (e.g. replicas of a scenario with
+# different seeds) can be built and run in one process. The components get their topology as the topology
+# argument or, for the subcomponents created while the topology constructs its nodes, from getAHCTopology.
+# If runtime is given the components of this topology register with it instead of the process-wide runtime.
 class Topology:
-  nodes = {}
-  channels = {}
-  G = None
-  nodeproc = [] 
-  nodeproc_parent_conn = [] # Pipe ends that will be used by the main thread to communicate with the child SDRNode processes
-  chproc = [] 
-  chproc_parent_conn = [] # Pipe ends that will be used by the main thread to communicate with the child SDRNode processes
-
-  def __init__(self, name=None) -> None:
-    pass
+
+  def __init__(self, name=None, runtime=None) -> None:
+    self.name = name
+    self.runtime = runtime
+    self.nodes = {}
+    self.channels = {}
+    self.G = None
+    self.nodecolors = {}
+    self.nexthops = None
+    self.routinglock = threading.RLock()
+    self.routelisteners = {}
+    self.started = False
+    self.nodeproc = []
+    self.nodeproc_parent_conn = [] # Pipe ends that will be used by the main thread to communicate with the child SDRNode processes
+    self.chproc = []
+    self.chproc_parent_conn = [] # Pipe ends that will be used by the main thread to communicate with the child SDRNode processes
+    self.rings = [] # Shared memory blocks of the multiprocess topology, unlinked on exit
+    self.partitions = None # Node lists of the worker processes of mp_construct_partitioned_topology
+    self.hub = None # AHCStreamHub of construct_distributed_topology
+    self.contexttokens = []
+
+  # Makes this topology the current one, components created in the with block belong to it
+  def __enter__(self):
+    self.contexttokens.append(setAHCTopology(self))
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    AHCCurrentTopology.reset(self.contexttokens.pop())
+
   def __getstate__(self):
     return {
+      'name': self.name,
       'nodes': self.nodes,
       'channels': self.channels,
       'Graph': self.G,
       'nodeproc': self.nodeproc
     }
   def __setstate__(self, d):
+    self.__init__(d.get('name'))
     self.nodes = d['nodes']
     self.channels = d['channels']
     self.G = d['Graph']
@@ -53,49 +94,163 @@ class Topology:
       p.start()
 
 
-  def mp_construct_sdr_topology(self, G: nx.Graph, nodetype, channeltype, manager, context=None):
+  # Each node process gets a single inbound queue, shared by the channels towards it, and the queues of the channels
+  # it sends to; each channel process gets its own queue and the inbound queue of the node it delivers to. The queues
+  # are passed as {src: {dest: queue}} dicts holding the edges of the process only, so spawning a process and sending
+  # over the queues take O(degree) instead of O(N).
+  # With sharedmemory=True every direction of every edge gets a SharedMemoryRing of ringcapacity bytes instead of a
+  # queue, the rings have a single producer so a node reads one ring per channel towards it.
+  def mp_construct_sdr_topology(self, G: nx.Graph, nodetype, channeltype, manager, context=None, sharedmemory=False, ringcapacity=1 << 20):
     self.G = G
     n = self.G.number_of_nodes()
-    nd_queues = [[None for i in range(n)] for j in range(n)]
-    ch_queues = [[None for i in range(n)] for j in range(n)]
 
+    def get_queue(maxsize):
+      if sharedmemory:
+        ring = SharedMemoryRing(ringcapacity)
+        self.rings.append(ring)
+        return ring
+      try:
+        return manager.get_queue(maxsize=maxsize)
+      except:
+        return Queue(maxsize=maxsize)
+
+    # symmetric links but there will be a channel process in between so two channels per symmetric link
+    ch_queues = {(src, dest): get_queue(100) for src in range(n) for dest in sorted(G.adj[src]) if src != dest}
+    predecessors = {i: [] for i in range(n)}
+    for src, dest in ch_queues:
+      predecessors[dest].append(src)
+    if sharedmemory:
+      nd_queues = {(src, dest): get_queue(100) for src, dest in ch_queues}
+    else:
+      shared = {i: get_queue(100 * max(len(predecessors[i]), 1)) for i in range(n)}
+      nd_queues = {(src, dest): shared[dest] for src, dest in ch_queues}
     for i in range(n):
-      for j in range(n):
-        src = i
-        dest = j
-        if src != dest:
-          if G.has_edge(src,dest): #symmetric links but there will be a channel process in between to two queues are required so two queues per symmetric channel
-            #ch_queues[src][dest] = Queue(maxsize=100)
-            try:
-              ch_queues[src][dest] = manager.get_queue(maxsize=100)
-            except:
-              ch_queues[src][dest] = Queue(maxsize=100)
-            try:
-              nd_queues[src][dest] = manager.get_queue(maxsize=100)
-            except:
-              nd_queues[src][dest] = Queue(maxsize=100)
-    for i in range(n):
+      node_queues = {src: {i: nd_queues[(src, i)]} for src in predecessors[i]}
+      channel_queues = {i: {dest: ch_queues[(i, dest)] for dest in sorted(G.adj[i]) if dest != i}}
       parent_conn, child_conn = Pipe()
-      p = NodeProcess(nodetype, i, child_conn, nd_queues, ch_queues)
+      p = NodeProcess(nodetype, i, child_conn, node_queues, channel_queues)
       p.daemon = True
       self.nodeproc.append(p)
       self.nodeproc_parent_conn.append(parent_conn)
       #p.start()
-      for j in range(n):
-        src = i
-        dest = j
-        if src != dest:
-          if G.has_edge(src,dest): #symmetric links but there will be a channel process in between to two queues are required
-            chname = str(src) + "-" + str(dest)
-            ch_parent_conn, ch_child_conn = Pipe()
-            c = LogicalChannelProcess(channeltype, chname,ch_child_conn,nd_queues, ch_queues )
-            c.daemon = True
-            self.chproc.append(c)
-            self.chproc_parent_conn.append(ch_parent_conn)
-            #c.start()
-        else:
-          pass
+      for dest in channel_queues[i]:
+        chname = str(i) + "-" + str(dest)
+        ch_parent_conn, ch_child_conn = Pipe()
+        c = LogicalChannelProcess(channeltype, chname, ch_child_conn, {i: {dest: nd_queues[(i, dest)]}}, {i: {dest: ch_queues[(i, dest)]}})
+        c.daemon = True
+        self.chproc.append(c)
+        self.chproc_parent_conn.append(ch_parent_conn)
+        #c.start()
+
+  # Splits G into numpartitions node lists of nearly equal size with few edges between them by recursive bisection.
+  # Each split starts from a breadth-first order of the nodes, which keeps both halves contiguous, and is refined by
+  # Kernighan-Lin, which moves nodes across the split as long as that lowers the number of cut edges.
+  def partition_graph(self, G: nx.Graph, numpartitions):
+    from networkx.algorithms.community import kernighan_lin_bisection
+    U = G.to_undirected(as_view=True) if G.is_directed() else G
+
+    def bisect(nodes, parts):
+      if parts <= 1 or len(nodes) <= 1:
+        return [nodes]
+      leftparts = parts // 2
+      leftsize = len(nodes) * leftparts // parts
+      H = U.subgraph(nodes)
+      order = []
+      visited = set()
+      for start in sorted(nodes, key=H.degree):
+        if start not in visited:
+          visited.add(start)
+          order.append(start)
+          for u, v in nx.bfs_edges(H, start):
+            visited.add(v)
+            order.append(v)
+      left, right = set(order[:leftsize]), set(order[leftsize:])
+      if left and right and H.number_of_edges():
+        left, right = kernighan_lin_bisection(H, partition=(left, right), seed=0)
+        if len(left) != leftsize:
+          left, right = right, left  # the halves are returned in no particular order
+      return bisect([node for node in nodes if node in left], leftparts) + bisect([node for node in nodes if node in right], parts - leftparts)
+
+    return [nodes for nodes in bisect(list(G.nodes), min(numpartitions, G.number_of_nodes())) if nodes]
+
+  # mp_construct_partitioned_topology runs the topology in numpartitions worker processes (one per core by default)
+  # instead of one process per node and per channel. Each PartitionProcess creates the nodes of its partition and
+  # the channels between them as in construct_from_graph, only the cut edges cross processes: all the events from one
+  # partition to another go through one BatchedLink, carried by a Queue or, with sharedmemory=True, a
+  # SharedMemoryRing. Nodes are integers as in mp_construct_sdr_topology.
+  def mp_construct_partitioned_topology(self, G: nx.Graph, nodetype, channeltype, numpartitions=None, sharedmemory=False, batchsize=64, flushinterval=0.001, context=None):
+    self.G = G
+    self.partitions = self.partition_graph(G, numpartitions or os.cpu_count() or 1)
+    owner = {node: partitionid for partitionid, nodes in enumerate(self.partitions) for node in nodes}
+    links = {}
+    outbound = [{} for nodes in self.partitions]
+    inbound = [[] for nodes in self.partitions]
+    for k in G.edges:
+      for src, dest in ((k,) if G.is_directed() else (k, (k[1], k[0]))):
+        pair = (owner[src], owner[dest])
+        if pair[0] == pair[1]:
+          continue
+        if pair not in links:
+          if sharedmemory:
+            transport = SharedMemoryRing()
+            self.rings.append(transport)
+          else:
+            transport = Queue(maxsize=1000)
+          links[pair] = BatchedLink(transport, batchsize, flushinterval)
+          inbound[pair[1]].append(transport)
+        outbound[pair[0]][(src, dest)] = links[pair]
+    for partitionid, nodes in enumerate(self.partitions):
+      parent_conn, child_conn = Pipe()
+      p = PartitionProcess(partitionid, G, nodes, nodetype, channeltype, child_conn, outbound[partitionid], inbound[partitionid])
+      p.daemon = True
+      self.nodeproc.append(p)
+      self.nodeproc_parent_conn.append(parent_conn)
 
+  # Creates the nodes of one partition of G and their channels, called by PartitionProcess. G is kept whole so that
+  # routing sees the entire topology. A cut edge gets a channel in the partition of its sender only, which delivers
+  # through the outbound BatchedLink of the edge.
+  @constructing
+  def construct_partition(self, G: nx.Graph, nodes, nodetype, channeltype, outbound):
+    self.G = G
+    self.compute_forwarding_table()
+    for i in nodes:
+      self.nodes[i] = nodetype(nodetype.__name__, i, topology=self)
+    for k in G.edges:
+      if k[0] in self.nodes and k[1] in self.nodes:
+        self.add_channel(k, channeltype)
+    for (src, dest), link in outbound.items():
+      ch = channeltype(channeltype.__name__ + "-" + str(src) + "-" + str(dest), str(src) + "-" + str(dest), node_queues={src: {dest: link}})
+      self.channels[(src, dest)] = ch
+      self.nodes[src].connect_me_to_component(ConnectorTypes.DOWN, ch)
+
+  # construct_distributed_topology builds the share of this host of a topology that spans several hosts. Every host
+  # calls it with the same G, the same hosts ({node: host name}) and its own AHCStreamHub (AHCManager.create_hub).
+  # The nodes of the host and the channels between them are created as in construct_partition; the channels of the
+  # cut edges put into a RemoteQueue of the host of the receiver, so the events go directly between the hubs. A
+  # receiver thread hands the events arriving in the queuename queue of the hub to their nodes. Nodes are integers
+  # as in mp_construct_sdr_topology.
+  def construct_distributed_topology(self, G: nx.Graph, nodetype, channeltype, hub, hosts, queuename="topology"):
+    self.hub = hub
+    self.hubqueuename = queuename
+    outbound = {}
+    for k in G.edges:
+      for src, dest in ((k,) if G.is_directed() else (k, (k[1], k[0]))):
+        if hosts[src] == hub.name and hosts[dest] != hub.name:
+          outbound[(src, dest)] = hub.remote_queue(hosts[dest], queuename)
+    self.construct_partition(G, [node for node in G.nodes if hosts[node] == hub.name], nodetype, channeltype, outbound)
+    receiver = threading.Thread(target=self.receive_from_hub, args=[hub.get_queue(queuename)], name=f"Topology-{hub.name}")
+    receiver.daemon = True
+    receiver.start()
+
+  # None, put by exit, stops the receiver
+  def receive_from_hub(self, inbound):
+    while True:
+      ev = inbound.get()
+      if ev is None:
+        return
+      self.nodes[int(ev.fromchannel.split("-")[1])].trigger_event(ev)
+
+  @constructing
   def construct_winslab_topology_with_channels(self, nodecount, nodetype, channeltype, context=None):
 
     self.construct_winslab_topology_without_channels(nodecount, nodetype, context)
@@ -109,6 +264,7 @@ class Topology:
       ch.connect_me_to_component(ConnectorTypes.UP, self.nodes[k[1]])
 
 
+  @constructing
   def construct_winslab_topology_usrp_bladerf(self, nodecountusrp, nodecountbladerf, nodetypeusrp, nodetypebladerf, context=None):
     self.G = nx.Graph()
     self.G.add_nodes_from(range(nodecountusrp+nodecountbladerf))  # TODO : Change depending on the
@@ -120,6 +276,7 @@ class Topology:
       cc = nodetypebladerf(nodetypebladerf.__name__, id,topology=self)
       self.nodes[id] = cc
 
+  @constructing
   def construct_winslab_topology_without_channels(self, nodecount, nodetype, context=None):
 
     self.G = nx.Graph()
@@ -131,6 +288,7 @@ class Topology:
       self.nodes[i] = cc
 
 
+  @constructing
   def construct_winslab_topology_without_channels_for_docker(self, nodetype, id, context=None):
     
     self.G = nx.Graph()
@@ -144,6 +302,7 @@ class Topology:
   # if G is directed create a channel in each direction
   # Connect DOWN of source to channel
   # Connect UP of channel to destination
+  @constructing
   def construct_from_graph(self, G: nx.Graph, nodetype, channeltype, context=None):
     self.G = G
     nodes = list(G.nodes)
@@ -153,28 +312,40 @@ class Topology:
       cc = nodetype(nodetype.__name__, i,topology=self)#, self.ForwardingTable)
       self.nodes[i] = cc
     
-    if G.is_directed() == True:
-      for k in edges:
-        ch = channeltype(channeltype.__name__ + "-" + str(k[0]) + "-" + str(k[1]), str(k[0]) + "-" + str(k[1]))
-        self.channels[k] = ch
-        #For a directed graph each direction of an edge is shown as a separate item in G.edges()
-        #Hence, we generate a directional channel for each direction of the edge and 
-        # connect the sender-DOWN to channel and Channel-UP to receiver
-        self.nodes[k[0]].connect_me_to_component(ConnectorTypes.DOWN, ch)
-        ch.connect_me_to_component(ConnectorTypes.UP, self.nodes[k[1]])
+    for k in edges:
+      self.add_channel(k, channeltype)
+
+  def add_channel(self, k, channeltype):
+    ch = channeltype(channeltype.__name__ + "-" + str(k[0]) + "-" + str(k[1]), str(k[0]) + "-" + str(k[1]))
+    self.channels[k] = ch
+    if self.G.is_directed() == True:
+      #For a directed graph each direction of an edge is shown as a separate item in G.edges()
+      #Hence, we generate a directional channel for each direction of the edge and 
+      # connect the sender-DOWN to channel and Channel-UP to receiver
+      self.nodes[k[0]].connect_me_to_component(ConnectorTypes.DOWN, ch)
+      ch.connect_me_to_component(ConnectorTypes.UP, self.nodes[k[1]])
     else:
-      for k in edges:
-        ch = channeltype(channeltype.__name__ + "-" + str(k[0]) + "-" + str(k[1]), str(k[0]) + "-" + str(k[1]))
-        self.channels[k] = ch
-        # For an undirected graph, we generate a single channel and connect both sides to channel
-        # G.edges have unordered pairs hence SENDER-DOWN and RECEIVER-DOWN to channel
-        # and CHANNEL-UP to both SENDER and RECEIVER
-        self.nodes[k[0]].connect_me_to_component(ConnectorTypes.DOWN, ch)
-        ch.connect_me_to_component(ConnectorTypes.UP, self.nodes[k[1]])
-        self.nodes[k[1]].connect_me_to_component(ConnectorTypes.DOWN, ch)
-        ch.connect_me_to_component(ConnectorTypes.UP, self.nodes[k[0]])
-
-
+      # For an undirected graph, we generate a single channel and connect both sides to channel
+      # G.edges have unordered pairs hence SENDER-DOWN and RECEIVER-DOWN to channel
+      # and CHANNEL-UP to both SENDER and RECEIVER
+      self.nodes[k[0]].connect_me_to_component(ConnectorTypes.DOWN, ch)
+      ch.connect_me_to_component(ConnectorTypes.UP, self.nodes[k[1]])
+      self.nodes[k[1]].connect_me_to_component(ConnectorTypes.DOWN, ch)
+      ch.connect_me_to_component(ConnectorTypes.UP, self.nodes[k[0]])
+    return ch
+
+  # Disconnects the channel of edge k from its nodes and stops it
+  def remove_channel(self, k):
+    ch = self.channels.pop(k)
+    for node in (self.nodes[k[0]], self.nodes[k[1]]):
+      node.disconnect_me_from_component(ConnectorTypes.DOWN, ch)
+      ch.disconnect_me_from_component(ConnectorTypes.UP, node)
+    if ch.terminatestarted == False:
+      ch.exit_process()
+      ch.terminatestarted = True
+
+
+  @constructing
   def construct_single_node(self, nodetype, instancenumber):
     self.singlenode = nodetype(nodetype.__name__, instancenumber,topology=self)
     self.G = nx.Graph()
@@ -182,6 +353,7 @@ class Topology:
     self.nodes[0] = self.singlenode
 
 
+  @constructing
   def construct_sender_receiver_directional(self, sendertype, receivertype, channeltype):
     self.sender = sendertype(sendertype.__name__, 0,topology=self)
     self.receiver = receivertype(receivertype.__name__, 1,topology=self)
@@ -196,6 +368,7 @@ class Topology:
     ch.connect_me_to_component(ConnectorTypes.UP, self.receiver)
     #self.receiver.connect_me_to_component(ConnectorTypes.UP, ch)
 
+  @constructing
   def construct_sender_receiver(self, sendertype, receivertype, channeltype):
     self.sender = sendertype(sendertype.__name__, 0,topology=self)
     self.receiver = receivertype(receivertype.__name__, 1,topology=self)
@@ -220,6 +393,7 @@ class Topology:
 
 
   def start(self):
+    self.started = True
     initatecheck = False
     try:
       if self.nodeproc is not None:
@@ -236,8 +410,7 @@ class Topology:
         if self.G is not None and self.G.nodes is not None:
           N = len(self.G.nodes)
           self.compute_forwarding_table()
-          for i in self.G.nodes:
-            node = self.nodes[i]
+          for node in self.nodes.values():
             if node.initeventgenerated == False:
               node.initiate_process()
           for i in self.channels:
@@ -280,8 +453,7 @@ class Topology:
     logger.critical("Exiting")
     try:
       if self.G is not None and self.G.nodes is not None:
-        for i in self.G.nodes:
-          node = self.nodes[i]
+        for node in self.nodes.values():
           if node.terminatestarted == False:
             node.exit_process()
             node.terminatestarted = True
@@ -307,22 +479,169 @@ class Topology:
           self.chproc_parent_conn[i].send(exit_event)
     except Exception as ex:
       logger.critical(f"Topology exit exception: {ex}")
+    for ring in self.rings:
+      ring.unlink()
+      ring.close()
+    if self.hub is not None:
+      self.hub.flush()
+      self.hub.get_queue(self.hubqueuename).put(None)
 
     
   
+  # The all-seeing eye routing table shared by all the network layers of the topology: nexthops[i, j] is the index
+  # (in nodelist) of the next hop from node i towards node j, or -1 if j is unreachable, and distances[i, j] is the
+  # hop count. A row is computed on its first lookup by a breadth-first search from the source over the adjacency
+  # of G, which takes the same paths as nx.all_pairs_shortest_path. The N x N int32 matrices are allocated but not
+  # touched until rows are computed, so a node that only routes its own traffic costs one row of N entries.
   def compute_forwarding_table(self):
-    self.ForwardingTable = dict(nx.all_pairs_shortest_path(self.G))
-
-  # returns the all-seeing eye routing based next hop id
+    import numpy as np
+    with self.routinglock:
+      nodelist = list(self.G.nodes)
+      nodeindex = {node: index for index, node in enumerate(nodelist)}
+      self.nodelist = nodelist
+      self.nodeindex = nodeindex
+      self.adjlists = [[nodeindex[neighbor] for neighbor in self.G.adj[node]] for node in nodelist]
+      self.adjdirty = True
+      self.nexthopsready = np.zeros(len(nodelist), dtype=bool)
+      self.distances = np.empty((len(nodelist), len(nodelist)), dtype=np.int32)
+      self.nexthops = np.empty((len(nodelist), len(nodelist)), dtype=np.int32)
+
+  # The adjacency lists in CSR form for the vectorised search, rebuilt after the edges changed
+  def build_adjacency(self):
+    import numpy as np
+    lengths = np.fromiter((len(adjacent) for adjacent in self.adjlists), dtype=np.int64, count=len(self.adjlists))
+    self.adjindptr = np.zeros(len(self.adjlists) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=self.adjindptr[1:])
+    self.adjindices = np.fromiter(itertools.chain.from_iterable(self.adjlists), dtype=np.int32, count=int(self.adjindptr[-1]))
+    self.adjdirty = False
+
+  # Computes the row of source level by level; the nodes of a level are kept in the order they were discovered in,
+  # so ties between equally short paths are broken as in a BFS over G.adj. The row is built aside and copied in,
+  # lookups running meanwhile see the old or the new next hop, never an empty row.
+  def compute_next_hops(self, source):
+    import numpy as np
+    with self.routinglock:
+      if self.adjdirty:
+        self.build_adjacency()
+      firstposition = np.empty(len(self.nodelist), dtype=np.int64)
+      row = np.full(len(self.nodelist), -1, dtype=np.int32)
+      distance = np.full(len(self.nodelist), -1, dtype=np.int32)
+      row[source] = source
+      distance[source] = 0
+      indptr = self.adjindptr
+      frontier = self.adjindices[indptr[source]:indptr[source + 1]]
+      frontier = frontier[row[frontier] == -1]
+      row[frontier] = frontier
+      level = 1
+      distance[frontier] = level
+      while frontier.size:
+        counts = indptr[frontier + 1] - indptr[frontier]
+        total = int(counts.sum())
+        if total == 0:
+          break
+        starts = np.repeat(indptr[frontier] - (np.cumsum(counts) - counts), counts)
+        neighbors = self.adjindices[starts + np.arange(total)]
+        parents = np.repeat(frontier, counts)
+        unvisited = row[neighbors] == -1
+        neighbors = neighbors[unvisited]
+        parents = parents[unvisited]
+        # the first occurrence of each newly reached node, without sorting
+        positions = np.arange(neighbors.size)
+        firstposition[neighbors[::-1]] = positions[::-1]
+        first = positions[firstposition[neighbors] == positions]
+        frontier = neighbors[first]
+        row[frontier] = row[parents[first]]
+        level += 1
+        distance[frontier] = level
+      self.nexthops[source] = row
+      self.distances[source] = distance
+      self.nexthopsready[source] = True
+
+  # returns the all-seeing eye routing based next hop id, inf if there is no path
   def get_next_hop(self, fromId, toId):
-    try:
-      retval = self.ForwardingTable[fromId][toId]
-      return retval[1]
-    except KeyError:
+    if self.nexthops is None:
+      if self.G is None:
+        return inf
+      self.compute_forwarding_table()
+    source = self.nodeindex.get(fromId)
+    destination = self.nodeindex.get(toId)
+    if source is None or destination is None:
       return inf
-    except IndexError:
-      return fromId
-  
+    if not self.nexthopsready[source]:
+      self.compute_next_hops(source)
+    nexthop = self.nexthops[source, destination]
+    if nexthop < 0:
+      return inf
+    return self.nodelist[nexthop]
+
+  # callback(destinations) is called with the destinations whose next hop from nodeId changed after an edge was
+  # added or removed, see GenericNetworkLayer.on_routes_changed
+  def add_route_listener(self, nodeId, callback):
+    self.routelisteners.setdefault(nodeId, []).append(callback)
+
+  # Adds the edge u-v to G, connects the nodes through a new channeltype channel if one is given, and repairs the
+  # forwarding table. Returns {source: [destinations]} of the next hops that changed.
+  @constructing
+  def add_edge(self, u, v, channeltype=None):
+    self.G.add_edge(u, v)
+    if channeltype is not None and u in self.nodes and v in self.nodes:
+      ch = self.add_channel((u, v), channeltype)
+      if self.started:
+        ch.initiate_process()
+    return self.update_forwarding_table(u, v, True)
+
+  # Removes the edge u-v from G and its channel, if there is one, and repairs the forwarding table
+  def remove_edge(self, u, v):
+    self.G.remove_edge(u, v)
+    key = (u, v) if (u, v) in self.channels or self.G.is_directed() else (v, u)
+    if key in self.channels:
+      self.remove_channel(key)
+    return self.update_forwarding_table(u, v, False)
+
+  # An edge u->v shortens the paths from a source s iff d(s,v) - d(s,u) >= 2, and only the rows where
+  # d(s,v) - d(s,u) == 1 can have used it. Only these computed rows are searched again: the others stay valid, and
+  # the rows that were never looked up are computed on the new graph anyway.
+  def update_forwarding_table(self, u, v, added):
+    import numpy as np
+    if self.nexthops is None:
+      return {}
+    with self.routinglock:
+      if u not in self.nodeindex or v not in self.nodeindex:
+        self.compute_forwarding_table()  # a new node, the matrices have to grow
+        changes = {source: list(self.nodelist) for source in self.nodelist}
+        affected = []
+      else:
+        i = self.nodeindex[u]
+        j = self.nodeindex[v]
+        directions = [(i, j)] if self.G.is_directed() else [(i, j), (j, i)]
+        for a, b in directions:
+          if added:
+            self.adjlists[a].append(b)
+          elif b in self.adjlists[a]:
+            self.adjlists[a].remove(b)
+        self.adjdirty = True
+        ready = np.flatnonzero(self.nexthopsready)
+        unreachable = 1 << 30
+        mask = np.zeros(ready.size, dtype=bool)
+        for a, b in directions:
+          da = self.distances[ready, a].astype(np.int64)
+          db = self.distances[ready, b].astype(np.int64)
+          da[da < 0] = unreachable
+          db[db < 0] = unreachable
+          mask |= (db - da >= 2) if added else (db - da == 1)
+        affected = ready[mask]
+        changes = {}
+      for source in affected:
+        previous = self.nexthops[source].copy()
+        self.compute_next_hops(source)
+        changed = np.flatnonzero(previous != self.nexthops[source])
+        if changed.size:
+          changes[self.nodelist[source]] = [self.nodelist[destination] for destination in changed]
+    for source, destinations in changes.items():
+      for callback in self.routelisteners.get(source, []):
+        callback(destinations)
+    return changes
+
   # Returns the list of neighbors of a node
   def get_neighbors(self, nodeId):
     return sorted([neighbor for neighbor in self.G.neighbors(nodeId)])
@@ -346,6 +665,40 @@ class Topology:
     logger.debug(f"{self.nodecolors}")
     # self.lock.release()
 
+  # Metrics of all nodes, channels and their subcomponents, see GenericModel.get_metrics
+  def metrics_snapshot(self):
+    snapshot = []
+    pending = list(self.nodes.values()) + list(self.channels.values())
+    while pending:
+      component = pending.pop(0)
+      snapshot.append(component.get_metrics())
+      pending.extend(component.components)
+    return snapshot
+
+  # The components that spent the most time in their handlers, to find the bottlenecks of a run
+  def hot_components(self, count=10):
+    snapshot = self.metrics_snapshot()
+    snapshot.sort(key=lambda metrics: metrics.get("estimatedhandlertimens", 0), reverse=True)
+    return snapshot[:count]
+
+  # Writes a metrics snapshot every interval seconds as a json line to filename, or to the logger if it is None
+  def start_metrics_dump(self, interval, filename=None):
+    self.metricsdumpstop = threading.Event()
+    def dump():
+      while not self.metricsdumpstop.wait(interval):
+        line = json.dumps({"time": time.time(), "components": self.metrics_snapshot()}, default=str)
+        if filename is None:
+          logger.info("METRICS %s", line)
+        else:
+          with open(filename, "a") as f:
+            f.write(line + "\n")
+    self.metricsdumpthread = threading.Thread(target=dump, name="AHCMetricsDump")
+    self.metricsdumpthread.daemon = True
+    self.metricsdumpthread.start()
+
+  def stop_metrics_dump(self):
+    self.metricsdumpstop.set()
+
   def get_random_node(self):
     return self.nodes[sample(self.G.nodes(), 1)[0]]
 
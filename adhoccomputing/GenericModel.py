@@ -1,16 +1,33 @@
 import queue
-from threading import Thread
+from threading import Thread, Lock, current_thread
 from multiprocessing import Queue
 from timeit import default_timer as timer
-from .Experimentation.Topology import *
+from time import perf_counter_ns
 from .Generics import *
-
+from .Runtime.GenericRuntime import *
+from .Runtime.Mailbox import *
+from .Runtime.Metrics import *
+from .Runtime.TimerService import *
 
 
 class GenericModel:
-    
+    # Components with inlinedispatch set handle trigger_event directly in the caller's thread,
+    # which turns pass-through layers into a chain of function calls instead of queue hand-offs.
+    # If the component is already busy (another thread or a nested call) or has events queued, the event is queued as usual.
+    inlinedispatch = False
+    # queue_handler drains up to maxbatchsize queued events per wake-up
+    maxbatchsize = 64
+    # Capacity of the inputqueue (0 is unbounded) and what happens when it is full, see configure_mailbox
+    mailboxcapacity = 0
+    mailboxpolicy = MailboxOverflowPolicies.BLOCK
+    # Prioritized mailboxes serve CONTROL events before NORMAL and BULK ones, see EventPriorities
+    mailboxprioritized = False
+    # Set to False to switch off the ComponentMetrics of a component class
+    metricsenabled = True
 
     def __init__(self, componentname, componentinstancenumber, context=None, configurationparameters=None, num_worker_threads=1, topology=None, child_conn=None, node_queues=None, channel_queues=None):
+        if topology is None:
+            topology = getAHCTopology()
         self.topology = topology
         self.child_conn = child_conn
         self.node_queues=node_queues
@@ -19,10 +36,11 @@ class GenericModel:
         self.components  = []
         self.configurationparameters = configurationparameters
         self.eventhandlers = {EventTypes.INIT: self.on_init, EventTypes.MFRB: self.on_message_from_bottom,
-                            EventTypes.MFRT: self.on_message_from_top, EventTypes.MFRP: self.on_message_from_peer, EventTypes.EXIT: self.on_exit}
+                            EventTypes.MFRT: self.on_message_from_top, EventTypes.MFRP: self.on_message_from_peer, EventTypes.EXIT: self.on_exit,
+                            EventTypes.TIMER: self.on_timer}
         # Add default handlers to all instantiated components.
         # If a component overwrites the __init__ method it has to call the super().__init__ method
-        self.inputqueue = queue.Queue()
+        self.inputqueue = Mailbox(self.mailboxcapacity, self.mailboxpolicy, prioritized=self.mailboxprioritized)
         self.componentname = componentname
         self.componentinstancenumber = componentinstancenumber
         self.num_worker_threads = num_worker_threads
@@ -30,12 +48,25 @@ class GenericModel:
         self.terminatestarted = False
         self.terminated = False
         self.initeventgenerated = False
-
-        self.t = [None]*self.num_worker_threads
-        for i in range(self.num_worker_threads):
-            self.t[i] = Thread(target=self.queue_handler, args=[self.inputqueue])
-            self.t[i].daemon = True
-            self.t[i].start()
+        self.inlinelock = Lock()
+        self.inlinethread = None  # the thread handling an event inline, it holds the inlinelock
+        self.metrics = ComponentMetrics() if self.metricsenabled else None
+        # MFRB events of a batch are handed to on_event_batch together if the component overrides it
+        self.batchhandling = type(self).on_event_batch is not GenericModel.on_event_batch
+
+        # A topology may bring its own runtime, e.g. a DiscreteEventRuntime per replica of an experiment
+        self.runtime = getattr(topology, "runtime", None) or getAHCRuntime()
+        if self.runtime is not None:
+            # The runtime delivers the events, no worker threads are created for this component
+            self.t = []
+            self.runtime.register(self)
+            self.check_mailbox_support(self.mailboxcapacity, self.mailboxprioritized)
+        else:
+            self.t = [None]*self.num_worker_threads
+            for i in range(self.num_worker_threads):
+                self.t[i] = Thread(target=self.queue_handler, args=[self.inputqueue])
+                self.t[i].daemon = True
+                self.t[i].start()
 
         # self.mpqueuethread = Thread(target=self.mp_queue_handler, args=[self.node_queues])
         # self.mpqueuethread.daemon = True
@@ -44,14 +75,14 @@ class GenericModel:
         # self.mp_conn_thread = Thread(target=self.mp_pipe_handler, args=[])
         # self.mp_conn_thread.daemon = True
         # self.mp_conn_thread.start()
-        logger.info(f"Generated NAME:{self.componentname} COMPID: {self.componentinstancenumber}")
+        logger.info("Generated NAME:%s COMPID: %s", self.componentname, self.componentinstancenumber)
 
         try:
             if self.connectors is not None:
                 pass
         except AttributeError:
             self.connectors = ConnectorList()
-            logger.debug(f"NAME:{self.componentname} COMPID: {self.componentinstancenumber} created connector list")
+            logger.debug("NAME:%s COMPID: %s created connector list", self.componentname, self.componentinstancenumber)
             # self.connectors = ConnectorList()
 
         #TODO: Handle This Part
@@ -84,10 +115,36 @@ class GenericModel:
         
 
     
+    # The DOWN connector of a unicast, given by the interfaceid of the header or derived from its nexthop.
+    # None for broadcasts and for interfaces that are not in the index, these go to all DOWN connectors.
+    # Only an interfaceid "src-dest" starting at this component is taken, a header may still carry the one stamped by
+    # the previous hop, which would send the frame back over the channel it came from.
+    def get_down_interface(self, event: Event):
+        if not self.connectors.interfaces:
+            return None
+        header = getattr(event.eventcontent, "header", None)
+        if header is None:
+            return None
+        interfaceid = getattr(header, "interfaceid", None)
+        if interfaceid is not None and interfaceid != float('inf') and str(interfaceid).split("-")[0] == str(self.componentinstancenumber):
+            return self.connectors.interfaces.get(str(interfaceid))
+        nexthop = getattr(header, "nexthop", None)
+        if nexthop is None or nexthop == float('inf') or isinstance(nexthop, MessageDestinationIdentifiers):
+            return None
+        return self.connectors.interfaces.get(f"{self.componentinstancenumber}-{nexthop}")
+
     def send_down(self, event: Event):
         try:
-            for p in self.connectors[ConnectorTypes.DOWN]:
-                p.trigger_event(event)
+            interface = self.get_down_interface(event)
+            if interface is not None:
+                interface.trigger_event(event)
+                if self.metrics is not None:
+                    self.metrics.count_sent(ConnectorTypes.DOWN)
+            else:
+                for p in self.connectors[ConnectorTypes.DOWN]:
+                    p.trigger_event(event)
+                if self.metrics is not None:
+                    self.metrics.count_sent(ConnectorTypes.DOWN, len(self.connectors[ConnectorTypes.DOWN]))
         except Exception as e:
             #raise(f"Cannot send message to Down Connector {self.componentname } -- {self.componentinstancenumber}")
             #logger.error(f"Cannot send message to DOWN Connector {self.componentname}-{self.componentinstancenumber} {str(event)} {e}")
@@ -96,13 +153,10 @@ class GenericModel:
             src = int(self.componentinstancenumber)
             event.eventsource = None # for avoiding thread.lock problem
             if self.channel_queues is not None:
-                n = len(self.channel_queues[0])
-                for i in range(n):
-                    dest = i
-                    if self.channel_queues[src][dest] is not None:
-                        self.channel_queues[src][dest].put(event)
+                for outbound in self.channel_queues.get(src, {}).values():
+                    outbound.put(event)
         except Exception as e:
-            logger.error(f"Cannot send message to DOWN Connector over queues {self.componentname}-{self.componentinstancenumber} {str(event)} {e}")
+            logger.error("Cannot send message to DOWN Connector over queues %s-%s %s %s", self.componentname, self.componentinstancenumber, event, e)
 
 
     def send_up_from_channel(self, event: Event, loopback = False):
@@ -115,6 +169,8 @@ class GenericModel:
                 for p in self.connectors[ConnectorTypes.UP]:
                     if p.componentinstancenumber != event.eventsource_componentinstancenumber: #TO AVOID LOOPBACK provide the loopback optional parameter
                         p.trigger_event(event)
+            if self.metrics is not None:
+                self.metrics.count_sent(ConnectorTypes.UP, len(self.connectors[ConnectorTypes.UP]))
 
         except Exception as e:
             #logger.error(f"Cannot send message to UP Connector from channel {self.componentname}-{self.componentinstancenumber} {str(event)} {e}")
@@ -139,16 +195,20 @@ class GenericModel:
             #self.connectors[ConnectorTypes.UP].eventhandlers[EventTypes.MFRB](event)
             for p in self.connectors[ConnectorTypes.UP]:
                 p.trigger_event(event)
+            if self.metrics is not None:
+                self.metrics.count_sent(ConnectorTypes.UP, len(self.connectors[ConnectorTypes.UP]))
 
         except Exception as e:
-            logger.error(f"Cannot send message to UP Connector {self.componentname}-{self.componentinstancenumber} {str(event)} {e}")
+            logger.error("Cannot send message to UP Connector %s-%s %s %s", self.componentname, self.componentinstancenumber, event, e)
 
     def send_peer(self, event: Event):
         try:
             for p in self.connectors[ConnectorTypes.PEER]:
                 p.trigger_event(event)
+            if self.metrics is not None:
+                self.metrics.count_sent(ConnectorTypes.PEER, len(self.connectors[ConnectorTypes.PEER]))
         except Exception as e:
-            logger.error(f"Cannot send message to PEER Connector {self.componentname}-{self.componentinstancenumber} {str(event)} {e}")
+            logger.error("Cannot send message to PEER Connector %s-%s %s %s", self.componentname, self.componentinstancenumber, event, e)
 
     def U(self, component):
         self.connect_me_to_component(ConnectorTypes.UP, component)
@@ -160,7 +220,7 @@ class GenericModel:
         self.connect_me_to_component(ConnectorTypes.PEER, component)
     
     def connect_me_to_component(self, name, component):
-        logger.debug(f"Connecting {self.componentname}-{self.componentinstancenumber} {name} to {component.componentname}-{component.componentinstancenumber}")
+        logger.debug("Connecting %s-%s %s to %s-%s", self.componentname, self.componentinstancenumber, name, component.componentname, component.componentinstancenumber)
         #self.connectors[name] = component
         try:
             self.connectors[name] = component
@@ -168,49 +228,192 @@ class GenericModel:
             self.connectors = ConnectorList()
             self.connectors[name] = component
 
+    def disconnect_me_from_component(self, name, component):
+        logger.debug("Disconnecting %s-%s %s from %s-%s", self.componentname, self.componentinstancenumber, name, component.componentname, component.componentinstancenumber)
+        self.connectors.remove_connection(name, component)
+
     def on_message_from_bottom(self, eventobj: Event):
-        logger.debug(f"{EventTypes.MFRB} is not handled  {self.componentname}.{self.componentinstancenumber}")
+        logger.debug("%s is not handled  %s.%s", EventTypes.MFRB, self.componentname, self.componentinstancenumber)
         pass
 
     def on_message_from_top(self, eventobj: Event):
-        logger.debug(f"{EventTypes.MFRT} is not handled  {self.componentname}.{self.componentinstancenumber}")
+        logger.debug("%s is not handled  %s.%s", EventTypes.MFRT, self.componentname, self.componentinstancenumber)
         pass
         #if self.child_conn is not None:
         #    self.child_conn.send("Channel Deneme")
 
     def on_message_from_peer(self, eventobj: Event):
-        logger.debug(f"{EventTypes.MFRP} is not handled  {self.componentname}.{self.componentinstancenumber}")
+        logger.debug("%s is not handled  %s.%s", EventTypes.MFRP, self.componentname, self.componentinstancenumber)
         pass
 
     def on_exit(self, eventobj: Event):
-        logger.debug(f"{EventTypes.EXIT} is not handled  {self.componentname}.{self.componentinstancenumber} exiting")
+        logger.debug("%s is not handled  %s.%s exiting", EventTypes.EXIT, self.componentname, self.componentinstancenumber)
         self.terminated = True
     
 
     def on_init(self, eventobj: Event):
-        logger.debug(f"{EventTypes.INIT} is not handled {self.componentname}.{self.componentinstancenumber} exiting")
+        logger.debug("%s is not handled %s.%s exiting", EventTypes.INIT, self.componentname, self.componentinstancenumber)
+
+    # The expiration of a timer set with set_timer, the event carries the handle and the callback
+    def on_timer(self, eventobj: Event):
+        handle, callback = eventobj.eventcontent
+        if handle.cancelled:
+            return None
+        return callback()
         
 
          
     def queue_handler(self, myqueue):
         while not self.terminated:
-            workitem = myqueue.get()
-            if workitem.event in self.eventhandlers:
-                self.on_pre_event(workitem)
-                #logger.debug(f"{self.componentname}-{self.componentinstancenumber} will handle {workitem.event}")
-                self.eventhandlers[workitem.event](eventobj=workitem)  # call the handler
+            # Blocks for the first event, then drains what is already queued
+            workitems = myqueue.get_batch(self.maxbatchsize)
+            if self.inlinedispatch:
+                with self.inlinelock:
+                    self.call_event_handlers(workitems)
             else:
-                logger.error(f"{self.componentname}.{self.componentinstancenumber} Event Handler: {workitem.event} is not implemented")
-            myqueue.task_done()
+                self.call_event_handlers(workitems)
+            myqueue.tasks_done(len(workitems))
+
+    def call_event_handlers(self, workitems):
+        if not self.batchhandling:
+            for workitem in workitems:
+                if self.terminated:
+                    return
+                self.call_event_handler(workitem)
+            return
+        batch = []
+        for workitem in workitems:
+            if self.terminated:
+                return
+            if workitem.event == EventTypes.MFRB:
+                self.on_pre_event(workitem)
+                batch.append(workitem)
+                continue
+            if batch:
+                self.call_batch_handler(batch)
+                batch = []
+            self.call_event_handler(workitem)
+        if batch:
+            self.call_batch_handler(batch)
+
+    def call_batch_handler(self, batch):
+        if self.metrics is not None and self.metrics.count_events(EventTypes.MFRB, len(batch)):
+            start = perf_counter_ns()
+            self.on_event_batch(batch)
+            self.metrics.record_handler_time(perf_counter_ns() - start, len(batch))
+        else:
+            self.on_event_batch(batch)
+
+    # Override to process consecutive MFRB events of a batch together. Batches are formed by the threaded model and
+    # the WorkerPoolRuntime; the DiscreteEventRuntime and the AsyncioRuntime dispatch every event on its own, so
+    # under them the MFRB events go to on_message_from_bottom and this is never called
+    def on_event_batch(self, eventobjs):
+        for eventobj in eventobjs:
+            self.on_message_from_bottom(eventobj)
+
+    # Returns what the handler returns, which is a coroutine for async def handlers under the AsyncioRuntime
+    def dispatch_event(self, workitem: Event):
+        if self.inlinedispatch:
+            with self.inlinelock:
+                return self.call_event_handler(workitem)
+        else:
+            return self.call_event_handler(workitem)
+
+    # The batch counterpart of dispatch_event, used by runtimes that take several events of the component at once
+    def dispatch_events(self, workitems):
+        if self.inlinedispatch:
+            with self.inlinelock:
+                self.call_event_handlers(workitems)
+        else:
+            self.call_event_handlers(workitems)
+
+    def call_event_handler(self, workitem: Event):
+        if workitem.event in self.eventhandlers:
+            self.on_pre_event(workitem)
+            if __debug__: logger.trace("%s-%s will handle %s", self.componentname, self.componentinstancenumber, workitem)
+            if self.metrics is not None and self.metrics.count_event(workitem.event):
+                start = perf_counter_ns()
+                result = self.eventhandlers[workitem.event](eventobj=workitem)
+                self.metrics.record_handler_time(perf_counter_ns() - start)
+                return result
+            return self.eventhandlers[workitem.event](eventobj=workitem)  # call the handler
+        else:
+            logger.error(f"{self.componentname}.{self.componentinstancenumber} Event Handler: {workitem.event} is not implemented")
 
     def on_connected_to_component(self, name, channel):
-        logger.debug(f"Connected channel-{name} by component-{self.componentinstancenumber}:{channel.componentinstancenumber}")
+        logger.debug("Connected channel-%s by component-%s:%s", name, self.componentinstancenumber, channel.componentinstancenumber)
         
         pass
 
     def trigger_event(self, eventobj: Event):
         #logger.debug(f"{self.componentname}.{self.componentinstancenumber} invoked with {str(eventobj)}")
-        self.inputqueue.put_nowait(eventobj)
+        if self.inlinedispatch and not self.terminated and self.inlinelock.acquire(blocking=False):
+            try:
+                # Events that are queued or taken but not handled yet go first, the inline one must not overtake them
+                if self.mailbox_empty():
+                    self.inlinethread = current_thread()
+                    try:
+                        self.call_event_handler(eventobj)
+                    except Exception as ex:
+                        # A failing receiver must not abort the fan-out of the sender
+                        logger.error("%s.%s handler for %s raised %s", self.componentname, self.componentinstancenumber, eventobj.event, ex)
+                    finally:
+                        self.inlinethread = None
+                    return
+            finally:
+                self.inlinelock.release()
+        if self.runtime is not None:
+            self.runtime.schedule(self, eventobj)
+        else:
+            # Senders wait on a full BLOCK mailbox, except the component itself: its queue threads, and a thread
+            # running one of its handlers inline, which holds the inlinelock the queue threads wait for
+            thread = current_thread()
+            self.inputqueue.put(eventobj, block=thread not in self.t and thread is not self.inlinethread)
+
+    # True if no event of the component is queued or being handled
+    def mailbox_empty(self):
+        if self.runtime is not None:
+            return self.runtime.mailbox_empty(self)
+        return self.inputqueue.unfinished_tasks == 0
+
+    # Queues the event without handling it inline and without blocking the caller, used by the timer service
+    def post_event(self, eventobj: Event):
+        if self.runtime is not None:
+            self.runtime.schedule(self, eventobj)
+        else:
+            self.inputqueue.put(eventobj, block=False)
+
+    # Calls callback in the context of the component after delay seconds, every delay seconds if periodic is set.
+    # All timers share one timer service, call cancel on the returned TimerHandle to stop the timer.
+    def set_timer(self, delay, callback, periodic=False):
+        timerservice = getAHCTimerService(self.runtime)
+        eventobj = Event(self, EventTypes.TIMER, callback)
+        if periodic:
+            return timerservice.schedule_periodic(delay, self, eventobj)
+        return timerservice.schedule_once(delay, self, eventobj)
+
+    # Only the threaded model and the WorkerPoolRuntime keep the events in the inputqueue, the other runtimes queue
+    # them on their own and ignore the limits
+    def configure_mailbox(self, capacity=0, policy=MailboxOverflowPolicies.BLOCK, droppableevents=None, prioritized=False, starvationlimit=8):
+        self.check_mailbox_support(capacity, prioritized)
+        self.inputqueue.configure(capacity, policy, droppableevents, prioritized, starvationlimit)
+
+    def check_mailbox_support(self, capacity, prioritized):
+        if (capacity or prioritized) and self.runtime is not None and not self.runtime.mailboxpolicies:
+            logger.warning("%s.%s: %s does not apply mailbox capacities, overflow policies or priorities", self.componentname, self.componentinstancenumber, type(self.runtime).__name__)
+
+    # Metrics of the component together with the state of its mailbox
+    def get_metrics(self):
+        snapshot = self.metrics.snapshot() if self.metrics is not None else {}
+        snapshot["componentname"] = self.componentname
+        snapshot["componentinstancenumber"] = self.componentinstancenumber
+        if self.runtime is None or self.runtime.mailboxpolicies:
+            snapshot["mailboxdepth"] = self.inputqueue.qsize()
+            snapshot["mailboxhighwatermark"] = self.inputqueue.highwatermark
+            snapshot["mailboxdropped"] = self.inputqueue.dropped
+        elif hasattr(self, "asynciomailbox"):
+            snapshot["mailboxdepth"] = self.asynciomailbox.qsize()
+        return snapshot
 
     def on_pre_event(self, event):
         #logger.debug(f"{self.componentname}.{self.componentinstancenumber} invoked with {str(event)} will run on_pre_event here")
@@ -219,3 +422,23 @@ class GenericModel:
     def send_self(self, event: Event):
         #logger.debug(f"{self.componentname}.{self.componentinstancenumber} invoking itself with {str(event)}")
         self.trigger_event(event)
+
+    # Delivers the event to the component itself after delay seconds. Use it instead of sleeping in a handler, the
+    # component keeps handling its other events meanwhile. Returns a TimerHandle, cancel it to drop the event.
+    def send_self_after(self, delay, event: Event):
+        return getAHCTimerService(self.runtime).schedule_once(delay, self, event)
+
+    # Calls send_down with the event after delay seconds, in the context of the component
+    def send_down_after(self, delay, event: Event):
+        return self.set_timer(delay, lambda: self.send_down(event))
+
+
+# Topology pulls in networkx and the multiprocessing machinery, so it is not imported with GenericModel anymore.
+# The components that import it from here get it when they ask for it.
+def __getattr__(name):
+    if name == "Topology":
+        from .Experimentation.Topology import Topology
+        return Topology
+    if name == "nx":
+        return importlib.import_module("networkx")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,9 +1,12 @@
+import contextvars
 import datetime
+import importlib
+import itertools
+import json
+import threading
+from collections import deque
 from logging import *
 from logging.handlers import *
-import requests
-from requests.adapters import HTTPAdapter, Retry
-import ssl
 from enum import Enum
 from threading import Timer, Thread, Event
 import time
@@ -22,6 +25,10 @@ class GenericMessage:
   def __str__(self) -> str:
     return f"GENERIC MESSAGE: HEADER: {str(self.header)} PAYLOAD: {str(self.payload)}"
 
+  # A shallow copy with the given fields replaced, the uniqueid is kept unless it is given
+  def replace(self, **fields):
+    return replace_fields(self, fields)
+
 class GenericMessageHeader:
 
   def __init__(self, messagetype, messagefrom, messageto, nexthop=float('inf'), interfaceid=float('inf'), sequencenumber=-1):
@@ -34,12 +41,59 @@ class GenericMessageHeader:
   def __str__(self) -> str:
     return f"GenericMessageHeader: TYPE: {self.messagetype} FROM: {self.messagefrom} TO: {self.messagefrom} NEXTHOP: {self.nexthop} INTERFACEID: {self.interfaceid} SEQUENCE#: {self.sequencenumber}"
 
+  # A shallow copy with the given fields replaced
+  def replace(self, **fields):
+    return replace_fields(self, fields)
+
+
+def replace_fields(obj, fields):
+  clone = object.__new__(type(obj))
+  clone.__dict__.update(obj.__dict__)
+  clone.__dict__.update(fields)
+  return clone
+
+
+# Headers and messages that cannot be changed once constructed. A message is handed to every receiver of a
+# broadcast as the same object, with the frozen variants it can be shared without copying: a component that wants
+# to forward a modified message derives it with replace(). Extra header fields are given as keyword arguments.
+# The payload is shared as it is, treat it as read-only.
+class FrozenMessageHeader(GenericMessageHeader):
+
+  def __init__(self, messagetype, messagefrom, messageto, nexthop=float('inf'), interfaceid=float('inf'), sequencenumber=-1, **fields):
+    super().__init__(messagetype, messagefrom, messageto, nexthop, interfaceid, sequencenumber)
+    self.__dict__.update(fields)
+    self.__dict__["frozen"] = True
+
+  def __setattr__(self, name, value):
+    if self.__dict__.get("frozen", False):
+      raise AttributeError(f"{type(self).__name__} is immutable, derive a new header with replace({name}=...)")
+    super().__setattr__(name, value)
+
+  def __delattr__(self, name):
+    raise AttributeError(f"{type(self).__name__} is immutable")
+
+
+class FrozenMessage(GenericMessage):
+
+  def __init__(self, header, payload):
+    super().__init__(header, payload)
+    self.__dict__["frozen"] = True
+
+  def __setattr__(self, name, value):
+    if self.__dict__.get("frozen", False):
+      raise AttributeError(f"{type(self).__name__} is immutable, derive a new message with replace({name}=...)")
+    super().__setattr__(name, value)
+
+  def __delattr__(self, name):
+    raise AttributeError(f"{type(self).__name__} is immutable")
+
 class EventTypes(Enum):
   INIT = "init"
   MFRB = "msgfrombottom"
   MFRT = "msgfromtop"
   MFRP = "msgfrompeer"
   EXIT = "exit"
+  TIMER = "timer"
 
 class ConnectorTypes(Enum):
   DOWN = "DOWN"
@@ -51,27 +105,74 @@ class MessageDestinationIdentifiers(Enum):
   NETWORKLAYERBROADCAST = -2  # For flooding over multiple-hops means all connected nodes to me over one or more links
 
 
+# Priority classes of events, used when the mailbox of a component is prioritized. Lower value is served first.
+class EventPriorities(Enum):
+  CONTROL = 0
+  NORMAL = 1
+  BULK = 2
+
+# Default priorities of events that do not carry one, looked up by event type and then by the message types
+# found in the (encapsulated) headers of the event content. Protocols register their control messages here.
+class EventPriorityDefaults:
+  eventtypes = {EventTypes.INIT: EventPriorities.CONTROL, EventTypes.EXIT: EventPriorities.CONTROL}
+  messagetypes = {}
+
+def setEventPriority(eventormessagetype, priority: EventPriorities):
+  if isinstance(eventormessagetype, EventTypes):
+    EventPriorityDefaults.eventtypes[eventormessagetype] = priority
+  else:
+    EventPriorityDefaults.messagetypes[eventormessagetype] = priority
+
+
 class Event:
-  curr_event_id = 0
+  # Process-wide event id generator, next() on itertools.count is atomic under the GIL
+  eventidgenerator = itertools.count()
+  # Offset to convert the monotonic timestamps of events to wall-clock time when they are printed
+  wallclockoffset = time.time_ns() - time.monotonic_ns()
 
-  def __init__(self, eventsource, event, eventcontent, fromchannel=None, eventid=-1, eventsource_componentname=None, eventsource_componentinstancenumber=None):
+  __slots__ = ("eventsource", "eventsource_componentname", "eventsource_componentinstancenumber", "event", "timestamp", "eventcontent", "fromchannel", "eventid", "priority")
+
+  def __init__(self, eventsource, event, eventcontent, fromchannel=None, eventid=-1, eventsource_componentname=None, eventsource_componentinstancenumber=None, priority=None):
     self.eventsource = eventsource
-    if eventsource is not None and eventsource_componentname is None:
-      self.eventsource_componentname = eventsource.componentname
-    else:
-      self.eventsource_componentname = eventsource_componentname
-    if eventsource is not None and eventsource_componentinstancenumber is None:
-      self.eventsource_componentinstancenumber = eventsource.componentinstancenumber
-    else:
-      self.eventsource_componentinstancenumber = eventsource_componentinstancenumber
+    if eventsource is not None:
+      if eventsource_componentname is None:
+        eventsource_componentname = eventsource.componentname
+      if eventsource_componentinstancenumber is None:
+        eventsource_componentinstancenumber = eventsource.componentinstancenumber
+    self.eventsource_componentname = eventsource_componentname
+    self.eventsource_componentinstancenumber = eventsource_componentinstancenumber
     self.event = event
-    self.time = datetime.datetime.now()
+    self.timestamp = time.monotonic_ns()
     self.eventcontent = eventcontent
     self.fromchannel = fromchannel
+    if eventid == -1:
+      eventid = next(Event.eventidgenerator)
     self.eventid = eventid
-    if self.eventid == -1:
-      self.eventid = self.curr_event_id
-      self.curr_event_id += 1
+    self.priority = priority
+
+  # Creation time of the event as datetime, only computed when it is asked for
+  @property
+  def time(self):
+    return datetime.datetime.fromtimestamp((self.timestamp + Event.wallclockoffset) / 1e9)
+
+  # The priority the event carries, or the default of its event type or of the message types it encapsulates
+  def get_priority(self) -> EventPriorities:
+    if self.priority is not None:
+      return self.priority
+    priority = EventPriorityDefaults.eventtypes.get(self.event)
+    if priority is not None:
+      return priority
+    if EventPriorityDefaults.messagetypes:
+      msg = self.eventcontent
+      for depth in range(4):
+        header = getattr(msg, "header", None)
+        if header is None:
+          break
+        priority = EventPriorityDefaults.messagetypes.get(getattr(header, "messagetype", None))
+        if priority is not None:
+          return priority
+        msg = getattr(msg, "payload", None)
+    return EventPriorities.NORMAL
 
   def __eq__(self, other) -> bool:
     if type(other) is not Event:
@@ -104,7 +205,7 @@ class Event:
   #   self.eventid = d['eventid']
 
   def __str__(self) -> str:
-      return "EVENT: " + str(self.event) + " FROM " + str(self.eventsource_componentname) + "-" + str(self.eventsource_componentinstancenumber) + " RECEIVED FROM CHANNEL " + str(self.fromchannel) + " WITH CONTENT: " + str(self.eventcontent)
+      return "EVENT: " + str(self.event) + " AT " + str(self.time) + " FROM " + str(self.eventsource_componentname) + "-" + str(self.eventsource_componentinstancenumber) + " RECEIVED FROM CHANNEL " + str(self.fromchannel) + " WITH CONTENT: " + str(self.eventcontent)
 
 class FramerObjects():
   framerobjects = {}
@@ -124,8 +225,22 @@ class FramerObjects():
 
 
 # A Dictionary that holds a list for the same key
+# Connected components per ConnectorTypes. The DOWN connectors are also indexed by their componentinstancenumber,
+# which is "src-dest" for the channels generated by Topology, so that unicasts can take the matching channel only.
+# An undirected channel "a-b" is reachable from b as well, hence it is also indexed as "b-a" unless that exists.
 class ConnectorList(dict):
 
+  def __init__(self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
+    self.interfaces = {}
+
+  def add_interface(self, component):
+    interfaceid = str(component.componentinstancenumber)
+    self.interfaces[interfaceid] = component
+    ends = interfaceid.split("-")
+    if len(ends) == 2:
+      self.interfaces.setdefault(ends[1] + "-" + ends[0], component)
+
   def __setitem__(self, key, value):
     try:
       self[key]
@@ -134,8 +249,17 @@ class ConnectorList(dict):
     if value in self[key]:
       logger.error(f"Has already connected {key} to {value.componentname}-{value.componentinstancenumber}")
     else:
-      logger.debug(f"{value.componentname}-{value.componentinstancenumber} is added to {key} ")
+      logger.debug("%s-%s is added to %s ", value.componentname, value.componentinstancenumber, key)
       self[key].append(value)
+      if key == ConnectorTypes.DOWN:
+        self.add_interface(value)
+
+  # Removes value from the components connected as key and from the interface index
+  def remove_connection(self, key, value):
+    if key in self and value in self[key]:
+      self[key].remove(value)
+      for interfaceid in [interfaceid for interfaceid, component in self.interfaces.items() if component is value]:
+        del self.interfaces[interfaceid]
 
 
 class SDRConfiguration():
@@ -156,6 +280,18 @@ def applog(self, message, *args, **kws):
         self._log(LOG_LEVEL_APPLOG, message, args, **kws) 
 Logger.applog = applog
 
+# Per-event trace points. Pass the values as arguments instead of building f-strings, the logging module formats
+# the message (and calls str on events) only if the record is emitted. Trace points written as
+#   if __debug__: logger.trace("%s received %s", self.componentname, eventobj)
+# are removed by the compiler when python runs with -O, otherwise they cost a single level check.
+LOG_LEVEL_TRACE = 5
+addLevelName(LOG_LEVEL_TRACE, "TRACE")
+def trace(self, message, *args, **kws):
+    if self.isEnabledFor(LOG_LEVEL_TRACE):
+        kws.setdefault("stacklevel", 2)  # report the trace point, not this function
+        self._log(LOG_LEVEL_TRACE, message, args, **kws)
+Logger.trace = trace
+
 
 class CustomFormatter(Formatter):
 
@@ -169,6 +305,7 @@ class CustomFormatter(Formatter):
     format = "===> %(asctime)s - %(name)s - %(levelname)s - %(message)s (%(filename)s:%(lineno)d, %(threadName)s)"
 
     FORMATS = {
+        LOG_LEVEL_TRACE: debugcolor + format + reset,
         DEBUG: debugcolor + format + reset,
         INFO: infocolor + format + reset,
         LOG_LEVEL_APPLOG: applogcolor + format + reset,
@@ -184,64 +321,117 @@ class CustomFormatter(Formatter):
 
 
 
+# Ships log records to a collector without blocking the logging thread. emit only appends the record to a bounded
+# buffer; a background thread, started on the first record, sends batches of up to batchsize records as JSON lines
+# with method (POST by default) over one keep-alive connection. When the collector is unreachable the batch is retried with exponential backoff
+# up to maxbackoff seconds; meanwhile records beyond capacity are dropped and counted in dropped. Server errors,
+# 408 and 429 are retried the same way, a batch that the collector rejects with any other status is dropped.
 class AHCLoggingHttpHandler(HTTPHandler):
-  connestablished = True
-  def __init__(self, host: str, url: str, method: str = ..., secure: bool = ..., credentials: tuple[str, str] | None = ..., context: ssl.SSLContext | None = ...) -> None:
-    if secure==True:
-      try:
-        super().__init__(host, url, method, secure, credentials, context)
-      except:
-        pass
-    else:
-      try:
-        super().__init__(host, url, method, secure=False)
-      except:
-        pass
- 
+  def __init__(self, host: str, url: str, method: str = "POST", secure: bool = False, credentials: tuple[str, str] | None = None, context: "ssl.SSLContext | None" = None,
+               capacity=10000, batchsize=256, flushinterval=0.5, maxbackoff=30.0) -> None:
+    super().__init__(host, url, method, secure, credentials, context if secure else None)
+    self.buffer = deque(maxlen=capacity)
+    self.batchsize = batchsize
+    self.flushinterval = flushinterval
+    self.maxbackoff = maxbackoff
+    self.wakeup = threading.Event()
+    self.shipperlock = threading.Lock()
+    self.shipper = None
+    self.connection = None
+    self.closed = False
+    self.dropped = 0
+    self.shipped = 0
+    self.failedattempts = 0
+    self.inflight = 0  # records taken from the buffer by the shipper and not yet shipped or dropped
+
   def emit(self, record: LogRecord) -> None:
-    if self.connestablished == True:
-      """
-      Emit a record.
-
-      Send the record to the web server as a percent-encoded dictionary
-      """
-      if self.connestablished == True:
-        try:
-          import urllib.parse
-          host = self.host
-          h = self.getConnection(host, self.secure)
-          url = self.url
-          data = urllib.parse.urlencode(self.mapLogRecord(record))
-          if self.method == "GET":
-              if (url.find('?') >= 0):
-                sep = '&'
-              else:
-                sep = '?'
-              url = url + "%c%s" % (sep, data)
-          h.putrequest(self.method, url)
-          # support multiple hosts on one IP address...
-          # need to strip optional :port from host, if present
-          i = host.find(":")
-          if i >= 0:
-            host = host[:i]
-          # See issue #30904: putrequest call above already adds this header
-          # on Python 3.x.
-          # h.putheader("Host", host)
-          if self.method == "POST":
-            h.putheader("Content-type",
-                          "application/x-www-form-urlencoded")
-            h.putheader("Content-length", str(len(data)))
-          if self.credentials:
-            import base64
-            s = ('%s:%s' % self.credentials).encode('utf-8')
-            s = 'Basic ' + base64.b64encode(s).strip().decode('ascii')
-            h.putheader('Authorization', s)
-          h.endheaders()
-          if self.method == "POST":
-            h.send(data.encode('utf-8'))
-          h.getresponse()    #can't do anything with the result
-        except Exception:
-            self.connestablished = False
+    try:
+      line = json.dumps({"name": record.name, "levelname": record.levelname, "message": record.getMessage(),
+                         "created": record.created, "filename": record.filename, "lineno": record.lineno,
+                         "threadName": record.threadName}, default=str)
+    except Exception:
+      self.handleError(record)
+      return
+    if len(self.buffer) == self.buffer.maxlen:
+      self.dropped += 1  # the deque discards the oldest record
+    self.buffer.append(line)
+    if self.shipper is None:
+      self.start_shipper()
+    if len(self.buffer) >= self.batchsize:
+      self.wakeup.set()
+
+  def start_shipper(self):
+    with self.shipperlock:
+      if self.shipper is None:
+        self.shipper = Thread(target=self.ship_forever, name="AHCLogShipper")
+        self.shipper.daemon = True
+        self.shipper.start()
+
+  def ship_forever(self):
+    backoff = self.flushinterval
+    batch = None
+    while not self.closed or self.buffer or batch:
+      if batch is None:
+        self.wakeup.wait(self.flushinterval)
+        self.wakeup.clear()
+      while self.buffer or batch:
+        if batch is None:
+          self.inflight = min(self.batchsize, len(self.buffer))
+          batch = [self.buffer.popleft() for i in range(self.inflight)]
+        status = self.ship("\n".join(batch).encode("utf-8"))
+        if status is not None and 200 <= status < 300:
+          self.shipped += len(batch)
+          batch = None
+          self.inflight = 0
+          backoff = self.flushinterval
+        elif status is not None and status < 500 and status not in (408, 429):
+          # sending it again would be rejected as well
+          self.dropped += len(batch)
+          batch = None
+          self.inflight = 0
+        else:
+          self.failedattempts += 1
+          if self.closed:
+            self.dropped += len(batch) + len(self.buffer)
+            self.buffer.clear()
+            self.inflight = 0
+            return
+          time.sleep(backoff)
+          backoff = min(backoff * 2, self.maxbackoff)
+
+  # Returns the status of the response, None if the collector could not be reached
+  def ship(self, body) -> int | None:
+    try:
+      if self.connection is None:
+        self.connection = self.getConnection(self.host, self.secure)
+      headers = {"Content-Type": "application/x-ndjson", "Content-Length": str(len(body)), "Connection": "keep-alive"}
+      if self.credentials:
+        import base64
+        s = ('%s:%s' % self.credentials).encode('utf-8')
+        headers["Authorization"] = 'Basic ' + base64.b64encode(s).strip().decode('ascii')
+      self.connection.request(self.method, self.url, body=body, headers=headers)
+      response = self.connection.getresponse()
+      response.read()
+      return response.status
+    except Exception:
+      if self.connection is not None:
+        self.connection.close()
+        self.connection = None
+      return None
+
+  # Waits until the buffered records and the batch being sent are shipped or timeout seconds pass
+  def flush(self, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while (self.buffer or self.inflight) and self.shipper is not None and time.monotonic() < deadline:
+      self.wakeup.set()
+      time.sleep(0.01)
+
+  def close(self):
+    self.closed = True
+    self.wakeup.set()
+    if self.shipper is not None:
+      self.shipper.join(self.flushinterval + 1.0)
+    super().close()
 
 
 logger = getLogger("AHC")
@@ -259,25 +449,74 @@ def setAHCLogLevel(level):
   
 
 
+# The topology that the components created in the current context belong to. A Topology makes itself current
+# while it constructs its nodes and channels (or in a with block), so the subcomponents a node creates get the
+# topology of the node without passing it down. It is a context variable, hence replicas of an experiment built in
+# different threads or asyncio tasks of one process do not see each other.
+AHCCurrentTopology = contextvars.ContextVar("AHCCurrentTopology", default=None)
+
+
+def setAHCTopology(topology):
+  return AHCCurrentTopology.set(topology)
+
+
+def getAHCTopology():
+  return AHCCurrentTopology.get()
+
+
+# Calls hFunction every t seconds until it is cancelled. The timer is a periodic entry of the shared timer service,
+# if component is given hFunction runs in the thread of the component, otherwise in the thread of the timer service.
 class AHCTimer():
 
-  def __init__(self, t, hFunction):
+  def __init__(self, t, hFunction, component=None):
     self.t = t
     self.hFunction = hFunction
-    self.thread = Timer(self.t, self.handle_function)
-
-  def handle_function(self):
-    while(True):
-      self.hFunction()
-      time.sleep(self.t)
-    #self.thread = Timer(self.t, self.handle_function)
-    #self.thread.start()
+    self.component = component
+    self.handle = None
 
   def start(self):
-    self.thread.start()
-  
+    if self.component is not None:
+      self.handle = self.component.set_timer(self.t, self.hFunction, periodic=True)
+    else:
+      from .Runtime.TimerService import getAHCTimerService
+      self.handle = getAHCTimerService().call_periodic(self.t, self.hFunction)
+
   def cancel(self):
-    self.thread.cancel()
+    if self.handle is not None:
+      self.handle.cancel()
+
+
+
+# Stands for a module, or an attribute of it, that is imported when it is first used. Heavy and optional
+# dependencies (networkx, SDR drivers, OpenCV) are bound this way so that importing a component stays cheap and
+# does not fail on hosts without the dependency until the component actually needs it.
+class LazyImport:
+
+  def __init__(self, modulename, attribute=None):
+    self.__dict__["modulename"] = modulename
+    self.__dict__["attribute"] = attribute
+    self.__dict__["target"] = None
+
+  def resolve(self):
+    target = self.__dict__["target"]
+    if target is None:
+      target = importlib.import_module(self.__dict__["modulename"])
+      if self.__dict__["attribute"] is not None:
+        target = getattr(target, self.__dict__["attribute"])
+      self.__dict__["target"] = target
+    return target
+
+  def __getattr__(self, name):
+    return getattr(self.resolve(), name)
+
+  def __setattr__(self, name, value):
+    setattr(self.resolve(), name, value)
+
+  def __call__(self, *args, **kwargs):
+    return self.resolve()(*args, **kwargs)
+
+  def __repr__(self):
+    return f"<LazyImport {self.__dict__['modulename']}>"
 
 
 
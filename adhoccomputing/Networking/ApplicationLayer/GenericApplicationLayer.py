@@ -26,7 +26,7 @@ class GenericApplicationLayer(GenericModel):
         super().__init__(componentname, componentinstancenumber, context, configurationparameters, num_worker_threads, topology)
         
     def on_init(self, eventobj: Event):
-        logger.debug(f"Initializing {self.componentname}.{self.componentinstancenumber}")
+        logger.debug("Initializing %s.%s", self.componentname, self.componentinstancenumber)
 
         if self.componentinstancenumber == 0:
             # destination = random.randint(len(Topology.G.nodes))
@@ -36,8 +36,7 @@ class GenericApplicationLayer(GenericModel):
             payload = ApplicationLayerMessagePayload("23")
             proposalmessage = GenericMessage(hdr, payload)
             randdelay = random.randint(0, 5)
-            time.sleep(randdelay)
-            self.send_self(Event(self, "propose", proposalmessage))
+            self.send_self_after(randdelay, Event(self, "propose", proposalmessage))
         else:
             pass
 
@@ -46,11 +45,9 @@ class GenericApplicationLayer(GenericModel):
             applmessage = eventobj.eventcontent
             hdr = applmessage.header
             if hdr.messagetype == ApplicationLayerMessageTypes.ACCEPT:
-                logger.debug(
-                    f"Node-{self.componentinstancenumber} says Node-{hdr.messagefrom} has sent {hdr.messagetype} message")
+                logger.debug("Node-%s says Node-%s has sent %s message", self.componentinstancenumber, hdr.messagefrom, hdr.messagetype)
             elif hdr.messagetype == ApplicationLayerMessageTypes.PROPOSE:
-                logger.debug(
-                    f"Node-{self.componentinstancenumber} says Node-{hdr.messagefrom} has sent {hdr.messagetype} message")
+                logger.debug("Node-%s says Node-%s has sent %s message", self.componentinstancenumber, hdr.messagefrom, hdr.messagetype)
         except AttributeError:
             logger.error("Attribute Error")
 
@@ -3,7 +3,7 @@ import time
 
 from ...Generics import *
 from ...GenericModel import GenericModel
-import pickle
+from ...WireCodec import encode, decode
 import secrets
 from threading import Lock
 # define your own message types
@@ -37,7 +37,7 @@ class MessageSegmentation(GenericModel):
         self.initframe = True
         
     def on_init(self, eventobj: Event):
-        logger.debug(f"Initializing {self.componentname}.{self.componentinstancenumber}")
+        logger.debug("Initializing %s.%s", self.componentname, self.componentinstancenumber)
 
 
     def on_message_from_top(self, eventobj: Event):
@@ -49,9 +49,9 @@ class MessageSegmentation(GenericModel):
             #fragmentid = "DENE"
             msg = eventobj.eventcontent
             hdr = msg.header
-            msgpickled = pickle.dumps(msg)
-            #logger.applog(f"{self.componentname}-{self.componentinstancenumber} msgsize {len(msgpickled)}")
-            ploads = [msgpickled[i:i+self.MSS] for i in range(0, len(msgpickled), self.MSS)] 
+            msgencoded = encode(msg)
+            #logger.applog(f"{self.componentname}-{self.componentinstancenumber} msgsize {len(msgencoded)}")
+            ploads = [msgencoded[i:i+self.MSS] for i in range(0, len(msgencoded), self.MSS)] 
             #logger.applog(f"{len(ploads)}")
             for i in range(len(ploads) -1) :
                 seghdr = MessageSegmentationHeader(MessageSegmentationMessageTypes.MORE, hdr.messagefrom, hdr.messageto, sequencenumber=i, fragmentid=fragmentid, numberoffragments=len(ploads))
@@ -66,7 +66,7 @@ class MessageSegmentation(GenericModel):
             self.send_down(Event(None, EventTypes.MFRT, segmsg))
             
         except Exception as ex:
-            logger.error(f"Exception {self.componentname}-{self.componentinstancenumber} {ex}")   
+            logger.error("Exception %s-%s %s", self.componentname, self.componentinstancenumber, ex)   
         #self.mutex.release()
         #self.send_down(eventobj)
 
@@ -75,7 +75,7 @@ class MessageSegmentation(GenericModel):
         msg:GenericMessage = eventobj.eventcontent
         hdr:MessageSegmentationHeader = msg.header
         payload = msg.payload
-        #logger.applog(f"{self.componentname}-{self.componentinstancenumber} received {str(hdr)}")
+        #logger.applog("%s-%s received %s", self.componentname, self.componentinstancenumber, hdr)
         if hdr.messagetype == MessageSegmentationMessageTypes.MORE:
             try:
                 self.recvmsgs [hdr.fragmentid]
@@ -84,24 +84,24 @@ class MessageSegmentation(GenericModel):
             self.recvmsgs [hdr.fragmentid][hdr.sequencenumber] = payload
         else:
             if hdr.messagetype == MessageSegmentationMessageTypes.LAST:
-                logger.applog(f"{self.componentname}-{self.componentinstancenumber} received {str(hdr)}")
+                logger.applog("%s-%s received %s", self.componentname, self.componentinstancenumber, hdr)
                 try:
                     self.recvmsgs [hdr.fragmentid]
                 except KeyError as ex:
                     self.recvmsgs [hdr.fragmentid] = [None]*hdr.numberoffragments
                 self.recvmsgs [hdr.fragmentid][hdr.sequencenumber] = payload
                 if None in self.recvmsgs [hdr.fragmentid]:
-                    logger.applog(f"{self.componentname}-{self.componentinstancenumber} received LAST BUT THERE IS GAP")
+                    logger.applog("%s-%s received LAST BUT THERE IS GAP", self.componentname, self.componentinstancenumber)
                 else:
                     #for i in range(hdr.numberoffragments):
                     #    logger.applog(f"{self.componentname}-{self.componentinstancenumber} {i} {len(self.recvmsgs [hdr.fragmentid][i])} {hdr.fragmentid}")
                     receivedmsg = b''.join(self.recvmsgs [hdr.fragmentid])
                     try:
-                        msgrecv = pickle.loads(receivedmsg)
+                        msgrecv = decode(receivedmsg)
                     #remove segments
                         self.send_up(Event(None, EventTypes.MFRB, msgrecv))
                     except Exception as ex:
-                        logger.error(f"{self.componentname}-{self.componentinstancenumber} {ex} ")
+                        logger.error("%s-%s %s ", self.componentname, self.componentinstancenumber, ex)
 
 
 
@@ -2,8 +2,9 @@ import time
 
 from ...Generics import *
 from ...GenericModel import GenericModel
-import pickle
-import cv2
+from ...WireCodec import encode, decode
+
+cv2 = LazyImport("cv2")
 
 # define your own message types
 class OpenCVVideoStreamingAppMessageTypes(Enum):
@@ -42,7 +43,7 @@ class OpenCVVideoStreamingApp(GenericModel):
             self.frame = 1
         super().__init__(componentname, componentinstancenumber, context, configurationparameters, num_worker_threads, topology)
         self.eventhandlers[OpenCVVideoStreamingAppEventTypes.STARTSTREAMING] = self.on_startstreaming
-        self.t = AHCTimer(1/self.framerate, self.send_frame)
+        self.t = AHCTimer(1/self.framerate, self.send_frame, self)
         self.cap = cv2.VideoCapture(0)
         #self.codec = 0x47504A4D  # MJPG
         #self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter.fourcc('M','J','P','G'))
@@ -66,14 +67,14 @@ class OpenCVVideoStreamingApp(GenericModel):
         self.frame =  cv2.cvtColor(framesmallres, cv2.COLOR_BGRA2YUV_I420)
 
     def on_message_from_top(self, eventobj: Event):
-        logger.applog(f"{self.componentname}.{self.componentinstancenumber} RECEIVED {str(eventobj)}")
+        logger.applog("%s.%s RECEIVED %s", self.componentname, self.componentinstancenumber, eventobj)
         self.send_down(Event(self, EventTypes.MFRT, eventobj.eventcontent))
     
     def on_message_from_bottom(self, eventobj: Event):
-        self.frame = pickle.loads(eventobj.eventcontent.payload ) 
+        self.frame = decode(eventobj.eventcontent.payload ) 
         
         #self.frame = eventobj.eventcontent.payload 
-        logger.applog(f"{self.componentname}.{self.componentinstancenumber} RECEIVED frame")
+        logger.applog("%s.%s RECEIVED frame", self.componentname, self.componentinstancenumber)
         # try:
         #     
         #     #cv2.waitKey(0) & 0xFF 
@@ -92,7 +93,7 @@ class OpenCVVideoStreamingApp(GenericModel):
             framesmallres = cv2.resize(framehighres, (self.frameheight,self.framewidth))
             frame =  cv2.cvtColor(framesmallres, cv2.COLOR_BGR2GRAY)
             #(B,G,R) = cv2.split(frame)
-            payload = pickle.dumps(frame)
+            payload = encode(frame)
             if self.initframe == True:
                 self.frame = frame   ##### LOOPBACK trials
                 self.initframe = False
@@ -9,9 +9,10 @@ class PingPongApplicationLayerMessageTypes(Enum):
     BROADCAST = "BROADCAST"
 
 # define your own message header structure
-class PingPongApplicationLayerMessageHeader(GenericMessageHeader):
+# the broadcast message is shared by all receivers, hence it is immutable and replies are derived with replace
+class PingPongApplicationLayerMessageHeader(FrozenMessageHeader):
     def __init__(self, messagetype, messagefrom, messageto, nexthop=..., interfaceid=..., sequencenumber=-1, counter=0):
-        super().__init__(messagetype, messagefrom, messageto, nexthop, interfaceid, sequencenumber)
+        super().__init__(messagetype, messagefrom, messageto, nexthop, interfaceid, sequencenumber, counter=counter)
     
 
 
@@ -29,32 +30,28 @@ class PingPongApplicationLayer(GenericModel):
         self.counter = 0
 
     def on_message_from_top(self, eventobj: Event):
-        logger.info(f"{self.componentname}.{self.componentinstancenumber} RECEIVED {str(eventobj)}")
+        logger.info("%s.%s RECEIVED %s", self.componentname, self.componentinstancenumber, eventobj)
         self.send_down(Event(self, EventTypes.MFRT, eventobj.eventcontent))
     
     def on_message_from_bottom(self, eventobj: Event):
-        evt = Event(self, EventTypes.MFRT, eventobj.eventcontent)
-        logger.applog(f"{self.componentname}.{self.componentinstancenumber} RECEIVED {eventobj.eventcontent.header.sequencenumber}-{eventobj.eventcontent.header.counter} {eventobj.eventcontent.payload}")
+        msg = eventobj.eventcontent
+        logger.applog("%s.%s RECEIVED %s-%s %s", self.componentname, self.componentinstancenumber, msg.header.sequencenumber, msg.header.counter, msg.payload)
         #logger.applog(f"{self.componentname}.{self.componentinstancenumber} RECEIVED message")
-        evt.eventcontent.header.messageto = MessageDestinationIdentifiers.LINKLAYERBROADCAST
-        evt.eventcontent.header.messagefrom = self.componentinstancenumber
-        evt.eventcontent.payload = eventobj.eventcontent.payload + "-" + str(self.componentinstancenumber)
-        evt.eventcontent.header.sequencenumber =  eventobj.eventcontent.header.sequencenumber
-        evt.eventcontent.header.counter = eventobj.eventcontent.header.counter + 1
+        hdr = msg.header.replace(messageto=MessageDestinationIdentifiers.LINKLAYERBROADCAST, messagefrom=self.componentinstancenumber,
+                                 counter=msg.header.counter + 1)
+        evt = Event(self, EventTypes.MFRT, msg.replace(header=hdr, payload=msg.payload + "-" + str(self.componentinstancenumber)))
         #time.sleep(0.0000001) # TODO WHAT Should this be?
-        time.sleep(random.uniform(0, 0.1))
         if evt.eventcontent.header.counter < 5:
-            self.send_down(evt)  # PINGPONG
+            self.send_down_after(random.uniform(0, 0.1), evt)  # PINGPONG
     
     def on_startbroadcast(self, eventobj: Event):
-        hdr = PingPongApplicationLayerMessageHeader(PingPongApplicationLayerMessageTypes.BROADCAST, self.componentinstancenumber, MessageDestinationIdentifiers.LINKLAYERBROADCAST)
         self.counter = self.counter + 1
-        hdr.sequencenumber = self.counter
-        hdr.counter = 1
+        hdr = PingPongApplicationLayerMessageHeader(PingPongApplicationLayerMessageTypes.BROADCAST, self.componentinstancenumber, MessageDestinationIdentifiers.LINKLAYERBROADCAST,
+                                                    sequencenumber=self.counter, counter=1)
         payload = eventobj.eventcontent + str(self.counter) + ": " + str(self.componentinstancenumber) 
-        broadcastmessage = GenericMessage(hdr, payload)
+        broadcastmessage = FrozenMessage(hdr, payload)
         #print(f"Payload length {len(payload)}")
         evt = Event(self, EventTypes.MFRT, broadcastmessage)
-        logger.debug(f"{self.componentname}.{self.componentinstancenumber} WILL SEND {str(evt)}")
+        logger.debug("%s.%s WILL SEND %s", self.componentname, self.componentinstancenumber, evt)
         self.send_down(evt)
     
\ No newline at end of file
@@ -1,7 +1,4 @@
-from asyncore import loop
-from platform import node
 import queue
-from audioop import mul
 from enum import Enum
 from threading import Thread
 
@@ -65,7 +62,7 @@ class GenericChannel(GenericModel):
     self.send_peer(eventobj)
 
   def on_message_from_peer(self, eventobj: Event):
-    logger.debug(f"{self.componentname}-{self.componentinstancenumber} on_deliver_to_component {self.componentname}")
+    logger.debug("%s-%s on_deliver_to_component %s", self.componentname, self.componentinstancenumber, self.componentname)
     myevent = Event(self, EventTypes.MFRB,
                      eventobj.eventcontent, fromchannel=self.componentinstancenumber,
                      eventid=eventobj.eventid, eventsource_componentname=eventobj.eventsource_componentname, eventsource_componentinstancenumber=eventobj.eventsource_componentinstancenumber)
@@ -75,7 +72,7 @@ class GenericChannel(GenericModel):
 class GenericChannelWithLoopback(GenericChannel):
 
   def on_message_from_peer(self, eventobj: Event):
-    logger.debug(f"{self.componentname}-{self.componentinstancenumber} on_deliver_to_component {self.componentname}")
+    logger.debug("%s-%s on_deliver_to_component %s", self.componentname, self.componentinstancenumber, self.componentname)
     myevent = Event(self, EventTypes.MFRB,
                      eventobj.eventcontent, fromchannel=self.componentinstancenumber,
                      eventid=eventobj.eventid, eventsource_componentname=eventobj.eventsource_componentname, eventsource_componentinstancenumber=eventobj.eventsource_componentinstancenumber)
@@ -12,12 +12,17 @@ class MacCsmaPPersistentConfigurationParameters (ComponentConfigurationParameter
         self.cca_threshold = cca_threshold
 
 class MacCsmaPPersistent(GenericMac):
+    # Backoff unit in seconds, a busy channel is retried after a random number of slots up to 2**retrialcnt
+    slottime = 0.001
+    # Retry delay in seconds after deferring a transmission with probability 1-p
+    deferdelay = 0.00001
     
     #Constructor
     def __init__(self, componentname, componentinstancenumber, context=None, configurationparameters=None, num_worker_threads=1, topology=None, sdr=None):
         super().__init__(componentname, componentinstancenumber, context, configurationparameters, num_worker_threads, topology, sdr)
         self.p = configurationparameters.p
         self.cca_threshold = configurationparameters.cca_threshold
+        self.handleframescheduled = False
     
     #on_init will be called from topo.start to initialize components
     def on_init(self, eventobj: Event):
@@ -25,27 +30,43 @@ class MacCsmaPPersistent(GenericMac):
         super().on_init(eventobj)  # required because of inheritence
         #logger.debug(f"{self.componentname}.{self.componentinstancenumber} RECEIVED {str(eventobj)}")
 
+    def on_handlemacframe(self, eventobj: Event):
+        self.handleframescheduled = False
+        self.handle_frame()
+
+    # Retries handle_frame after delay seconds, the component handles its other events while it waits.
+    # At most one retry is pending, on_message_from_top does not bypass a running backoff.
+    def schedule_handle_frame(self, delay):
+        if self.handleframescheduled:
+            return
+        self.handleframescheduled = True
+        if delay > 0:
+            self.send_self_after(delay, Event(self, GenericMacEventTypes.HANDLEMACFRAME, None))
+        else:
+            self.send_self(Event(self, GenericMacEventTypes.HANDLEMACFRAME, None))
+
     def handle_frame(self):
-        #TODO: not a good solution put message in queue, schedule a future event to retry yhe first item in queueu    
-        if self.framequeue.qsize() > 0:
-            randval = random.random()
-            if randval < self.p: # TODO: Check if correct
-                clearmi, powerdb  = self.sdrdev.ischannelclear(threshold=self.cca_threshold)
-                if  clearmi == True:
-                    try:
-                        eventobj = self.framequeue.get()
-                        evt = Event(self, EventTypes.MFRT, eventobj.eventcontent)
-                        self.send_down(evt)
-                        self.retrialcnt = 0
-                    except Exception as e:
-                        logger.critical(f"MacCsmaPPersistent handle_frame exception {e}")
-                else:
-                    self.retrialcnt = self.retrialcnt + 1
-                    time.sleep(random.randrange(0,math.pow(2,self.retrialcnt))*0.001)
+        if self.handleframescheduled or self.framequeue.qsize() == 0:
+            # A retry is pending, or nothing to send: on_message_from_top calls handle_frame for the next frame
+            return
+        randval = random.random()
+        if randval < self.p: # TODO: Check if correct
+            clearmi, powerdb  = self.sdrdev.ischannelclear(threshold=self.cca_threshold)
+            if  clearmi == True:
+                try:
+                    eventobj = self.framequeue.get()
+                    evt = Event(self, EventTypes.MFRT, eventobj.eventcontent)
+                    self.send_down(evt)
+                    self.retrialcnt = 0
+                except Exception as e:
+                    logger.critical("MacCsmaPPersistent handle_frame exception %s", e)
+                if self.framequeue.qsize() > 0:
+                    self.schedule_handle_frame(0)
+            else:
+                self.retrialcnt = self.retrialcnt + 1
+                self.schedule_handle_frame(random.randrange(0,math.pow(2,self.retrialcnt))*self.slottime)
         else:
-            pass
-        time.sleep(0.00001) # TODO: Think about this otherwise we will only do cca
-        self.send_self(Event(self, GenericMacEventTypes.HANDLEMACFRAME, None)) #Continuously trigger handle_frame
+            self.schedule_handle_frame(self.deferdelay)
         
             
                 
@@ -19,7 +19,7 @@ class GenericMac(GenericModel):
     
     def on_init(self, eventobj: Event):
         self.send_self(Event(self, GenericMacEventTypes.HANDLEMACFRAME, None))  # Continuously trigger handle_frame
-        logger.debug(f"{self.componentname}.{self.componentinstancenumber} RECEIVED {str(eventobj)}")
+        logger.debug("%s.%s RECEIVED %s", self.componentname, self.componentinstancenumber, eventobj)
 
     def on_handlemacframe(self, eventobj: Event): 
         #logger.debug(f"{self.componentname}.{self.componentinstancenumber} RECEIVED {str(eventobj)}")   
@@ -28,12 +28,12 @@ class GenericMac(GenericModel):
         # HANDLEMACFRAME event will be generated by the inheriting component to facilitate delay
     
     def on_message_from_bottom(self, eventobj: Event):
-        logger.debug(f"{self.componentname}.{self.componentinstancenumber} RECEIVED {str(eventobj)}")
+        logger.debug("%s.%s RECEIVED %s", self.componentname, self.componentinstancenumber, eventobj)
         evt = Event(self, EventTypes.MFRB, eventobj.eventcontent)
         self.send_up(evt)
     
     def on_message_from_top(self, eventobj: Event):
-        logger.debug(f"{self.componentname}.{self.componentinstancenumber} RECEIVED {str(eventobj)}")
+        logger.debug("%s.%s RECEIVED %s", self.componentname, self.componentinstancenumber, eventobj)
         # put message in queue and try accessing the channel
         self.framequeue.put_nowait(eventobj)
         self.handle_frame()
@@ -7,6 +7,9 @@ from ...GenericModel import *
 class NetworkLayerMessageTypes(Enum):
   NETMSG = "NETMSG"
 
+class NetworkLayerEventTypes(Enum):
+  ROUTESCHANGED = "routeschanged"
+
 # define your own message header structure
 class NetworkLayerMessageHeader(GenericMessageHeader):
   pass
@@ -19,14 +22,23 @@ class GenericNetworkLayer(GenericModel):
 
   def __init__(self, componentname, componentinstancenumber, context=None, configurationparameters=None, num_worker_threads=1, topology=None):
     super().__init__(componentname, componentinstancenumber, context, configurationparameters, num_worker_threads, topology)
-    self.fw_table = dict(nx.all_pairs_shortest_path(topology.G))
+    self.eventhandlers[NetworkLayerEventTypes.ROUTESCHANGED] = self.on_routes_changed
+    if self.topology is not None:
+      self.topology.add_route_listener(self.componentinstancenumber, self.routes_changed)
+
+  # Called by the topology when edges are added or removed, the change is handled in the thread of the component
+  def routes_changed(self, destinations):
+    self.trigger_event(Event(self, NetworkLayerEventTypes.ROUTESCHANGED, destinations))
+
+  # eventcontent is the list of destinations whose next hop changed, override to react to route changes
+  def on_routes_changed(self, eventobj: Event):
+    logger.debug("%s-%s routes changed towards %s", self.componentname, self.componentinstancenumber, eventobj.eventcontent)
 
   def on_message_from_top(self, eventobj: Event):
     # Encapsulate the SDU in network layer PDU
     applmsg = eventobj.eventcontent
     destination = applmsg.header.messageto
     nexthop = self.get_next_hop(self.componentinstancenumber, destination)
-    # logger.debug(self.fw_table)
     if nexthop != float('inf'):
       # logger.debug(f"{self.componentinstancenumber} will SEND a message to {destination} over {nexthop}")
       hdr = NetworkLayerMessageHeader(NetworkLayerMessageTypes.NETMSG, self.componentinstancenumber, destination, nexthop)
@@ -59,12 +71,7 @@ class GenericNetworkLayer(GenericModel):
         pass
         # logger.debug(f"NO PATH {self.componentinstancenumber} will NOT FORWARD a message to {destination} over {nexthop}")
 
+  # The next hops come from the forwarding table shared by the whole topology, see Topology.get_next_hop
   def get_next_hop(self, fromId, toId):
-    try:
-      retval = self.fw_table[fromId][toId]
-      return retval[1]
-    except KeyError:
-      return inf
-    except IndexError:
-      return fromId
+    return self.topology.get_next_hop(fromId, toId)
 
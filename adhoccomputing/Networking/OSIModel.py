@@ -12,7 +12,7 @@ class AHCChannelError(Exception):
 class AdHocNode(GenericModel):
 
   def on_init(self, eventobj: Event):
-    logger.debug(f"{self.componentname}.{self.componentinstancenumber} RECEIVED {str(eventobj)}")
+    logger.debug("%s.%s RECEIVED %s", self.componentname, self.componentinstancenumber, eventobj)
 
   def on_message_from_top(self, eventobj: Event):
     self.send_down(Event(self, EventTypes.MFRT, eventobj.eventcontent))
@@ -43,6 +43,14 @@ class AdHocNode(GenericModel):
     self.connect_me_to_component(ConnectorTypes.UP, self.linklayer)
 
 
+  # Marks the pass-through layers of the node for inline dispatch so that a message traverses
+  # transport -> network -> link -> node as function calls. The application layer keeps its own thread.
+  def set_inline_stack(self, enabled=True):
+    self.inlinedispatch = enabled
+    self.transportlayer.inlinedispatch = enabled
+    self.netlayer.inlinedispatch = enabled
+    self.linklayer.inlinedispatch = enabled
+
   def connect_to_layer(self, down, up, newLayer):
     newLayer.connect_me_to_component(ConnectorTypes.DOWN, down)
     newLayer.connect_me_to_component(ConnectorTypes.UP, up)
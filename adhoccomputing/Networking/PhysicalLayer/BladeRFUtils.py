@@ -2,8 +2,6 @@ import sys
 import os
 import threading
 import time
-from bladerf              import _bladerf, _tool
-from bladerf._bladerf import libbladeRF
 from ...Generics import *
 from threading import Thread, Lock
 from .SDRUtils import SDRUtils
@@ -13,6 +11,9 @@ from .LiquidDspUtils import *
 import math
 from ...Networking.PhysicalLayer.FrameHandlerBase import PhyEventTypes, PhyFrame
 
+_bladerf = LazyImport("bladerf._bladerf")
+libbladeRF = LazyImport("bladerf._bladerf", "libbladeRF")
+
 class BladeRFUtils(SDRUtils):
     
     fpgalocation = "/etc/Nuand/bladeRF/hostedx115.rbf"
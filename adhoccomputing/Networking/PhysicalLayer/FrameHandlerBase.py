@@ -2,12 +2,11 @@ from ...GenericModel import GenericModel
 import queue
 from threading import Thread
 from .SDRUtils import SDRUtils
-import zlib
 from .LiquidDspUtils import *
 from enum import Enum
 from ...Generics import *
+from ...WireCodec import encode
 from ctypes import *
-import pickle
 import numpy as np
 import copy
 # define your own message types
@@ -108,7 +107,7 @@ class FrameHandlerBase(GenericModel):
       myqueue.task_done()
 
   def on_recv(self, eventobj: Event):
-    logger.debug(f"{self.componentname}.{self.componentinstancenumber} RECEIVED {str(eventobj)}")
+    logger.debug("%s.%s RECEIVED %s", self.componentname, self.componentinstancenumber, eventobj)
 
     if 0 or eventobj.eventcontent.payload.phyheader.messagefrom != self.componentinstancenumber:
       msg = GenericMessage(eventobj.eventcontent.payload.phyheader, eventobj.eventcontent.payload.phypayload)
@@ -126,11 +125,11 @@ class FrameHandlerBase(GenericModel):
       msg = GenericMessage(hdr, pld)
       
       ##### COMPRESS
-      byte_arr_msg = bytearray(zlib.compress(pickle.dumps(msg)))
+      byte_arr_msg = bytearray(encode(msg, compress=True))
       payload_len = len(byte_arr_msg)
       payload = np.frombuffer(byte_arr_msg, dtype=np.ubyte)
       self.transmit(header, payload, payload_len, LIQUID_MODEM_QPSK, LIQUID_FEC_NONE, LIQUID_FEC_HAMMING74 )  # TODO: Check params
       #logger.applog(f"Trasmitting {payload_len} bytes")
       
     except Exception as ex:
-      logger.critical(f"exection in pickle {ex}")
+      logger.critical(f"exection in encode {ex}")
@@ -23,13 +23,58 @@ class FunctionFactoryStub:
 # You can either re-run clan2py with -l /path/to/library.so
 # Or manually fix this by comment the ctypes.CDLL loading
 _libraries = {}
+
+
+# libliquid is opened when the first of its functions is called, not when this module is imported: the thousands
+# of prototypes below only record their restype and argtypes, and the PHY modules can be imported on hosts
+# without liquid-dsp.
+class LazyLibrary:
+    def __init__(self, path):
+        self.path = path
+        self.library = None
+
+    def load(self):
+        if self.library is None:
+            if self.path is None:
+                raise OSError(f"liquid-dsp is not supported on {platform.system()}")
+            self.library = ctypes.CDLL(self.path)
+        return self.library
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return LazyFunction(self, name)
+
+
+class LazyFunction:
+    def __init__(self, library, name):
+        self.library = library
+        self.name = name
+        self.restype = ctypes.c_int
+        self.argtypes = None
+        self.function = None
+
+    def resolve(self):
+        if self.function is None:
+            function = getattr(self.library.load(), self.name)
+            function.restype = self.restype
+            if self.argtypes is not None:
+                function.argtypes = self.argtypes
+            self.function = function
+        return self.function
+
+    def __call__(self, *args):
+        return self.resolve()(*args)
+
+
 #liquiddsp = FunctionFactoryStub() #  ctypes.CDLL('FIXME_STUB')
 myplatform = platform.system()
+liquiddsp = LazyLibrary(None)
 if myplatform == "Darwin":
-    liquiddsp = ctypes.CDLL("/usr/local/lib/libliquid.dylib")
+    liquiddsp = LazyLibrary("/usr/local/lib/libliquid.dylib")
 
 if myplatform == "Linux":
-    liquiddsp = ctypes.CDLL("/usr/local/lib/libliquid.so")
+    liquiddsp = LazyLibrary("/usr/local/lib/libliquid.so")
 
 
 def string_cast(char_pointer, encoding='utf-8', errors='strict'):
@@ -6,7 +6,6 @@
 #TL = -70 dBm/MHz + 10 × log10 (100 mW / Pout) (Pout in mW e.i.r.p.)
 
 
-import uhd
 import math
 from threading import Thread, Lock
 import numpy as np
@@ -20,6 +19,8 @@ from .SDRUtils import SDRUtils
 from ...Generics import *
 from ...Networking.PhysicalLayer.FrameHandlerBase import PhyEventTypes, PhyFrame
 
+uhd = LazyImport("uhd")
+
 
 class AhcUhdUtils(SDRUtils):
     
@@ -1,8 +1,8 @@
 from ctypes import *
-import pickle
 from threading import Lock
 from .FrameHandlerBase import *
 from ...Generics import *
+from ...WireCodec import decode
 from .LiquidDspUtils import *
 import numpy as np
 
@@ -17,7 +17,7 @@ def flexframe_callback(header:POINTER(c_ubyte), header_valid:c_uint32, payload:P
         
         if payload_valid != 0:
             pload = string_at(payload, payload_len)
-            phymsg = pickle.loads(pload)
+            phymsg = decode(pload)
             msg = GenericMessage(phymsg.header, phymsg.payload)
             framer.send_self(Event(framer, PhyEventTypes.RECV, msg))
 
@@ -1,11 +1,10 @@
 from ctypes import *
-import pickle
 from threading import Lock
 from .FrameHandlerBase import *
 from ...Generics import *
+from ...WireCodec import decode
 from .LiquidDspUtils import *
 import numpy as np
-import zlib
 
 mutex = Lock()
 
@@ -21,7 +20,7 @@ def ofdm_callback(header:POINTER(c_ubyte), header_valid:c_int, payload:POINTER(c
         if payload_valid != 0:
             #ofdmflexframesync_print(framer.fs) 
             pload = string_at(payload, payload_len)
-            phymsg = pickle.loads(zlib.decompress(pload))
+            phymsg = decode(pload)
             msg = GenericMessage(phymsg.header, phymsg.payload)
             framer.send_self(Event(framer, PhyEventTypes.RECV, msg))
             agc_crcf_reset(framer.q)
@@ -49,7 +48,7 @@ class UsrpB210OfdmFlexFramePhy(FrameHandlerBase):
             logger.critical(f"Exception rx_callback: {ex}")
 
     def transmit(self, _header, _payload, _payload_len, _mod, _fec0, _fec1):
-        logger.debug(f"{self.componentname}-{self.componentinstancenumber} will send {_payload_len} bytes")
+        logger.debug("%s-%s will send %s bytes", self.componentname, self.componentinstancenumber, _payload_len)
         ofdmflexframegen_assemble(self.fg, _header, _payload, c_uint32(_payload_len))
         last_symbol = 0
         self.fgbuffer[:] = 0
@@ -21,19 +21,22 @@ import os
 sys.path.insert(0, os.getcwd())
 
 
-import matplotlib.pyplot as plt
 from enum import Enum
 import numpy as np
 import networkx as nx
 from ...GenericModel import (GenericModel, Event, EventTypes, GenericMessage,
-                 GenericMessageHeader, GenericMessagePayload, Topology, ConnectorTypes)
+                 GenericMessageHeader, FrozenMessageHeader, GenericMessagePayload, Topology, ConnectorTypes,
+                 EventPriorities, setEventPriority)
 import threading
 from ...Networking.LogicalChannels.GenericChannel import GenericChannel
 from ...Networking.LinkLayer import GenericLinkLayer
 from ...Networking.NetworkLayer import GenericNetworkLayer
-from tabulate import tabulate
 from time import sleep, time
 import copy
+from ...Generics import LazyImport
+
+plt = LazyImport("matplotlib.pyplot")
+tabulate = LazyImport("tabulate", "tabulate")
 
 # @TODO: Implement dynamically changing topology
 class DSDVMessageTypes(Enum):
@@ -44,11 +47,14 @@ class DSDVMessageTypes(Enum):
     INCREMENTAL = "INCREMENTAL_DUMP"
     FULLDUMP = "FULL_DUMP"
 
-class DSDVMessageHeader(GenericMessageHeader):
+setEventPriority(DSDVMessageTypes.INCREMENTAL, EventPriorities.CONTROL)
+setEventPriority(DSDVMessageTypes.FULLDUMP, EventPriorities.CONTROL)
+
+# Updates are forwarded by every receiver, the header is immutable so that they do not change each other's copy
+class DSDVMessageHeader(FrozenMessageHeader):
     def __init__(self, messagetype, messagefrom, messageto, nexthop=float('inf'), interfaceid=float('inf'), messagesource=-1, hopcount=0, sequencenumber=-1):
-        super().__init__(messagetype, messagefrom, messageto, nexthop=nexthop, interfaceid=interfaceid, sequencenumber=sequencenumber)
-        self.messagesource = messagesource
-        self.hopcount = hopcount
+        super().__init__(messagetype, messagefrom, messageto, nexthop=nexthop, interfaceid=interfaceid, sequencenumber=sequencenumber,
+                         messagesource=messagesource, hopcount=hopcount)
 
 
 class DSDVNode(GenericModel): # It is an application layer
@@ -89,14 +95,9 @@ class DSDVNode(GenericModel): # It is an application layer
         #threading.Timer(3.0, self.updateMsgToNeighbours).start()
 
     def _timer_(self, interval, function, *args):
-        stopped = threading.Event()
-
-        def loop():
-            while not stopped.wait(interval): # the first call is in `interval` secs
-                    function(*args)
-
-        threading.Thread(target=loop).start()    
-        return stopped.set
+        # the first call is in `interval` secs, the calls run in the thread of the node
+        handle = self.set_timer(interval, lambda: function(*args), periodic=True)
+        return handle.cancel
     
     def on_message_from_bottom(self, eventobj: Event):
         super().on_message_from_bottom(eventobj)
@@ -163,10 +164,13 @@ class DSDVNode(GenericModel): # It is an application layer
                 self.routing_table[self.componentinstancenumber] = (self.componentinstancenumber, 0, self.sequence_num)
         
         packet = msg
-        for neighbour in Topology().get_neighbors(self.componentinstancenumber):
+        for neighbour in self.topology.get_neighbors(self.componentinstancenumber):
 
             if msg == None:
                 packet = self._prepare_message(neighbour)
+            else:
+                # a forwarded update still carries the interface it was received on
+                packet = msg.replace(header=msg.header.replace(messageto=neighbour, interfaceid=f"{self.componentinstancenumber}-{neighbour}"))
 
             with open(self.log_throughput_path, "a+") as f:
                 f.write(f"{time()}\t{sys.getsizeof(packet)}\n")
@@ -220,8 +224,7 @@ class DSDVNode(GenericModel): # It is an application layer
                             changes[change][1],
                             changes[change][-1]
                         )
-                header.messagefrom = self.componentinstancenumber
-                header.hopcount += 1
+                header = header.replace(messagefrom=self.componentinstancenumber, hopcount=header.hopcount + 1)
                 payload = GenericMessagePayload(others)
                 #print(len(others), sys.getsizeof(others),sys.getsizeof(payload))
                 self._broadcast(GenericMessage(header, payload), is_mine=False) # forward the packet
@@ -1,24 +1,28 @@
 from enum import Enum
 from tabulate import tabulate
 
-from ...GenericModel import GenericModel, Event, EventTypes, GenericMessageHeader, GenericMessage, MessageDestinationIdentifiers
-from threading import Timer
+from ...GenericModel import GenericModel, Event, EventTypes, GenericMessageHeader, GenericMessage, MessageDestinationIdentifiers, EventPriorities, setEventPriority, logger
 
-class DsdvTimer():
+# A restartable one-shot timer of a component. The expiration is delivered to the mailbox of the component by the
+# shared timer service, so handleFunction runs in the thread of the component instead of a timer thread of its own.
+class DsdvTimer:
 
-    def __init__(self):
+    def __init__(self, component):
+        self.component = component
         self.working = False
+        self.handle = None
 
     def start(self, interval, handleFunction, args=None, kwargs=None):
         self.interval = interval
         self.handleFunction = handleFunction
-        self.thread = Timer(self.interval, self.handleFunction, args, kwargs)
-        self.thread.daemon = True
-        self.thread.start()
+        args = args if args is not None else []
+        kwargs = kwargs if kwargs is not None else {}
+        self.handle = self.component.set_timer(self.interval, lambda: self.handleFunction(*args, **kwargs))
         self.working = True
 
     def cancel(self):
-        self.thread.cancel()
+        if self.handle is not None:
+            self.handle.cancel()
         self.working = False
 
 
@@ -29,6 +33,9 @@ class DsdvMessageTypes(Enum): # Control Plane message types
     fullDumpUpdate = "Full Dump Update Message"
     incrementalUpdate = "Incremental Update Message"
 
+setEventPriority(DsdvMessageTypes.fullDumpUpdate, EventPriorities.CONTROL)
+setEventPriority(DsdvMessageTypes.incrementalUpdate, EventPriorities.CONTROL)
+
 
 class DataMessageTypes(Enum):
     appData = "Application Data Message"
@@ -51,18 +58,18 @@ class DsdvService(GenericModel):
 
         # First entry to add to self routing table is the self distance
         self.routingTable.append([componentinstancenumber, componentinstancenumber, 0, self.sequenceNumber])
-        # Create a timer thread instance to send periodic update messages
-        self.periodicUpdateTimer = DsdvTimer()
+        # Create a timer to send periodic update messages
+        self.periodicUpdateTimer = DsdvTimer(self)
         # First message will be send 1 second after the init. The period will be different
         self.periodicUpdateTimer.start(1, self.send_periodic_update)
-        # Create timer thread instances to be able to schedule update messages aside from the periodic update
-        self.scheduleFullDumpUpdate = DsdvTimer()
-        self.scheduleIncrementalUpdate = DsdvTimer()
+        # Create timers to be able to schedule update messages aside from the periodic update
+        self.scheduleFullDumpUpdate = DsdvTimer(self)
+        self.scheduleIncrementalUpdate = DsdvTimer(self)
         # Decide interval of the periodic update messages. No hard limitation
         self.periodicUpdateMessageInterval = 10
 
         # Added only to debug. The variables can be removed
-        self.schedulePrintRoutingTable = DsdvTimer()
+        self.schedulePrintRoutingTable = DsdvTimer(self)
         self.numberOfIncrementalUpdate = 0
         self.numberOfFullDumpUpdate = 0
         self.numberOfUpdateMessage = 0
@@ -333,8 +340,7 @@ class DsdvService(GenericModel):
         entryIndex = self.search_for_entry(destination)
 
         if entryIndex == -1:  # No match in self.routing table. Drop the packet
-            print("I am: " + self.unique_name() + " Message is dropped")
-            print(payload)
+            logger.debug("I am: %s Message is dropped %s", self.unique_name(), payload)
             return -1
         else:
             nexthop = self.routingTable[entryIndex][RoutingTableColumn.nextHop.value]
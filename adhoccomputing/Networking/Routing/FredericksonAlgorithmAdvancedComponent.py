@@ -41,7 +41,7 @@ class FredericksonAlgorithmAdvancedComponent(ComponentModel):
                     thread.start()
 
     def job(self, *arg):
-        self.neighbors = Topology().get_neighbors(self.componentinstancenumber)  # retrieve all neighbor ids...
+        self.neighbors = self.topology.get_neighbors(self.componentinstancenumber)  # retrieve all neighbor ids...
         self.neighbor_weights = {a: 1 for a in self.neighbors}  # for the time being each edge weight is 1...
         if self.componentinstancenumber == 0:
             self.is_initiator = True
@@ -44,7 +44,7 @@ class FredericksonAlgorithmSimpleComponent(GenericModel):
                     thread.start()
 
     def job(self, *arg):
-        self.neighbors = Topology().get_neighbors(self.componentinstancenumber)  # retrieve all neighbor ids...
+        self.neighbors = self.topology.get_neighbors(self.componentinstancenumber)  # retrieve all neighbor ids...
         self.neighbor_weights = {a: 1 for a in self.neighbors}  # for the time being each edge weight is 1...
 
         def getPaths(data):
@@ -2,7 +2,7 @@ import time
 import traceback
 
 from ...GenericModel import GenericModel, Event, GenericMessage, Lock, \
-    GenericMessageHeader, GenericMessagePayload, Topology, EventTypes
+    GenericMessageHeader, GenericMessagePayload, Topology, EventTypes, EventPriorities, setEventPriority
 from enum import Enum
 from datetime import datetime
 import uuid
@@ -19,6 +19,9 @@ class HOLSRMessageTypes(Enum):
     HTC = "holsr.htc"
     CIA = "holsr.cia"
 
+for controlmessagetype in (HOLSRMessageTypes.HELLO, HOLSRMessageTypes.TC, HOLSRMessageTypes.HTC, HOLSRMessageTypes.CIA):
+    setEventPriority(controlmessagetype, EventPriorities.CONTROL)
+
 
 class OLSRLinkStatus(Enum):
     Unidirectional = "uni"
@@ -34,6 +37,9 @@ class OLSRMessagePayload(GenericMessagePayload):
 
 
 class OLSRComponent(GenericModel):
+    # period of the component timer, the hello, tc and cia intervals are checked on every tick
+    timer_interval = 0.05
+
     def __init__(self, component_name, component_id, context=None,
                  configurationparameters=None, num_worker_threads=1):
         super().__init__(component_name, component_id, context=context,
@@ -74,7 +80,14 @@ class OLSRComponent(GenericModel):
         current_time = datetime.now()
         self.last_hello = current_time
         self.last_tc = current_time
-        RepeatDeltaTimer().register_function(self.on_time)
+        self.last_time = current_time
+        self.timer = self.set_timer(self.timer_interval, self.on_timer_tick, periodic=True)
+
+    def on_timer_tick(self):
+        current_time = datetime.now()
+        delta = current_time - self.last_time
+        self.last_time = current_time
+        self.on_time(current_time, delta)
 
     def on_time(self, current_time, _delta):
         if (current_time - self.last_hello).total_seconds() > 0.25:
@@ -108,7 +121,7 @@ class OLSRComponent(GenericModel):
 
     def broadcast_msg(self, msg_type, payload):
         msg_from = self.componentname + "-" + str(self.componentinstancenumber)
-        for target in Topology().get_neighbors(self.componentinstancenumber):
+        for target in self.topology.get_neighbors(self.componentinstancenumber):
             hdr = OLSRMessageHeader(msg_type, msg_from, self.componentname + "-" + str(target),
                                     interfaceid=str(self.componentinstancenumber) + "-" + str(target))
             self.send_down(Event(self, EventTypes.MFRT, GenericMessage(hdr, payload)))
@@ -1,9 +1,8 @@
 import time
 from enum import Enum
-from ...GenericModel import GenericModel, Event, GenericMessage, GenericMessageHeader, GenericMessagePayload, Topology, EventTypes
+from ...GenericModel import GenericModel, Event, GenericMessage, GenericMessageHeader, GenericMessagePayload, Topology, EventTypes, EventPriorities, setEventPriority, logger
 
 rerr = 1
-topo = Topology()
 
 class AODV_ABRMessageTypes(Enum):
     RREQ = "RREQ"
@@ -14,6 +13,9 @@ class AODV_ABRMessageTypes(Enum):
     OVRH = "OVRH"
     DATA = 'DATA'
 
+for controlmessagetype in (AODV_ABRMessageTypes.RREQ, AODV_ABRMessageTypes.RREP, AODV_ABRMessageTypes.RERR, AODV_ABRMessageTypes.BRRQ, AODV_ABRMessageTypes.BRRP):
+    setEventPriority(controlmessagetype, EventPriorities.CONTROL)
+
 
 # # define your own message header structure
 class AODV_ABRMessageHeader(GenericMessageHeader):
@@ -36,7 +38,7 @@ class AODV_ABRComponent(GenericModel):
     def __init__(self, componentname, componentinstancenumber):
         print(f"Initializing {componentname}.{componentinstancenumber}")
         super().__init__(componentname, componentinstancenumber)
-        neighbour_list = topo.get_neighbors(self.componentinstancenumber)
+        neighbour_list = self.topology.get_neighbors(self.componentinstancenumber)
         self.NeighbourList = neighbour_list
         self.RoutingTable = dict()
         self.AlternateRouteTable = dict()
@@ -109,7 +111,7 @@ class AODV_ABRComponent(GenericModel):
                                                       'Seq_No':  str(hdr.sequencenumber),
                                                       'Hop_Count': str(hdr.hop_count + 1)}
                 #self.show_routing_table()
-                print('End of Routing')
+                logger.debug('End of Routing')
                 return
             else: # forward the RREP, update the Route Table for the dest, also send the OVERHEAR info to the neighbours
                 if hdr.messageto not in self.RoutingTable:
@@ -146,7 +148,7 @@ class AODV_ABRComponent(GenericModel):
                     route['Hop_Count'] = hdr.hop_count
                     route['Next_Hop'] = message_source
                 else:
-                    print('Ignoring duplicate OVERHEAR messages')
+                    logger.debug('Ignoring duplicate OVERHEAR messages')
                     pass
                 self.show_alternate_route_table()
             else:
@@ -175,17 +177,19 @@ class AODV_ABRComponent(GenericModel):
                                                                                          hdr.hop_count,
                                                                                          self.componentinstancenumber, py.messagepayload, py.toNode)))
 
-                time.sleep(5) #20
-                if rerr == 1:
-                    print('********rerr is 1 ***********')
-                    self.show_routing_table()
-                    self.send_down(Event(self, EventTypes.MFRT, self.prepare_message(AODV_ABRMessageTypes.RERR,
-                                                                                     py.messagepayload,
-                                                                                     hdr.messageto,
-                                                                                     int(self.RoutingTable[py.messagepayload]['Next_Hop']),
-                                                                                     0, hdr.sequencenumber, hdr.rreq_id,
-                                                                                     hdr.hop_count,
-                                                                                     self.componentinstancenumber, py.messagepayload, py.toNode)))
+                # Send RERR if no node has answered the BRRQ within 5 seconds (was 20)
+                def send_rerr_if_unanswered():
+                    if rerr == 1:
+                        logger.debug('********rerr is 1 ***********')
+                        self.show_routing_table()
+                        self.send_down(Event(self, EventTypes.MFRT, self.prepare_message(AODV_ABRMessageTypes.RERR,
+                                                                                         py.messagepayload,
+                                                                                         hdr.messageto,
+                                                                                         int(self.RoutingTable[py.messagepayload]['Next_Hop']),
+                                                                                         0, hdr.sequencenumber, hdr.rreq_id,
+                                                                                         hdr.hop_count,
+                                                                                         self.componentinstancenumber, py.messagepayload, py.toNode)))
+                self.set_timer(5, send_rerr_if_unanswered)
 
             else:
                 #print('Inside brrq for sending back brrp, I am node ', self.componentinstancenumber)
@@ -214,17 +218,18 @@ class AODV_ABRComponent(GenericModel):
                 elif hdr.messageto in self.RoutingTable.keys() and int(self.RoutingTable[hdr.messageto]['Next_Hop']) != int(hdr.int_sender): ################
                     rerr = 0
                     #print(self.componentinstancenumber, ' have dest entry in its route table')
-                    time.sleep(10)
-                    self.show_routing_table()
-                    route = self.RoutingTable[hdr.messageto]['Hop_Count']
-                    self.send_down(Event(self, EventTypes.MFRT, self.prepare_message(AODV_ABRMessageTypes.BRRP,
-                                                                                     message_source,
-                                                                                     hdr.messageto,
-                                                                                     message_source,
-                                                                                     0, hdr.sequencenumber, hdr.rreq_id,
-                                                                                     route,
-                                                                                     self.componentinstancenumber,
-                                                                                     py.messagepayload, py.toNode)))
+                    def send_brrp():
+                        self.show_routing_table()
+                        route = self.RoutingTable[hdr.messageto]['Hop_Count']
+                        self.send_down(Event(self, EventTypes.MFRT, self.prepare_message(AODV_ABRMessageTypes.BRRP,
+                                                                                         message_source,
+                                                                                         hdr.messageto,
+                                                                                         message_source,
+                                                                                         0, hdr.sequencenumber, hdr.rreq_id,
+                                                                                         route,
+                                                                                         self.componentinstancenumber,
+                                                                                         py.messagepayload, py.toNode)))
+                    self.set_timer(10, send_brrp)
 
                 else:
                     #print(self.componentinstancenumber, ' not have an entry for the hdr.messageto which is: ', hdr.messageto)
@@ -234,48 +239,12 @@ class AODV_ABRComponent(GenericModel):
         if hdr.messagetype == AODV_ABRMessageTypes.BRRP:
             #print('Inside brrp, I am node', self.componentinstancenumber)
             self.show_routing_table()
-            time.sleep(5)
-
-            if hdr.messageto not in self.BBRP_Responses.keys(): #if the bbrq_response[hdr.messageto] is empty, create an entry
-                self.BBRP_Responses[hdr.messageto] = {'Int_Sender': str(hdr.int_sender),
-                                                      'Hop_Count': str(hdr.hop_count)}
-                #self.show_bbrp_responses()
-
-                hopCount = int(self.BBRP_Responses[hdr.messageto]['Hop_Count']) + 1
-                hopCount2 = int(self.RoutingTable[py.toNode]['Hop_Count']) + 1
-
-                self.RoutingTable[py.toNode] = {'Dest': str(py.toNode),
-                                                'Next_Hop': str(self.BBRP_Responses[hdr.messageto]['Int_Sender']),
-                                                'Seq_No': str(hdr.sequencenumber),
-                                                'Hop_Count': str(hopCount2)}
-
-                self.RoutingTable[hdr.messageto] = {'Dest': str(hdr.messageto),
-                                                'Next_Hop': str(self.BBRP_Responses[hdr.messageto]['Int_Sender']),
-                                                 'Seq_No': str(hdr.sequencenumber),
-                                                 'Hop_Count': str(hopCount)}
-                self.show_routing_table()
-            else:
-                if int(self.BBRP_Responses[hdr.messageto]['Hop_Count']) > int(hdr.hop_count): # if the received brrp response is better
-                    self.BBRP_Responses[py.toNode] = {'Int_Sender': str(hdr.int_sender),
-                                                      'Hop_Count': str(hdr.hop_count)}
-                    #self.show_bbrp_responses()
-                else:
-                    #print('if the received brrp response is the same')
-                    pass
-
-                hopCount = int(self.BBRP_Responses[hdr.messageto]['Hop_Count']) + 1
-
-                self.RoutingTable[hdr.messageto] = {'Dest': str(hdr.messageto),
-                                                'Next_Hop': str(self.BBRP_Responses[hdr.messageto]['Int_Sender']),
-                                                 'Seq_No': str(hdr.sequencenumber),
-                                                 'Hop_Count': str(hopCount)}
-
-                self.show_routing_table()
+            self.set_timer(5, lambda: self.handle_brrp(hdr, py))
 
         if hdr.messagetype == AODV_ABRMessageTypes.RERR:
 
             if hdr.messagefrom == self.componentinstancenumber:
-                print('I am node ', self.componentinstancenumber, ' and restarting RREQ after receiving RERR'),
+                logger.debug('I am node %s and restarting RREQ after receiving RERR', self.componentinstancenumber)
                 for i in self.NeighbourList:
                     self.send_down(Event(self, EventTypes.MFRT, self.prepare_message(AODV_ABRMessageTypes.RREQ,
                                                                                      py.messagepayload,
@@ -285,7 +254,7 @@ class AODV_ABRComponent(GenericModel):
                                                                                      0,
                                                                                      self.componentinstancenumber)))
             else:
-                print('hello from RERR, I am node', self.componentinstancenumber, ' and forwarding RERR message to the node ', py.messagepayload)
+                logger.debug('hello from RERR, I am node %s and forwarding RERR message to the node %s', self.componentinstancenumber, py.messagepayload)
                 self.show_routing_table()
                 self.send_down(Event(self, EventTypes.MFRT, self.prepare_message(AODV_ABRMessageTypes.RERR,
                                                                                  py.messagepayload,
@@ -296,6 +265,44 @@ class AODV_ABRComponent(GenericModel):
                                                                                  hdr.hop_count,
                                                                                  self.componentinstancenumber)))
 
+    # Handles a BRRP 5 seconds after it is received, when the other responses are in as well
+    def handle_brrp(self, hdr, py):
+        if hdr.messageto not in self.BBRP_Responses.keys(): #if the bbrq_response[hdr.messageto] is empty, create an entry
+            self.BBRP_Responses[hdr.messageto] = {'Int_Sender': str(hdr.int_sender),
+                                                  'Hop_Count': str(hdr.hop_count)}
+            #self.show_bbrp_responses()
+
+            hopCount = int(self.BBRP_Responses[hdr.messageto]['Hop_Count']) + 1
+            hopCount2 = int(self.RoutingTable[py.toNode]['Hop_Count']) + 1
+
+            self.RoutingTable[py.toNode] = {'Dest': str(py.toNode),
+                                            'Next_Hop': str(self.BBRP_Responses[hdr.messageto]['Int_Sender']),
+                                            'Seq_No': str(hdr.sequencenumber),
+                                            'Hop_Count': str(hopCount2)}
+
+            self.RoutingTable[hdr.messageto] = {'Dest': str(hdr.messageto),
+                                            'Next_Hop': str(self.BBRP_Responses[hdr.messageto]['Int_Sender']),
+                                             'Seq_No': str(hdr.sequencenumber),
+                                             'Hop_Count': str(hopCount)}
+            self.show_routing_table()
+        else:
+            if int(self.BBRP_Responses[hdr.messageto]['Hop_Count']) > int(hdr.hop_count): # if the received brrp response is better
+                self.BBRP_Responses[py.toNode] = {'Int_Sender': str(hdr.int_sender),
+                                                  'Hop_Count': str(hdr.hop_count)}
+                #self.show_bbrp_responses()
+            else:
+                #print('if the received brrp response is the same')
+                pass
+
+            hopCount = int(self.BBRP_Responses[hdr.messageto]['Hop_Count']) + 1
+
+            self.RoutingTable[hdr.messageto] = {'Dest': str(hdr.messageto),
+                                            'Next_Hop': str(self.BBRP_Responses[hdr.messageto]['Int_Sender']),
+                                             'Seq_No': str(hdr.sequencenumber),
+                                             'Hop_Count': str(hopCount)}
+
+            self.show_routing_table()
+
     def start_routing(self, src_node, dest_node):
         print('Starting AODV-ABR Routing from node', src_node.componentinstancenumber, 'to node ',
               dest_node.componentinstancenumber)
@@ -7,7 +7,6 @@ from enum import Enum
 sys.path.insert(0, os.getcwd())
 
 import networkx as nx
-import matplotlib.pyplot as plt
 
 from ...GenericModel import GenericModel, Event, ConnectorTypes, Topology, MessageDestinationIdentifiers, GenericMessagePayload, GenericMessageHeader, GenericMessage, EventTypes
 from ...Distribution.LogicalChannelProcess import LogicalChannelProcess
@@ -65,8 +64,7 @@ class ApplicationLayerComponent(GenericModel):
             payload = ApplicationLayerMessagePayload("23")
             hellomessage = GenericMessage(hdr, payload)
             randdelay = random.randint(0, 5)
-            time.sleep(randdelay)
-            self.send_self(Event(self, "HELLO_MESSAGE", hellomessage))
+            self.send_self_after(randdelay, Event(self, "HELLO_MESSAGE", hellomessage))
 
         elif self.componentinstancenumber == 2:
             destination = 0
@@ -84,9 +82,8 @@ class ApplicationLayerComponent(GenericModel):
             hdr.destinationsequencenumber = ""
             hdr.feasibledistance = 0            
             randdelay = random.randint(0, 5)
-            time.sleep(randdelay)
             rreqmessage = GenericMessage(hdr, payload)
-            self.send_self(Event(self, "RREQ_MESSAGE", rreqmessage))
+            self.send_self_after(randdelay, Event(self, "RREQ_MESSAGE", rreqmessage))
 
     def on_message_from_bottom(self, eventobj: Event):
         try:
@@ -130,8 +127,8 @@ class ApplicationLayerComponent(GenericModel):
     # self.trigger_event(myevent)
 
     def update_topology(self):
-        Topology().nodecolors[self.componentinstancenumber] = 'r'
-        Topology().plot()
+        self.topology.nodecolors[self.componentinstancenumber] = 'r'
+        self.topology.plot()
 
     def __init__(self, componentname, componentinstancenumber): 
         super().__init__(componentname, componentinstancenumber)
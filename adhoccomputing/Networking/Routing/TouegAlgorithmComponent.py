@@ -49,7 +49,7 @@ class TouegRoutingComponent(GenericModel):
                 parts = int(element.split("MachineLearningNode")[1])
                 self.all_process_ids.append(parts)
         print("Available nodes : ", self.all_process_ids)
-        self.neighbors = Topology().get_neighbors(self.componentinstancenumber) # retrieve all neighbor ids...
+        self.neighbors = self.topology.get_neighbors(self.componentinstancenumber) # retrieve all neighbor ids...
 
         self.neighbor_weights = {a: 1 for a in self.neighbors} # for the time being each edge weight is 1...
 
@@ -1,5 +1,5 @@
 from numpy import inner
-from ...GenericModel import GenericModel, Event, GenericMessage, GenericMessageHeader, GenericMessagePayload, EventTypes, ComponentRegistry, Lock, Thread, Topology, ConnectorTypes, MessageDestinationIdentifiers
+from ...GenericModel import GenericModel, Event, GenericMessage, GenericMessageHeader, GenericMessagePayload, EventTypes, ComponentRegistry, Lock, Thread, Topology, ConnectorTypes, MessageDestinationIdentifiers, EventPriorities, setEventPriority, logger
 from ...DistributedAlgorithms.Broadcasting import BroadcastingMessageHeader
 from ...Networking.LogicalChannels import  GenericChannel
 from ...Networking.LinkLayer import GenericLinkLayer
@@ -48,6 +48,9 @@ class AODVLayerMessageType(Enum):
     RERR = "RERR"
     DATA = "DATA"
 
+for controlmessagetype in (AODVLayerMessageType.RREQ, AODVLayerMessageType.RREP, AODVLayerMessageType.RERR):
+  setEventPriority(controlmessagetype, EventPriorities.CONTROL)
+
 class AODVLayer(GenericModel):
   def __init__(self, componentname, componentinstancenumber):
     super().__init__(componentname, componentinstancenumber)
@@ -69,8 +72,8 @@ class AODVLayer(GenericModel):
       # self.update_routing_table(4,6,3,1)
 
   def update_topology(self):
-    Topology().nodecolors[self.componentinstancenumber] = 'r'
-    # Topology().plot()
+    self.topology.nodecolors[self.componentinstancenumber] = 'r'
+    # self.topology.plot()
 
   def on_rreq(self, eventobj: Event):
     # self.update_topology()
@@ -174,64 +177,61 @@ class AODVLayer(GenericModel):
             
       with self.rreqLock:
         if (applicationLayerMessage.uniqueid in self.broadcastdb):
-          print(f"RREQ Message Received Already # Receiver: {self.componentname}.{self.componentinstancenumber} from node: {previousNode} with uniqueid {applicationLayerMessage.uniqueid}. Skipping...")
+          logger.debug("RREQ Message Received Already # Receiver: %s.%s from node: %s with uniqueid %s. Skipping...", self.componentname, self.componentinstancenumber, previousNode, applicationLayerMessage.uniqueid)
 
         else:
           self.broadcastdb.append(applicationLayerMessage.uniqueid)
         
           if(source == self.componentinstancenumber):
-            print(f"RREQ Message Arrived to Source # Receiver: {self.componentname}.{self.componentinstancenumber} from node: {previousNode} with uniqueid {applicationLayerMessage.uniqueid}. Skipping...")
+            logger.debug("RREQ Message Arrived to Source # Receiver: %s.%s from node: %s with uniqueid %s. Skipping...", self.componentname, self.componentinstancenumber, previousNode, applicationLayerMessage.uniqueid)
 
           else:
-            print(f"RREQ Message Received # Receiver: {self.componentname}.{self.componentinstancenumber} from node:{previousNode} for source:{source}")
+            logger.debug("RREQ Message Received # Receiver: %s.%s from node:%s for source:%s", self.componentname, self.componentinstancenumber, previousNode, source)
             self.update_routing_table(source, previousNode, hopCount, sequencenumber)
 
             self.update_topology()
             if destination == self.componentinstancenumber:
               #RREQ arrived to destination. Send RREP
-              time.sleep(random.randint(1, 1))
-              print(f"RREP Message Send # Sender: {self.componentname}.{self.componentinstancenumber} for source {source} for destionation {destination}")
+              logger.debug("RREP Message Send # Sender: %s.%s for source %s for destionation %s", self.componentname, self.componentinstancenumber, source, destination)
               evt = Event(self, AODVLayerMessageType.RREP, applicationLayerMessage)
-              self.send_self(evt)
+              self.send_self_after(random.randint(1, 1), evt)
             
             elif self.get_next_hop(destination, sequencenumber) != inf:
               #Destination is known from routing table, send RREP
-              time.sleep(random.randint(1, 1))
-              print(f"Node Knows Destination # Receiver: {self.componentname}.{self.componentinstancenumber} for source {source} for destionation {destination}")
-              print(f"RREP Message Send # Sender: {self.componentname}.{self.componentinstancenumber} for source {source} for destionation {destination}")
+              logger.debug("Node Knows Destination # Receiver: %s.%s for source %s for destionation %s", self.componentname, self.componentinstancenumber, source, destination)
+              logger.debug("RREP Message Send # Sender: %s.%s for source %s for destionation %s", self.componentname, self.componentinstancenumber, source, destination)
               evt = Event(self, AODVLayerMessageType.RREP, applicationLayerMessage)
-              self.send_self(evt)
+              self.send_self_after(random.randint(1, 1), evt)
               
             else:
               #Rebroadcast RREQ
-              time.sleep(random.randint(1, 1))
-              print(f"RREQ Message Resend # Sender: {self.componentname}.{self.componentinstancenumber} for source {source} for destination {destination}")
+              logger.debug("RREQ Message Resend # Sender: %s.%s for source %s for destination %s", self.componentname, self.componentinstancenumber, source, destination)
               evt = Event(self, AODVLayerMessageType.RREQ, applicationLayerMessage)
-              self.send_self(evt)
+              self.send_self_after(random.randint(1, 1), evt)
     
     elif broadcastingMessageHeader.messagetype == AODVLayerMessageType.RREP:
 
       with self.rrepLock:
         if (applicationLayerMessage.uniqueid in self.rrepdb) and (self.rrepdb[applicationLayerMessage.uniqueid]["hopCount"] <= hopCount):
-          print(f"RREP Message Received Already # Receiver: {self.componentname}.{self.componentinstancenumber} from node: {previousNode} with uniqueid {applicationLayerMessage.uniqueid}. Skipping...")
+          logger.debug("RREP Message Received Already # Receiver: %s.%s from node: %s with uniqueid %s. Skipping...", self.componentname, self.componentinstancenumber, previousNode, applicationLayerMessage.uniqueid)
 
         else:
           self.rrepdb[applicationLayerMessage.uniqueid] = {"hopCount": hopCount}
           self.update_routing_table(destination, previousNode, hopCount, sequencenumber)
 
           if(source == self.componentinstancenumber):
-            print(f"RREP Message Arrived to Source # Receiver: {self.componentname}.{self.componentinstancenumber} from {previousNode} with uniqueid {applicationLayerMessage.uniqueid}")
-            print(f"DATA Message Send # Sender: {self.componentname}.{self.componentinstancenumber} for source {source} for destionation {destination}")
+            logger.debug("RREP Message Arrived to Source # Receiver: %s.%s from %s with uniqueid %s", self.componentname, self.componentinstancenumber, previousNode, applicationLayerMessage.uniqueid)
+            logger.debug("DATA Message Send # Sender: %s.%s for source %s for destionation %s", self.componentname, self.componentinstancenumber, source, destination)
             evt = Event(self, AODVLayerMessageType.DATA, applicationLayerMessage)
             self.send_self(evt)
         
           else:
-            print(f"Received RREP Message # Receiver: {self.componentname}.{self.componentinstancenumber} from {previousNode} for source {source}")
+            logger.debug("Received RREP Message # Receiver: %s.%s from %s for source %s", self.componentname, self.componentinstancenumber, previousNode, source)
         
             self.update_topology()
         
             if self.get_next_hop(source, sequencenumber) != inf:
-              print(f"RREP Message Send # Sender {self.componentname}.{self.componentinstancenumber} for source {source} for destionation {destination}")
+              logger.debug("RREP Message Send # Sender %s.%s for source %s for destionation %s", self.componentname, self.componentinstancenumber, source, destination)
               evt = Event(self, AODVLayerMessageType.RREP, applicationLayerMessage)
               self.send_self(evt)
             else:
@@ -241,14 +241,14 @@ class AODVLayer(GenericModel):
     elif broadcastingMessageHeader.messagetype == AODVLayerMessageType.DATA:      
     
       if(destination == self.componentinstancenumber):
-        print(f"DATA Message Arrived to Destination # Receiver: {self.componentname}.{self.componentinstancenumber} from {previousNode} with uniqueid {applicationLayerMessage.uniqueid}")
+        logger.debug("DATA Message Arrived to Destination # Receiver: %s.%s from %s with uniqueid %s", self.componentname, self.componentinstancenumber, previousNode, applicationLayerMessage.uniqueid)
         self.send_up(Event(self, EventTypes.MFRB, eventobj.eventcontent))
     
       else:
-        print(f"Received DATA Message # Receiver: {self.componentname}.{self.componentinstancenumber} from {previousNode} for destination {destination}")
+        logger.debug("Received DATA Message # Receiver: %s.%s from %s for destination %s", self.componentname, self.componentinstancenumber, previousNode, destination)
     
         if self.get_next_hop(destination, sequencenumber) != inf:
-          print(f"DATA Message Send # Sender: {self.componentname}.{self.componentinstancenumber} for source {source} for destionation {destination}")
+          logger.debug("DATA Message Send # Sender: %s.%s for source %s for destionation %s", self.componentname, self.componentinstancenumber, source, destination)
           evt = Event(self, AODVLayerMessageType.DATA, applicationLayerMessage)
           self.send_self(evt)
         else:
@@ -297,7 +297,7 @@ class AODVLayer(GenericModel):
       pass
     
     if((retval == inf) or (hopCount < retval["hopCount"])):
-      print(f"Routing Table Updated # Node: {self.componentname}.{self.componentinstancenumber} Data => destination:{destination} nextHop:{nextHop} hopCount:{hopCount} sequenceNumber:{destinationSequenceNumber}")
+      logger.debug("Routing Table Updated # Node: %s.%s Data => destination:%s nextHop:%s hopCount:%s sequenceNumber:%s", self.componentname, self.componentinstancenumber, destination, nextHop, hopCount, destinationSequenceNumber)
       # lifeTime da gerekli olabilir
       self.RoutingTable[destination] = {
         "destination": destination,
@@ -86,7 +86,7 @@ class ApplicationLayerMessageMessagePayload(GenericMessagePayload):
 class RoutingTORAApplicationLayerComponent(ComponentModel):
     def __init__(self, componentname, componentinstancenumber):
         super().__init__(componentname, componentinstancenumber)
-        self.neighbors = Topology().get_neighbors(componentinstancenumber)
+        self.neighbors = self.topology.get_neighbors(componentinstancenumber)
 
         self.height: TORAHeight = TORAHeight(
             None, None, None, None, self.componentinstancenumber
@@ -385,7 +385,7 @@ class RoutingTORAApplicationLayerComponent(ComponentModel):
         self.height = height
 
         for destination_neighbour in self.neighbors:
-            Topology().nodes[destination_neighbour].set_neighbour_height(
+            self.topology.nodes[destination_neighbour].set_neighbour_height(
                 self.componentinstancenumber, height
             )
 
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+from .GenericRuntime import *
+
+
+# All components run as coroutines on a single asyncio event loop. Each component has an asyncio.Queue as its
+# mailbox and one task that serves it, so the order of events per component is kept as in the threaded model.
+# Event handlers may be declared with async def; they are awaited by the task of the component, hence a handler
+# can await asyncio.sleep() without blocking the other components. send_down, send_up and send_peer keep their
+# semantics: they call trigger_event of the connected components which puts the event to their mailboxes.
+class AsyncioRuntime(GenericRuntime):
+
+    def __init__(self, loop=None):
+        self.loop = loop if loop is not None else asyncio.new_event_loop()
+        self.loopthreadid = None
+        self.thread = None
+        self.tasks = []
+
+    def register(self, component):
+        component.asynciomailbox = asyncio.Queue()
+        if self.loop.is_running() and threading.get_ident() != self.loopthreadid:
+            self.loop.call_soon_threadsafe(self.start_component, component)
+        else:
+            self.start_component(component)
+
+    def start_component(self, component):
+        self.tasks.append(self.loop.create_task(self.component_task(component)))
+
+    def now(self):
+        return self.loop.time()
+
+    def schedule(self, component, eventobj: Event, delay=0.0):
+        if delay > 0:
+            self.loop.call_soon_threadsafe(self.loop.call_later, delay, component.asynciomailbox.put_nowait, eventobj)
+        elif threading.get_ident() == self.loopthreadid:
+            component.asynciomailbox.put_nowait(eventobj)
+        else:
+            self.loop.call_soon_threadsafe(component.asynciomailbox.put_nowait, eventobj)
+
+    async def component_task(self, component):
+        mailbox = component.asynciomailbox
+        while not component.terminated:
+            eventobj = await mailbox.get()
+            try:
+                result = component.dispatch_event(eventobj)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as ex:
+                logger.error(f"{component.componentname}.{component.componentinstancenumber} handler for {eventobj.event} raised {ex}")
+
+    # Runs the event loop in the calling thread, forever or for duration seconds
+    def run(self, duration=None):
+        self.loopthreadid = threading.get_ident()
+        asyncio.set_event_loop(self.loop)
+        if duration is None:
+            self.loop.run_forever()
+        else:
+            self.loop.run_until_complete(asyncio.sleep(duration))
+
+    # Runs the event loop in a background thread, the caller continues (e.g. to loop forever as in the examples)
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="AHCAsyncioRuntime")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    # Cancels the component tasks and closes the loop, call after run returns or the background thread stops
+    def close(self):
+        for task in self.tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*self.tasks, return_exceptions=True))
+        self.loop.close()
@@ -0,0 +1,83 @@
+import heapq
+import itertools
+from threading import Lock
+from .GenericRuntime import *
+from .TimerService import VirtualTimerService
+
+
+# A single-threaded discrete event scheduler: trigger_event and send_self do not wake up any thread,
+# they push (timestamp, sequence, component, event) to a heap. run() pops the heap in timestamp order,
+# advances the virtual clock and calls the eventhandlers of the component in the caller's thread.
+# The sequence number keeps events with the same timestamp in FIFO order, hence runs are reproducible.
+# Handlers that block with time.sleep still block the whole simulation, use delayed events instead.
+class DiscreteEventRuntime(GenericRuntime):
+
+    def __init__(self, starttime=0.0):
+        self.clock = starttime
+        self.heap = []
+        self.sequence = itertools.count()
+        self.lock = Lock()  # events may still be triggered by foreign threads, e.g. timers or sdr receivers
+        self.processedevents = 0
+        self.stopped = False
+        self.timerservice = VirtualTimerService(self)
+
+    def register(self, component):
+        component.despending = 0  # events of the component in the heap or being dispatched
+
+    def now(self):
+        return self.clock
+
+    def schedule(self, component, eventobj: Event, delay=0.0):
+        with self.lock:
+            heapq.heappush(self.heap, (self.clock + delay, next(self.sequence), component, eventobj))
+            component.despending += 1
+
+    def mailbox_empty(self, component):
+        return component.despending == 0
+
+    # Timer callbacks are heap entries without a component, they run at their virtual time like the events
+    def call_later(self, delay, callback, *args):
+        with self.lock:
+            heapq.heappush(self.heap, (self.clock + delay, next(self.sequence), None, (callback, args)))
+
+    def pending(self):
+        return len(self.heap)
+
+    def step(self):
+        with self.lock:
+            if not self.heap:
+                return False
+            eventtime, _, component, eventobj = heapq.heappop(self.heap)
+        if eventtime > self.clock:
+            self.clock = eventtime
+        if component is None:
+            callback, args = eventobj
+            callback(*args)
+        else:
+            try:
+                self.dispatch(component, eventobj)
+            finally:
+                with self.lock:
+                    component.despending -= 1
+        self.processedevents += 1
+        return True
+
+    # Runs until there are no events left, the virtual clock passes until or maxevents events are dispatched
+    def run(self, until=None, maxevents=None):
+        self.stopped = False
+        dispatched = 0
+        while not self.stopped:
+            if maxevents is not None and dispatched >= maxevents:
+                break
+            if until is not None:
+                with self.lock:
+                    if not self.heap or self.heap[0][0] > until:
+                        self.clock = max(self.clock, until)
+                        break
+            if not self.step():
+                break
+            dispatched += 1
+        return dispatched
+
+    def stop(self):
+        self.stopped = True
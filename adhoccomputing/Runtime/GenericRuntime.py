@@ -0,0 +1,54 @@
+import time
+from ..Generics import *
+
+
+# A runtime decides how the events triggered on a component are delivered to its eventhandlers.
+# When no runtime is set, every GenericModel keeps the classical behaviour: its own inputqueue served by
+# num_worker_threads threads. Components created after setAHCRuntime is called register with that runtime instead.
+class GenericRuntime:
+    # A runtime with its own clock provides a timer service on it, the others use the process-wide timing wheel
+    timerservice = None
+    # True if the events wait in the Mailbox of the component, so configure_mailbox takes effect
+    mailboxpolicies = False
+
+    def register(self, component):
+        pass
+
+    def schedule(self, component, eventobj: Event, delay=0.0):
+        raise NotImplementedError
+
+    # True if no event of the component is waiting or being dispatched, inline dispatch is only allowed then.
+    # A runtime that cannot tell returns False and the events of inline components are scheduled as usual.
+    def mailbox_empty(self, component):
+        return False
+
+    def now(self):
+        return time.monotonic()
+
+    def dispatch(self, component, eventobj: Event):
+        if component.terminated:
+            return
+        try:
+            component.dispatch_event(eventobj)
+        except Exception as ex:
+            logger.error(f"{component.componentname}.{component.componentinstancenumber} handler for {eventobj.event} raised {ex}")
+
+    def dispatch_batch(self, component, eventobjs):
+        if component.terminated:
+            return
+        try:
+            component.dispatch_events(eventobjs)
+        except Exception as ex:
+            logger.error(f"{component.componentname}.{component.componentinstancenumber} handler for a batch of {len(eventobjs)} events raised {ex}")
+
+
+class AHCRuntimes:
+    current = None
+
+
+def setAHCRuntime(runtime):
+    AHCRuntimes.current = runtime
+
+
+def getAHCRuntime():
+    return AHCRuntimes.current
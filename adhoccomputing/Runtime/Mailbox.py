@@ -0,0 +1,166 @@
+import heapq
+import queue
+from collections import deque
+from enum import Enum
+from ..Generics import *
+
+
+class MailboxOverflowPolicies(Enum):
+  BLOCK = "block"  # the sender waits until there is space
+  DROPNEWEST = "dropnewest"  # the incoming event is discarded
+  DROPOLDEST = "dropoldest"  # the oldest queued event is discarded to make space
+  DROPBYTYPE = "dropbytype"  # an event of one of the droppable types is discarded, the sender waits if there is none
+
+
+# The input queue of a GenericModel. A capacity of 0 means unbounded, which is the classical behaviour.
+# It extends queue.Queue by overriding its storage hooks, so the blocking, task_done and join semantics are kept.
+# A prioritized mailbox keeps one FIFO per EventPriorities class and serves the highest class first, but a lower
+# class that has been passed over starvationlimit times is served next, which bounds its waiting.
+class Mailbox(queue.Queue):
+
+  def __init__(self, capacity=0, policy=MailboxOverflowPolicies.BLOCK, droppableevents=None, prioritized=False, starvationlimit=8):
+    self.prioritized = prioritized
+    self.starvationlimit = starvationlimit
+    super().__init__(maxsize=capacity)
+    self.policy = policy
+    self.droppableevents = set(droppableevents) if droppableevents is not None else set()
+    self.dropped = 0
+    self.droppedbytype = {}
+    self.highwatermark = 0
+
+  def configure(self, capacity=0, policy=MailboxOverflowPolicies.BLOCK, droppableevents=None, prioritized=False, starvationlimit=8):
+    with self.mutex:
+      if self.prioritized:
+        # The classes are merged by creation, each keeps its own order, ties in a monotonic_ns tick go by eventid
+        queued = list(heapq.merge(*self.classqueues, key=lambda eventobj: (eventobj.timestamp, eventobj.eventid)))
+      else:
+        queued = list(self.classqueues[0])
+      self.prioritized = prioritized
+      self.starvationlimit = starvationlimit
+      self._init(capacity)
+      for eventobj in queued:
+        self._put(eventobj)
+      self.maxsize = capacity
+      self.policy = policy
+      self.droppableevents = set(droppableevents) if droppableevents is not None else set()
+      self.not_full.notify_all()
+
+  def _init(self, maxsize):
+    numclasses = len(EventPriorities) if self.prioritized else 1
+    self.classqueues = [deque() for i in range(numclasses)]
+    self.skipped = [0] * numclasses
+    self.size = 0
+
+  def _qsize(self):
+    return self.size
+
+  def _put(self, item):
+    if self.prioritized:
+      self.classqueues[item.get_priority().value].append(item)
+    else:
+      self.classqueues[0].append(item)
+    self.size += 1
+
+  def _get(self):
+    self.size -= 1
+    if not self.prioritized:
+      return self.classqueues[0].popleft()
+    chosen = None
+    for index, classqueue in enumerate(self.classqueues):
+      if classqueue:
+        if chosen is None:
+          chosen = index
+        elif self.skipped[index] >= self.starvationlimit and self.skipped[chosen] < self.starvationlimit:
+          chosen = index
+    for index, classqueue in enumerate(self.classqueues):
+      if classqueue and index != chosen:
+        self.skipped[index] += 1
+    self.skipped[chosen] = 0
+    return self.classqueues[chosen].popleft()
+
+  def count_drop(self, eventobj):
+    self.dropped += 1
+    self.droppedbytype[eventobj.event] = self.droppedbytype.get(eventobj.event, 0) + 1
+
+  # Removes the oldest event of the lowest priority class
+  def evict_oldest(self):
+    for classqueue in reversed(self.classqueues):
+      if classqueue:
+        self.count_drop(classqueue.popleft())
+        self.size -= 1
+        return
+
+  # Removes the oldest queued event of a droppable type, lowest priority class first, returns False if there is none
+  def evict_droppable(self):
+    for classqueue in reversed(self.classqueues):
+      for queuedevent in classqueue:
+        if queuedevent.event in self.droppableevents:
+          classqueue.remove(queuedevent)
+          self.count_drop(queuedevent)
+          self.size -= 1
+          return True
+    return False
+
+  # Returns False if the event is dropped. A non-blocking put that would have to wait exceeds the capacity
+  # instead of raising queue.Full, so a component triggering events on itself cannot deadlock.
+  def put(self, item, block=True, timeout=None):
+    with self.not_full:
+      if self.maxsize > 0 and self.size >= self.maxsize:
+        if self.policy == MailboxOverflowPolicies.DROPNEWEST:
+          self.count_drop(item)
+          return False
+        if self.policy == MailboxOverflowPolicies.DROPOLDEST:
+          self.evict_oldest()
+          self.unfinished_tasks -= 1
+        elif self.policy == MailboxOverflowPolicies.DROPBYTYPE and item.event in self.droppableevents:
+          self.count_drop(item)
+          return False
+        elif self.policy == MailboxOverflowPolicies.DROPBYTYPE and self.evict_droppable():
+          self.unfinished_tasks -= 1
+        elif block:
+          # BLOCK, or DROPBYTYPE without anything to drop
+          if not self.not_full.wait_for(lambda: self.maxsize <= 0 or self.size < self.maxsize, timeout):
+            raise queue.Full
+      self._put(item)
+      self.unfinished_tasks += 1
+      if self.size > self.highwatermark:
+        self.highwatermark = self.size
+      self.not_empty.notify()
+      return True
+
+  # Blocks for the first event, then takes up to maxbatchsize events that are already queued under one lock acquisition
+  def get_batch(self, maxbatchsize):
+    with self.not_empty:
+      while not self.size:
+        self.not_empty.wait()
+      workitems = []
+      while self.size and len(workitems) < maxbatchsize:
+        workitems.append(self._get())
+      self.not_full.notify_all()
+      return workitems
+
+  # Takes the next event without blocking, None if the mailbox is empty
+  def take(self):
+    with self.mutex:
+      if not self.size:
+        return None
+      eventobj = self._get()
+      if self.maxsize > 0:
+        self.not_full.notify()
+      return eventobj
+
+  # Takes up to maxbatchsize events without blocking, an empty list if the mailbox is empty
+  def take_batch(self, maxbatchsize):
+    with self.mutex:
+      workitems = []
+      while self.size and len(workitems) < maxbatchsize:
+        workitems.append(self._get())
+      if workitems and self.maxsize > 0:
+        self.not_full.notify_all()
+      return workitems
+
+  def tasks_done(self, count):
+    with self.all_tasks_done:
+      self.unfinished_tasks -= count
+      if self.unfinished_tasks <= 0:
+        self.all_tasks_done.notify_all()
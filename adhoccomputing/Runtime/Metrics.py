@@ -0,0 +1,52 @@
+from time import perf_counter_ns
+from ..Generics import *
+
+
+# Runtime metrics of a single component. Counters are only updated by the thread that runs the handlers of the
+# component (or the sender, for sent messages), so plain integers are used instead of locks.
+# Handler execution times are sampled: every samplingperiod-th handler call is timed and put into a histogram
+# with power-of-two microsecond buckets, bucket i counts the calls that took less than 2**i microseconds.
+class ComponentMetrics:
+  samplingperiod = 16
+  numbuckets = 32
+
+  def __init__(self):
+    self.eventcounts = {}
+    self.sentcounts = {ConnectorTypes.DOWN: 0, ConnectorTypes.UP: 0, ConnectorTypes.PEER: 0}
+    self.handlercalls = 0
+    self.sampledcalls = 0
+    self.sampledtime = 0
+    self.handlertimehistogram = [0] * self.numbuckets
+
+  # Returns True if this handler call should be timed
+  def count_event(self, eventtype):
+    self.eventcounts[eventtype] = self.eventcounts.get(eventtype, 0) + 1
+    self.handlercalls += 1
+    return self.handlercalls % self.samplingperiod == 0
+
+  # count events of a batch handled by one on_event_batch call, returns True if the call should be timed
+  def count_events(self, eventtype, count):
+    self.eventcounts[eventtype] = self.eventcounts.get(eventtype, 0) + count
+    self.handlercalls += count
+    return self.handlercalls // self.samplingperiod != (self.handlercalls - count) // self.samplingperiod
+
+  # A timed batch call is recorded as count calls of its mean duration
+  def record_handler_time(self, elapsedns, count=1):
+    self.sampledcalls += count
+    self.sampledtime += elapsedns
+    bucket = min((elapsedns // count // 1000).bit_length(), self.numbuckets - 1)
+    self.handlertimehistogram[bucket] += count
+
+  def count_sent(self, connectortype, count=1):
+    self.sentcounts[connectortype] = self.sentcounts.get(connectortype, 0) + count
+
+  def snapshot(self):
+    meanhandlertime = self.sampledtime / self.sampledcalls if self.sampledcalls else 0
+    return {
+      "eventcounts": {str(eventtype): count for eventtype, count in self.eventcounts.items()},
+      "sentcounts": {str(connectortype.value): count for connectortype, count in self.sentcounts.items()},
+      "handlercalls": self.handlercalls,
+      "meanhandlertimens": meanhandlertime,
+      "estimatedhandlertimens": meanhandlertime * self.handlercalls,
+      "handlertimehistogram": list(self.handlertimehistogram),
+    }
@@ -0,0 +1,245 @@
+import time
+import math
+from threading import Thread, Condition
+from .GenericRuntime import *
+
+
+class TimerHandle:
+    __slots__ = ("service", "expiry", "interval", "callback", "args", "component", "cancelled", "expirytick")
+
+    def __init__(self, service, expiry, interval, callback, args, component=None):
+        self.service = service
+        self.expiry = expiry
+        self.interval = interval  # 0 for one-shot timers
+        self.callback = callback
+        self.args = args
+        self.component = component
+        self.cancelled = False
+        self.expirytick = None
+
+    def cancel(self):
+        self.service.cancel(self)
+
+
+# Common interface of the timer services. call_later and call_periodic run the callback in the thread of the
+# service, schedule_once and schedule_periodic put the event into the mailbox of the component instead, so the
+# expiration is handled by the component like any other event. Periodic timers are rearmed from their previous
+# expiry, not from the time the callback ran, so they do not drift.
+class GenericTimerService:
+
+    def now(self):
+        raise NotImplementedError
+
+    def add(self, handle):
+        raise NotImplementedError
+
+    def call_later(self, delay, callback, *args):
+        handle = TimerHandle(self, self.now() + delay, 0, callback, args)
+        self.add(handle)
+        return handle
+
+    def call_periodic(self, interval, callback, *args, firstdelay=None):
+        handle = TimerHandle(self, self.now() + (interval if firstdelay is None else firstdelay), interval, callback, args)
+        self.add(handle)
+        return handle
+
+    def schedule_once(self, delay, component, eventobj: Event):
+        handle = TimerHandle(self, self.now() + delay, 0, self.deliver, (), component)
+        handle.args = (handle, eventobj)
+        self.add(handle)
+        return handle
+
+    def schedule_periodic(self, interval, component, eventobj: Event, firstdelay=None):
+        handle = TimerHandle(self, self.now() + (interval if firstdelay is None else firstdelay), interval, self.deliver, (), component)
+        handle.args = (handle, eventobj)
+        self.add(handle)
+        return handle
+
+    # Cancelled timers stay where they are and are skipped when they expire
+    def cancel(self, handle):
+        handle.cancelled = True
+
+    # A periodic timer delivers a copy of its event each time, the queued copies must not share the event id.
+    # The expiration of a set_timer callback carries the handle, so GenericModel.on_timer skips the callback if the
+    # timer is cancelled while the expiration waits in the mailbox.
+    def deliver(self, handle, eventobj: Event):
+        eventcontent = (handle, eventobj.eventcontent) if eventobj.event == EventTypes.TIMER else eventobj.eventcontent
+        handle.component.post_event(Event(eventobj.eventsource, eventobj.event, eventcontent, eventobj.fromchannel,
+                                          priority=eventobj.priority))
+
+    # Called by the service when the timer is due, returns False if it did not fire
+    def expire(self, handle):
+        if handle.cancelled:
+            return False
+        if handle.component is not None and handle.component.terminated:
+            handle.cancelled = True
+            return False
+        if handle.interval > 0:
+            handle.expiry += handle.interval
+            if handle.expiry < self.now():
+                # The service fell behind, skip the missed periods instead of firing them back to back
+                handle.expiry += math.ceil((self.now() - handle.expiry) / handle.interval) * handle.interval
+            self.add(handle)
+        try:
+            handle.callback(*handle.args)
+        except Exception as ex:
+            logger.error(f"Timer callback {handle.callback} raised {ex}")
+        return True
+
+
+# A hierarchical timing wheel driven by one thread: numlevels wheels of numslots slots, level i has a resolution of
+# numslots**i ticks. A timer is put into the lowest level that covers its remaining time and moves down one level
+# each time the lower wheel completes a turn, hence adding and cancelling a timer is O(1) and thousands of periodic
+# timers cost one thread. Expirations are rounded up to the next tick. The thread sleeps until the next non-empty
+# slot or the next cascade, and without a timeout if there is no timer at all.
+class AHCTimerWheel(GenericTimerService):
+    instance = None
+
+    def __init__(self, tick=0.01, numslots=256, numlevels=4):
+        self.tick = tick
+        self.numslots = numslots
+        self.numlevels = numlevels
+        self.slotbits = numslots.bit_length() - 1
+        self.maxdelta = numslots ** numlevels - 1
+        self.starttime = time.monotonic()
+        self.condition = Condition()
+        self.reset(0)
+        self.running = True
+        self.thread = None
+
+    @classmethod
+    def default(cls):
+        if cls.instance is None:
+            cls.instance = cls()
+        return cls.instance
+
+    def now(self):
+        return time.monotonic()
+
+    def reset(self, currenttick):
+        self.currenttick = currenttick
+        self.wheels = [[[] for i in range(self.numslots)] for level in range(self.numlevels)]
+        self.count = 0
+
+    def current_tick(self):
+        return int((time.monotonic() - self.starttime) / self.tick)
+
+    def add(self, handle):
+        with self.condition:
+            if handle.cancelled:
+                return  # cancelled while its callback was running
+            handle.expirytick = math.ceil((handle.expiry - self.starttime) / self.tick)
+            if self.count == 0:
+                # The wheel may have been idle for a long time, only cancelled timers can be left in it
+                self.reset(self.current_tick())
+            self.place(handle)
+            self.count += 1
+            if self.thread is None:
+                self.thread = Thread(target=self.run, name="AHCTimerWheel")
+                self.thread.daemon = True
+                self.thread.start()
+            self.condition.notify()
+
+    def place(self, handle):
+        delta = min(max(handle.expirytick - self.currenttick, 1), self.maxdelta)
+        placetick = self.currenttick + delta
+        level = 0
+        while delta >= 1 << (self.slotbits * (level + 1)):
+            level += 1
+        self.wheels[level][(placetick >> (self.slotbits * level)) & (self.numslots - 1)].append(handle)
+
+    def cancel(self, handle):
+        with self.condition:
+            if not handle.cancelled:
+                handle.cancelled = True
+                if handle.expirytick is not None:
+                    self.count -= 1
+
+    # The next tick at which a slot of the lowest level expires or a higher level has to be cascaded
+    def next_tick(self):
+        slots = self.wheels[0]
+        boundary = (self.currenttick | (self.numslots - 1)) + 1
+        for tick in range(self.currenttick + 1, boundary):
+            if slots[tick & (self.numslots - 1)]:
+                return tick
+        return boundary
+
+    def cascade(self, level):
+        slot = (self.currenttick >> (self.slotbits * level)) & (self.numslots - 1)
+        handles = self.wheels[level][slot]
+        self.wheels[level][slot] = []
+        for handle in handles:
+            if not handle.cancelled:
+                self.place(handle)
+
+    # Advances the wheel to targettick and returns the timers that expired on the way
+    def advance(self, targettick):
+        expired = []
+        mask = self.numslots - 1
+        while self.currenttick < targettick:
+            self.currenttick = min(self.next_tick(), targettick)
+            if self.currenttick & mask == 0:
+                # Cascade the higher levels that completed a turn, the highest first
+                level = 1
+                while level < self.numlevels - 1 and (self.currenttick >> (self.slotbits * level)) & mask == 0:
+                    level += 1
+                for cascadelevel in range(level, 0, -1):
+                    self.cascade(cascadelevel)
+            slot = self.wheels[0][self.currenttick & mask]
+            if slot:
+                self.wheels[0][self.currenttick & mask] = []
+                for handle in slot:
+                    if handle.cancelled:
+                        continue
+                    if handle.expirytick > self.currenttick:
+                        self.place(handle)  # was beyond the range of the wheel
+                    else:
+                        handle.expirytick = None  # not in the wheel anymore
+                        expired.append(handle)
+        return expired
+
+    def run(self):
+        while self.running:
+            with self.condition:
+                while self.running and self.count == 0:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                nowtick = self.current_tick()
+                if nowtick <= self.currenttick or self.next_tick() > nowtick:
+                    timeout = self.starttime + self.next_tick() * self.tick - time.monotonic()
+                    if timeout > 0:
+                        self.condition.wait(timeout)
+                    continue
+                expired = self.advance(nowtick)
+                self.count -= len(expired)
+            # Callbacks run outside the lock, they may add or cancel timers
+            for handle in expired:
+                self.expire(handle)
+
+    def shutdown(self):
+        self.running = False
+        with self.condition:
+            self.condition.notify()
+
+
+# Timer service on the virtual clock of a DiscreteEventRuntime, timers are events of its heap
+class VirtualTimerService(GenericTimerService):
+
+    def __init__(self, runtime):
+        self.runtime = runtime
+
+    def now(self):
+        return self.runtime.now()
+
+    def add(self, handle):
+        self.runtime.call_later(max(handle.expiry - self.runtime.now(), 0.0), self.expire, handle)
+
+
+# The timer service of the runtime if it has its own clock, the process-wide timing wheel otherwise
+def getAHCTimerService(runtime=None):
+    if runtime is None:
+        runtime = getAHCRuntime()
+    if runtime is not None and runtime.timerservice is not None:
+        return runtime.timerservice
+    return AHCTimerWheel.default()
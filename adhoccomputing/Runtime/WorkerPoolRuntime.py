@@ -0,0 +1,101 @@
+import os
+import queue
+from threading import Thread, Lock
+from .GenericRuntime import *
+from .TimerService import getAHCTimerService
+
+
+# Per-component serial mailbox of the worker pool. A mailbox is in the ready queue at most once,
+# hence at most one worker runs the handlers of a component at any time and the order of its events is kept.
+# The events are kept in the Mailbox of the component (its inputqueue), so its capacity, overflow policy, priority
+# classes and counters apply as in the threaded model. A full BLOCK mailbox goes over its capacity instead of
+# blocking the sender, a worker of the pool waiting for another one could deadlock the pool.
+class PoolMailbox:
+
+    def __init__(self, component):
+        self.component = component
+        self.events = component.inputqueue
+        self.lock = Lock()
+        self.scheduled = False
+
+
+# All components share num_workers threads instead of num_worker_threads threads per component.
+# A worker takes a ready mailbox, handles up to batchsize of its events and puts it back to the ready queue
+# if events are left, so that a busy component does not starve the others. A component that overrides
+# on_event_batch gets those events as one batch.
+# Handlers that block with time.sleep occupy a worker of the pool, use delayed events instead.
+class WorkerPoolRuntime(GenericRuntime):
+
+    mailboxpolicies = True
+
+    def __init__(self, num_workers=None, batchsize=32):
+        self.num_workers = num_workers if num_workers is not None else (os.cpu_count() or 1)
+        self.batchsize = batchsize
+        self.readyqueue = queue.SimpleQueue()
+        self.running = True
+        self.workers = []
+        for i in range(self.num_workers):
+            t = Thread(target=self.worker, name=f"AHCWorker-{i}")
+            t.daemon = True
+            t.start()
+            self.workers.append(t)
+
+    def register(self, component):
+        component.poolmailbox = PoolMailbox(component)
+
+    def schedule(self, component, eventobj: Event, delay=0.0):
+        if delay > 0:
+            # Delayed events wait in the timing wheel, which is shared with the timers of the components
+            getAHCTimerService(self).call_later(delay, self.schedule, component, eventobj)
+            return
+        mailbox = component.poolmailbox
+        with mailbox.lock:
+            if not mailbox.events.put(eventobj, block=False):
+                return  # dropped by the overflow policy
+            if mailbox.scheduled:
+                return
+            mailbox.scheduled = True
+        self.readyqueue.put(mailbox)
+
+    # A mailbox stays scheduled until a worker finds it empty after dispatching its last event
+    def mailbox_empty(self, component):
+        return not component.poolmailbox.scheduled
+
+    def worker(self):
+        while self.running:
+            mailbox = self.readyqueue.get()
+            if mailbox is None:
+                return
+            if mailbox.component.batchhandling:
+                # The events are taken at once so that on_event_batch sees them together, the mailbox stays
+                # scheduled while they are handled
+                with mailbox.lock:
+                    eventobjs = mailbox.events.take_batch(self.batchsize)
+                    if not eventobjs:
+                        mailbox.scheduled = False
+                        continue
+                self.dispatch_batch(mailbox.component, eventobjs)
+                mailbox.events.tasks_done(len(eventobjs))
+                dispatched = self.batchsize  # look for more events below
+            else:
+                dispatched = 0
+                while dispatched < self.batchsize:
+                    with mailbox.lock:
+                        eventobj = mailbox.events.take()
+                        if eventobj is None:
+                            mailbox.scheduled = False
+                            break
+                    self.dispatch(mailbox.component, eventobj)
+                    dispatched += 1
+                mailbox.events.tasks_done(dispatched)
+            if dispatched == self.batchsize:
+                with mailbox.lock:
+                    if not mailbox.events.qsize():
+                        mailbox.scheduled = False
+                        continue
+                self.readyqueue.put(mailbox)
+
+    def shutdown(self):
+        self.running = False
+        for i in range(self.num_workers):
+            self.readyqueue.put(None)
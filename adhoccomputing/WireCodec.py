@@ -0,0 +1,422 @@
+import pickle
+import struct
+import zlib
+import importlib
+from enum import Enum
+from .Generics import *
+
+# Compact binary encoding of messages for frames sent over the air and between processes.
+# A frame is the magic byte, a flags byte and one encoded value. Values start with a tag byte:
+# - None, booleans, Ellipsis and the infinities are a tag only, integers are zigzag varints, floats are doubles
+# - str and bytes are a varint length and the raw bytes, numpy arrays are their dtype, shape and raw bytes
+# - list, tuple and dict are a varint count and their items
+# - Enum members are a type id and the index of the member
+# - headers, messages and payloads are a type id and their fields. The standard header fields are packed behind a
+#   flags byte that tells which of them differ from their defaults, field names are indices into FIELDNAMES
+# Anything else is pickled. Type ids are stable across processes: core types have small fixed ids, every other
+# Enum or Generic* subclass gets the crc32 of its qualified name, so nothing has to be registered by hand.
+
+WIREMAGIC = 0xAC
+FLAG_COMPRESSED = 0x01
+
+(T_NONE, T_TRUE, T_FALSE, T_INT, T_FLOAT, T_POSINF, T_NEGINF, T_STR, T_BYTES, T_LIST, T_TUPLE, T_DICT, T_ENUM,
+ T_HEADER, T_MESSAGE, T_OBJECT, T_NDARRAY, T_ELLIPSIS, T_PICKLE) = range(19)
+
+# Header flags
+H_NEXTHOP = 0x01
+H_INTERFACEID = 0x02
+H_SEQUENCENUMBER = 0x04
+H_EXTRA = 0x08
+H_FROZEN = 0x10
+HEADERFIELDS = ("messagetype", "messagefrom", "messageto", "nexthop", "interfaceid", "sequencenumber")
+
+# Frequent field names are sent as their index, others as index len(FIELDNAMES) + length followed by the name
+FIELDNAMES = ("messagetype", "messagefrom", "messageto", "nexthop", "interfaceid", "sequencenumber", "header", "payload",
+              "uniqueid", "messagepayload", "frozen", "phyheader", "phypayload", "fragmentid", "numberoffragments",
+              "counter", "hopcount", "messagesource")
+FIELDINDEX = {name: index for index, name in enumerate(FIELDNAMES)}
+
+np = LazyImport("numpy")  # only needed once a numpy value is encoded or decoded
+
+AUTOIDBASE = 1024  # fixed ids are below, ids derived from names are not
+
+
+class WireTypes:
+  byclass = {}
+  byid = {}
+
+
+def register_wire_type(cls, typeid=None):
+  if typeid is None:
+    typeid = wire_type_id(cls)
+  existing = WireTypes.byid.get(typeid)
+  if existing is not None and existing is not cls:
+    raise ValueError(f"Wire type id {typeid} of {cls.__qualname__} is already used by {existing.__qualname__}")
+  WireTypes.byclass[cls] = typeid
+  WireTypes.byid[typeid] = cls
+  return cls
+
+
+def wire_type_id(cls):
+  typeid = WireTypes.byclass.get(cls)
+  if typeid is None:
+    module = "__main__" if cls.__module__ == "__mp_main__" else cls.__module__
+    typeid = zlib.crc32(f"{module}.{cls.__qualname__}".encode())
+    if typeid < AUTOIDBASE:
+      typeid += AUTOIDBASE
+    WireTypes.byclass[cls] = typeid
+    WireTypes.byid.setdefault(typeid, cls)
+  return typeid
+
+
+def all_subclasses(cls):
+  for subclass in cls.__subclasses__():
+    yield subclass
+    yield from all_subclasses(subclass)
+
+
+def wire_type(typeid):
+  cls = WireTypes.byid.get(typeid)
+  if cls is None:
+    # A type this process has not encoded yet, index the ids of all the loaded candidates once
+    for base in (Enum, GenericMessageHeader, GenericMessage, GenericMessagePayload):
+      for subclass in all_subclasses(base):
+        wire_type_id(subclass)
+    cls = WireTypes.byid.get(typeid)
+    if cls is None:
+      raise ValueError(f"Unknown wire type id {typeid}")
+  return cls
+
+
+for typeid, cls in enumerate((GenericMessageHeader, GenericMessage, GenericMessagePayload, FrozenMessageHeader,
+                              FrozenMessage, MessageDestinationIdentifiers, EventTypes, EventPriorities), start=1):
+  register_wire_type(cls, typeid)
+
+
+packdouble = struct.Struct("<d").pack
+unpackdouble = struct.Struct("<d").unpack_from
+inf = float('inf')
+
+
+def write_varint(out, value):
+  while value > 0x7F:
+    out.append((value & 0x7F) | 0x80)
+    value >>= 7
+  out.append(value)
+
+
+def write_fieldname(out, name):
+  index = FIELDINDEX.get(name)
+  if index is not None:
+    out.append(index)
+  else:
+    raw = name.encode()
+    write_varint(out, len(FIELDNAMES) + len(raw))
+    out += raw
+
+
+def write_fields(out, fields):
+  write_varint(out, len(fields))
+  for name, value in fields.items():
+    write_fieldname(out, name)
+    write_value(out, value)
+
+
+def write_header(out, header):
+  fields = header.__dict__
+  flags = 0
+  nexthop = fields["nexthop"]
+  interfaceid = fields["interfaceid"]
+  sequencenumber = fields["sequencenumber"]
+  if not (nexthop == inf and type(nexthop) is float):
+    flags |= H_NEXTHOP
+  if not (interfaceid == inf and type(interfaceid) is float):
+    flags |= H_INTERFACEID
+  if sequencenumber != -1:
+    flags |= H_SEQUENCENUMBER
+  extra = None
+  if len(fields) > 6:
+    extra = {name: value for name, value in fields.items() if name not in HEADERFIELDS}
+    if extra.pop("frozen", False):
+      flags |= H_FROZEN
+    if extra:
+      flags |= H_EXTRA
+  out.append(T_HEADER)
+  write_varint(out, wire_type_id(type(header)))
+  out.append(flags)
+  write_value(out, fields["messagetype"])
+  write_value(out, fields["messagefrom"])
+  write_value(out, fields["messageto"])
+  if flags & H_NEXTHOP:
+    write_value(out, nexthop)
+  if flags & H_INTERFACEID:
+    write_value(out, interfaceid)
+  if flags & H_SEQUENCENUMBER:
+    write_value(out, sequencenumber)
+  if flags & H_EXTRA:
+    write_fields(out, extra)
+
+
+def write_message(out, message):
+  fields = dict(message.__dict__)
+  header = fields.pop("header")
+  payload = fields.pop("payload")
+  # the uniqueid is only sent if it is not the one the constructor derives from the header
+  if fields.get("uniqueid") == str(getattr(header, "messagefrom", None)) + "-" + str(getattr(header, "sequencenumber", None)):
+    del fields["uniqueid"]
+  out.append(T_MESSAGE)
+  write_varint(out, wire_type_id(type(message)))
+  write_value(out, header)
+  write_value(out, payload)
+  write_fields(out, fields)
+
+
+def write_int(out, value):
+  out.append(T_INT)
+  write_varint(out, (value << 1) if value >= 0 else ((-value << 1) - 1))
+
+
+def write_float(out, value):
+  if value == inf:
+    out.append(T_POSINF)
+  elif value == -inf:
+    out.append(T_NEGINF)
+  else:
+    out.append(T_FLOAT)
+    out += packdouble(value)
+
+
+def write_str(out, value):
+  raw = value.encode()
+  out.append(T_STR)
+  write_varint(out, len(raw))
+  out += raw
+
+
+def write_bytes(out, value):
+  out.append(T_BYTES)
+  write_varint(out, len(value))
+  out += value
+
+
+def write_sequence(out, value, tag):
+  out.append(tag)
+  write_varint(out, len(value))
+  for item in value:
+    write_value(out, item)
+
+
+def write_dict(out, value):
+  out.append(T_DICT)
+  write_varint(out, len(value))
+  for key, item in value.items():
+    write_value(out, key)
+    write_value(out, item)
+
+
+def write_ndarray(out, value):
+  out.append(T_NDARRAY)
+  dtype = value.dtype.str.encode()
+  write_varint(out, len(dtype))
+  out += dtype
+  write_varint(out, value.ndim)
+  for dimension in value.shape:
+    write_varint(out, dimension)
+  raw = np.ascontiguousarray(value).data
+  write_varint(out, raw.nbytes)
+  out += raw.cast("B")
+
+
+writers = {
+  type(None): lambda out, value: out.append(T_NONE),
+  bool: lambda out, value: out.append(T_TRUE if value else T_FALSE),
+  int: write_int,
+  float: write_float,
+  str: write_str,
+  bytes: write_bytes,
+  bytearray: write_bytes,
+  list: lambda out, value: write_sequence(out, value, T_LIST),
+  tuple: lambda out, value: write_sequence(out, value, T_TUPLE),
+  dict: write_dict,
+  type(...): lambda out, value: out.append(T_ELLIPSIS),
+}
+
+
+def write_value(out, value):
+  writer = writers.get(type(value))
+  if writer is not None:
+    writer(out, value)
+  elif isinstance(value, Enum):
+    out.append(T_ENUM)
+    cls = type(value)
+    write_varint(out, wire_type_id(cls))
+    write_varint(out, cls._member_names_.index(value._name_))
+  elif isinstance(value, GenericMessageHeader) and all(name in value.__dict__ for name in HEADERFIELDS):
+    write_header(out, value)
+  elif isinstance(value, GenericMessage) and "header" in value.__dict__ and "payload" in value.__dict__:
+    write_message(out, value)
+  elif isinstance(value, (GenericMessageHeader, GenericMessage, GenericMessagePayload)) and hasattr(value, "__dict__"):
+    out.append(T_OBJECT)
+    write_varint(out, wire_type_id(type(value)))
+    write_fields(out, value.__dict__)
+  elif type(value).__module__ == "numpy" and isinstance(value, np.ndarray):
+    write_ndarray(out, value)
+  elif type(value).__module__ == "numpy" and isinstance(value, np.integer):
+    write_int(out, int(value))
+  elif type(value).__module__ == "numpy" and isinstance(value, np.floating):
+    write_float(out, float(value))
+  else:
+    raw = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    out.append(T_PICKLE)
+    write_varint(out, len(raw))
+    out += raw
+
+
+class WireReader:
+
+  def __init__(self, data, position=0):
+    self.data = memoryview(data)
+    self.position = position
+
+  def read_varint(self):
+    data = self.data
+    position = self.position
+    result = 0
+    shift = 0
+    while True:
+      byte = data[position]
+      position += 1
+      result |= (byte & 0x7F) << shift
+      if byte < 0x80:
+        break
+      shift += 7
+    self.position = position
+    return result
+
+  def read_raw(self):
+    length = self.read_varint()
+    start = self.position
+    self.position = start + length
+    return self.data[start:start + length]
+
+  def read_fieldname(self):
+    index = self.read_varint()
+    if index < len(FIELDNAMES):
+      return FIELDNAMES[index]
+    start = self.position
+    self.position = start + index - len(FIELDNAMES)
+    return str(self.data[start:self.position], "utf-8")
+
+  def read_fields(self, fields):
+    for i in range(self.read_varint()):
+      name = self.read_fieldname()
+      fields[name] = self.read_value()
+    return fields
+
+  def read_value(self):
+    tag = self.data[self.position]
+    self.position += 1
+    if tag == T_INT:
+      value = self.read_varint()
+      return (value >> 1) if not value & 1 else -((value + 1) >> 1)
+    if tag == T_STR:
+      return str(self.read_raw(), "utf-8")
+    if tag == T_ENUM:
+      cls = wire_type(self.read_varint())
+      return cls[cls._member_names_[self.read_varint()]]
+    if tag == T_HEADER:
+      return self.read_header()
+    if tag == T_MESSAGE:
+      return self.read_message()
+    if tag == T_NONE:
+      return None
+    if tag == T_TRUE:
+      return True
+    if tag == T_FALSE:
+      return False
+    if tag == T_POSINF:
+      return inf
+    if tag == T_NEGINF:
+      return -inf
+    if tag == T_ELLIPSIS:
+      return ...
+    if tag == T_FLOAT:
+      value = unpackdouble(self.data, self.position)[0]
+      self.position += 8
+      return value
+    if tag == T_BYTES:
+      return bytes(self.read_raw())
+    if tag == T_LIST:
+      return [self.read_value() for i in range(self.read_varint())]
+    if tag == T_TUPLE:
+      return tuple([self.read_value() for i in range(self.read_varint())])
+    if tag == T_DICT:
+      result = {}
+      for i in range(self.read_varint()):
+        key = self.read_value()
+        result[key] = self.read_value()
+      return result
+    if tag == T_OBJECT:
+      obj = object.__new__(wire_type(self.read_varint()))
+      self.read_fields(obj.__dict__)
+      return obj
+    if tag == T_NDARRAY:
+      dtype = np.dtype(str(self.read_raw(), "ascii"))
+      shape = tuple([self.read_varint() for i in range(self.read_varint())])
+      return np.frombuffer(bytearray(self.read_raw()), dtype=dtype).reshape(shape)
+    if tag == T_PICKLE:
+      return pickle.loads(self.read_raw())
+    raise ValueError(f"Unknown wire tag {tag} at {self.position - 1}")
+
+  def read_header(self):
+    header = object.__new__(wire_type(self.read_varint()))
+    flags = self.data[self.position]
+    self.position += 1
+    fields = header.__dict__
+    fields["messagetype"] = self.read_value()
+    fields["messagefrom"] = self.read_value()
+    fields["messageto"] = self.read_value()
+    fields["nexthop"] = self.read_value() if flags & H_NEXTHOP else inf
+    fields["interfaceid"] = self.read_value() if flags & H_INTERFACEID else inf
+    fields["sequencenumber"] = self.read_value() if flags & H_SEQUENCENUMBER else -1
+    if flags & H_EXTRA:
+      self.read_fields(fields)
+    if flags & H_FROZEN:
+      fields["frozen"] = True
+    return header
+
+  def read_message(self):
+    message = object.__new__(wire_type(self.read_varint()))
+    fields = message.__dict__
+    header = self.read_value()
+    fields["header"] = header
+    fields["payload"] = self.read_value()
+    fields["uniqueid"] = str(getattr(header, "messagefrom", None)) + "-" + str(getattr(header, "sequencenumber", None))
+    self.read_fields(fields)
+    return message
+
+
+# Encodes obj into a frame, compress tries zlib and keeps it if the frame gets smaller
+def encode(obj, compress=False):
+  body = bytearray()
+  write_value(body, obj)
+  flags = 0
+  if compress:
+    compressed = zlib.compress(body)
+    if len(compressed) < len(body):
+      body = compressed
+      flags |= FLAG_COMPRESSED
+  return bytes((WIREMAGIC, flags)) + body
+
+
+# Decodes a frame of encode. Frames of older versions, pickled and optionally zlib compressed, are accepted as well.
+def decode(data):
+  if not data:
+    raise ValueError("Empty frame")
+  if data[0] != WIREMAGIC:
+    if data[0] == 0x78:  # zlib stream
+      data = zlib.decompress(data)
+    return pickle.loads(data)
+  if data[1] & FLAG_COMPRESSED:
+    return WireReader(zlib.decompress(memoryview(data)[2:])).read_value()
+  return WireReader(data, 2).read_value()
@@ -34,7 +34,7 @@ class AdHocNode(GenericModel):
       self.send_up(Event(self, EventTypes.MFRB, eventobj.eventcontent))
 
     def __init__(self, componentname, componentid, topology=None):
-      super().__init__(componentname, componentid, topology=topo)
+      super().__init__(componentname, componentid, topology=topology)
       self.components = []
       # SUBCOMPONENTS
       self.appllayer = WaveAwerbuchComponent("ApplicationLayer", componentid, topology=topology)
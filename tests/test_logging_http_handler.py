@@ -0,0 +1,163 @@
+import json
+import logging
+import socket
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+import pytest
+
+from adhoccomputing.Generics import AHCLoggingHttpHandler
+
+
+# A stand-in collector that records the body of every request and answers with status after delay seconds
+class Collector:
+
+    def __init__(self, port=0, status=200, delay=0.0):
+        self.requests = []
+        self.status = status
+        self.delay = delay
+        collector = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def handle_request(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                time.sleep(collector.delay)
+                collector.requests.append((self.command, self.path, self.headers["Content-Type"], body))
+                self.send_response(collector.status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            do_POST = do_GET = handle_request
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), RequestHandler)
+        self.port = self.server.server_address[1]
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def records(self):
+        return [json.loads(line) for method, path, contenttype, body in self.requests for line in body.decode().split("\n")]
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def collector():
+    collector = Collector()
+    yield collector
+    collector.stop()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def make_logger(handler):
+    logger = logging.getLogger(f"AHCLoggingHttpHandlerTest-{id(handler)}")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    return logger
+
+
+def wait_until(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_records_are_sent_in_ndjson_batches(collector):
+    handler = AHCLoggingHttpHandler(f"127.0.0.1:{collector.port}", "/logs", batchsize=10, flushinterval=10.0)
+    logger = make_logger(handler)
+    for i in range(30):
+        logger.info("record %d", i)
+    assert wait_until(lambda: handler.shipped == 30)
+    assert [len(body.split(b"\n")) for method, path, contenttype, body in collector.requests] == [10, 10, 10]
+    assert {(method, path, contenttype) for method, path, contenttype, body in collector.requests} == {("POST", "/logs", "application/x-ndjson")}
+    assert [record["message"] for record in collector.records()] == [f"record {i}" for i in range(30)]
+    handler.close()
+
+
+def test_configured_method_is_used(collector):
+    handler = AHCLoggingHttpHandler(f"127.0.0.1:{collector.port}", "/logs", method="GET", flushinterval=0.05)
+    make_logger(handler).info("record")
+    handler.flush()
+    assert [method for method, path, contenttype, body in collector.requests] == ["GET"]
+    handler.close()
+
+
+def test_batches_are_retried_with_backoff_while_the_collector_is_down():
+    port = free_port()
+    handler = AHCLoggingHttpHandler(f"127.0.0.1:{port}", "/logs", flushinterval=0.05, maxbackoff=0.2)
+    logger = make_logger(handler)
+    for i in range(20):
+        logger.info("record %d", i)
+    assert wait_until(lambda: handler.failedattempts >= 3)
+    assert handler.shipped == 0 and handler.dropped == 0
+    collector = Collector(port)
+    try:
+        assert wait_until(lambda: handler.shipped == 20)
+        assert [record["message"] for record in collector.records()] == [f"record {i}" for i in range(20)]
+    finally:
+        handler.close()
+        collector.stop()
+
+
+def test_records_beyond_capacity_are_counted_as_dropped():
+    handler = AHCLoggingHttpHandler(f"127.0.0.1:{free_port()}", "/logs", capacity=10, batchsize=100, flushinterval=10.0)
+    logger = make_logger(handler)
+    for i in range(25):
+        logger.info("record %d", i)
+    assert handler.dropped == 15
+    # closing with the collector down gives up on the buffered records and counts them too
+    handler.close()
+    assert handler.dropped == 25 and handler.shipped == 0
+
+
+@pytest.mark.parametrize("status", [400, 401, 404, 413])
+def test_rejected_batches_are_counted_as_dropped(status):
+    collector = Collector(status=status)
+    handler = AHCLoggingHttpHandler(f"127.0.0.1:{collector.port}", "/logs", flushinterval=0.05)
+    try:
+        logger = make_logger(handler)
+        for i in range(5):
+            logger.info("record %d", i)
+        handler.flush()
+        assert handler.dropped == 5 and handler.shipped == 0
+        assert len(collector.requests) == 1
+    finally:
+        handler.close()
+        collector.stop()
+
+
+def test_flush_waits_for_the_batch_being_sent():
+    collector = Collector(delay=0.3)
+    handler = AHCLoggingHttpHandler(f"127.0.0.1:{collector.port}", "/logs", flushinterval=0.01)
+    try:
+        logger = make_logger(handler)
+        for i in range(10):
+            logger.info("record %d", i)
+        assert wait_until(lambda: not handler.buffer)
+        handler.flush()
+        assert handler.shipped == 10 and len(collector.records()) == 10
+    finally:
+        handler.close()
+        collector.stop()
+
+
+def test_close_drains_the_buffer(collector):
+    handler = AHCLoggingHttpHandler(f"127.0.0.1:{collector.port}", "/logs", batchsize=100, flushinterval=10.0)
+    logger = make_logger(handler)
+    for i in range(50):
+        logger.info("record %d", i)
+    handler.close()
+    assert handler.shipped == 50
+    assert [record["message"] for record in collector.records()] == [f"record {i}" for i in range(50)]
@@ -0,0 +1,121 @@
+import multiprocessing
+import time
+from threading import Thread
+
+import pytest
+
+from adhoccomputing.Distribution.AHCManager import AHCManager, AHCManagerType
+
+AUTHKEY = b"streamhub-test"
+QUEUENAMES = ["q0", "q1", "q2"]
+context = multiprocessing.get_context("fork")
+
+
+def serve(addressqueue):
+    manager = AHCManager(AHCManagerType.AHC_SERVER, None, authkey=AUTHKEY, address=("127.0.0.1", 0))
+    addressqueue.put(manager.address)
+    manager.serve_forever()
+
+
+def connect(address):
+    manager = AHCManager(AHCManagerType.AHC_CLIENT, None, authkey=AUTHKEY, address=address)
+    manager.connect()
+    return manager
+
+
+# A host that answers every (host, seq) on one of its queues with (name, seq) on the queue of the same name at host,
+# until it gets a None seq on every queue
+def echo_host(address, name):
+    hub = connect(address).create_hub(name)
+
+    def echo(queuename):
+        inbound = hub.get_queue(queuename)
+        replies = {}
+        while True:
+            host, seq = inbound.get()
+            if seq is None:
+                return
+            if host not in replies:
+                replies[host] = hub.remote_queue(host, queuename)
+            replies[host].put((name, seq))
+
+    threads = [Thread(target=echo, args=[queuename]) for queuename in QUEUENAMES]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    hub.close()
+
+
+@pytest.fixture
+def loopback():
+    addressqueue = context.Queue()
+    server = context.Process(target=serve, args=[addressqueue], daemon=True)
+    server.start()
+    address = addressqueue.get(timeout=10)
+    echoes = [context.Process(target=echo_host, args=[address, name], daemon=True) for name in ("e0", "e1")]
+    for echo in echoes:
+        echo.start()
+    yield address
+    for echo in echoes:
+        echo.join(10)
+    server.terminate()
+    server.join()
+
+
+def stop_echoes(hub):
+    for host in ("e0", "e1"):
+        for queuename in QUEUENAMES:
+            hub.remote_queue(host, queuename).put(("driver", None))
+    hub.flush()
+
+
+def receive(hub, queuename, count):
+    inbound = hub.get_queue(queuename)
+    return [inbound.get(timeout=10) for i in range(count)]
+
+
+def test_queues_share_one_connection_and_keep_their_order(loopback):
+    hub = connect(loopback).create_hub("driver")
+    outbound = {(host, queuename): hub.remote_queue(host, queuename) for host in ("e0", "e1") for queuename in QUEUENAMES}
+    count = 2000
+    for seq in range(count):
+        for remotequeue in outbound.values():
+            remotequeue.put(("driver", seq))
+    for queuename in QUEUENAMES:
+        replies = receive(hub, queuename, 2 * count)
+        for host in ("e0", "e1"):
+            assert [seq for sender, seq in replies if sender == host] == list(range(count))
+    # all the queues to a host are multiplexed over a single connection
+    assert sorted(hub.links) == ["e0", "e1"]
+    assert len(hub.connections) == 2
+    stop_echoes(hub)
+    hub.close()
+
+
+def test_partial_batch_is_flushed_by_the_deadline(loopback):
+    hub = connect(loopback).create_hub("driver", batchsize=10000, flushinterval=0.05)
+    remotequeue = hub.remote_queue("e0", "q0")
+    start = time.monotonic()
+    for seq in range(5):
+        remotequeue.put(("driver", seq))
+    assert receive(hub, "q0", 5) == [("e0", seq) for seq in range(5)]
+    assert time.monotonic() - start < 2
+    stop_echoes(hub)
+    hub.close()
+
+
+def test_queues_reconnect_after_the_connection_drops(loopback):
+    hub = connect(loopback).create_hub("driver")
+    remotequeue = hub.remote_queue("e0", "q1")
+    remotequeue.put(("driver", 0))
+    assert receive(hub, "q1", 1) == [("e0", 0)]
+    lost = hub.links["e0"].transport.conn
+    hub.drop_connection("e0", lost)
+    # the queue created before the drop goes over the new connection, and the replies come back over it too
+    for seq in range(1, 101):
+        remotequeue.put(("driver", seq))
+    assert receive(hub, "q1", 100) == [("e0", seq) for seq in range(1, 101)]
+    assert hub.links["e0"].transport.conn is not lost
+    stop_echoes(hub)
+    hub.close()